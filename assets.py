@@ -0,0 +1,164 @@
+import pygame
+from collections import OrderedDict
+
+
+class AssetCache:
+    """
+    A process-wide cache of loaded and transformed image surfaces.
+
+    Every surface is keyed by (path, target size, rotation, alpha mode), so a wall tile
+    scaled to 41x41 is read from disk and scaled exactly once no matter how many walls a
+    level builds. Surfaces handed out by the cache are shared between sprites and must
+    not be drawn onto.
+
+    Entries are evicted least recently used first once the decoded pixel data held by the
+    cache grows past max_bytes.
+
+    Attributes:
+        max_bytes (int): The pixel memory budget before least recently used entries are evicted.
+        hits (int): The number of lookups served from the cache.
+        misses (int): The number of lookups that had to load or transform a surface.
+        evictions (int): The number of entries dropped to stay within the budget.
+        size_bytes (int): The pixel memory currently held by the cache.
+    """
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        """
+        Initializes an empty AssetCache.
+
+        Parameters:
+            max_bytes (int): The pixel memory budget in bytes. Defaults to 64 MiB.
+        """
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size_bytes = 0
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def make_key(path, size=None, rotation=0, alpha=True):
+        """
+        Builds the cache key for an image request.
+
+        Parameters:
+            path (str or Path): The image file path.
+            size (tuple, optional): The (width, height) to scale to, or None to keep the file's size.
+            rotation (int): The counterclockwise rotation in degrees.
+            alpha (bool): Whether the surface keeps per-pixel alpha (convert_alpha) or not (convert).
+
+        Returns:
+            tuple: The normalized (path, size, rotation, alpha) key.
+        """
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+        return (str(path), size, int(rotation) % 360, bool(alpha))
+
+    def get(self, path, size=None, rotation=0, alpha=True):
+        """
+        Returns the surface for an image, loading and transforming it on the first request.
+
+        Parameters:
+            path (str or Path): The image file path.
+            size (tuple, optional): The (width, height) to scale to, or None to keep the file's size.
+            rotation (int): The counterclockwise rotation in degrees. Defaults to 0.
+            alpha (bool): Whether to keep per-pixel alpha. Defaults to True.
+
+        Returns:
+            pygame.Surface: The shared, cached surface.
+        """
+        key = self.make_key(path, size, rotation, alpha)
+        surface = self._entries.get(key)
+        if surface is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        return self._fetch(key)
+
+    def stats(self):
+        """
+        Reports the cache counters.
+
+        Returns:
+            dict: The hits, misses, evictions, entry count and bytes held.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.size_bytes,
+        }
+
+    def clear(self):
+        """
+        Drops every cached surface. The counters are kept.
+        """
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def _fetch(self, key):
+        """
+        Returns a cached surface without touching the hit/miss counters, building it if needed.
+        Rotated surfaces are derived from the cached unrotated surface of the same size.
+        """
+        surface = self._entries.get(key)
+        if surface is not None:
+            self._entries.move_to_end(key)
+            return surface
+
+        path, size, rotation, alpha = key
+        if rotation:
+            base = self._fetch((path, size, 0, alpha))
+            surface = pygame.transform.rotate(base, rotation)
+        else:
+            surface = pygame.image.load(path)
+            surface = surface.convert_alpha() if alpha else surface.convert()
+            if size is not None:
+                surface = pygame.transform.smoothscale(surface, size)
+
+        self._store(key, surface)
+        return surface
+
+    def _store(self, key, surface):
+        """
+        Adds a surface to the cache and evicts least recently used entries over the budget.
+        """
+        self._entries[key] = surface
+        self.size_bytes += _surface_bytes(surface)
+        while self.size_bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self.size_bytes -= _surface_bytes(evicted)
+            self.evictions += 1
+
+
+def _surface_bytes(surface):
+    width, height = surface.get_size()
+    return width * height * surface.get_bytesize()
+
+
+# the cache shared by every sprite and code block in the process
+asset_cache = AssetCache()
+
+
+def load_image(path, size=None, rotation=0, alpha=True):
+    """
+    Loads an image through the shared asset cache.
+
+    Parameters:
+        path (str or Path): The image file path.
+        size (tuple, optional): The (width, height) to scale to, or None to keep the file's size.
+        rotation (int): The counterclockwise rotation in degrees. Defaults to 0.
+        alpha (bool): Whether to keep per-pixel alpha. Defaults to True.
+
+    Returns:
+        pygame.Surface: The shared, cached surface.
+    """
+    return asset_cache.get(path, size, rotation, alpha)
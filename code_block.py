@@ -1,4 +1,5 @@
 import pygame
+from assets import load_image
 from input_box import InputBox, DropDown
 
 
@@ -31,7 +32,7 @@ class CodeBlock(pygame.sprite.Sprite):
         self.position = position
         self.command = command
 
-        self.obj = pygame.image.load(image).convert_alpha()
+        self.obj = load_image(image)
         self.obj_rect = self.obj.get_rect(midbottom=position)
 
         self.next = None
@@ -122,7 +123,6 @@ class ConditionalBlock(CodeBlock):
 
     Attributes:
         end (ConditionalBlock): A reference to the end block of the conditional block.
-        loop_count (int): The count of loops executed by the block.
         input_box (InputBox): The input box for receiving user input.
         drop_down1 (DropDown): The drop-down menu for selecting options.
     """
@@ -140,9 +140,6 @@ class ConditionalBlock(CodeBlock):
         self.end = None
 
         if self.command != "else":
-            
-            self.loop_count = 0
-
             self.input_box = InputBox(
                 (self.obj_rect.centerx, self.obj_rect.centery + 6), (80, 17)
             )
@@ -188,78 +185,6 @@ class ConditionalBlock(CodeBlock):
         """
         return ConditionalBlock(self.image, self.position, self.command)
 
-    def check_condition(self, layout, bot_direction, bot_pos, bot):
-        """
-        Checks the condition associated with the conditional block.
-
-        Parameters:
-            layout (list): The layout of the game environment.
-            bot_direction (str): The direction of the bot.
-            bot_pos (tuple): The position of the bot.
-            bot (Bot): The bot object.
-
-        Returns:
-            bool: True if the condition is satisfied, False otherwise.
-        """
-
-        if self.drop_down1.main == "wall ahead":
-            if bot_direction == "up":
-                if bot.bot_rect.y == 57:
-                    return True
-                return layout[bot_pos[0] - 1][bot_pos[1]] == 2
-
-            elif bot_direction == "down":
-                if bot.bot_rect.y == 385:
-                    return True
-                return layout[bot_pos[0] + 1][bot_pos[1]] == 2
-
-            elif bot_direction == "left":
-                if bot.bot_rect.x == 60:
-                    return True
-                return layout[bot_pos[0]][bot_pos[1] - 1] == 2
-
-            elif bot_direction == "right":
-                if bot.bot_rect.x == 757:
-                    return True
-                return layout[bot_pos[0]][bot_pos[1] + 1] == 2
-            
-        elif self.drop_down1.main == "wall not ahead":
-            if bot_direction == "up":
-                if bot.bot_rect.y == 57:
-                    return True
-                return layout[bot_pos[0] - 1][bot_pos[1]] != 2
-
-            elif bot_direction == "down":
-                if bot.bot_rect.y == 385:
-                    return True
-                return layout[bot_pos[0] + 1][bot_pos[1]] != 2
-
-            elif bot_direction == "left":
-                if bot.bot_rect.x == 60:
-                    return True
-                return layout[bot_pos[0]][bot_pos[1] - 1] != 2
-
-            elif bot_direction == "right":
-                if bot.bot_rect.x == 757:
-                    return True
-                return layout[bot_pos[0]][bot_pos[1] + 1] != 2
-
-        elif self.drop_down1.main == "button is pressed":
-            pass
-
-        elif self.drop_down1.main == "door is open":
-            pass
-        
-        elif self.drop_down1.main == "true":
-            return True
-        
-        else:
-            if self.loop_count >= int(self.drop_down1.main):
-                return False
-            else:
-                self.loop_count +=1
-                return True
-
 
 class EndConditionalBlock(CodeBlock):
     """
@@ -0,0 +1,19 @@
+"""
+The game's rules without pygame: level layouts, compiling block programs and running
+them tile by tile. Everything here runs headlessly, so levels and programs can be
+evaluated by tests and tools without a display. The pygame screens in levels.py only
+draw what the core reports.
+"""
+from core.program import CompileError, Program, compile_program, read_blocks
+from core.simulator import (
+    UP,
+    RIGHT,
+    DOWN,
+    LEFT,
+    DIRECTIONS,
+    Board,
+    Event,
+    Simulator,
+    run_program,
+)
+from core.layouts import LAYOUTS, LevelLayout, add_layout, get_layout, load_layout, save_layout
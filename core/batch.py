@@ -0,0 +1,380 @@
+"""
+Runs many programs on the same level at once. The state of every run is held in NumPy
+arrays, one entry per program, and each step advances all unfinished runs by one
+instruction together, so thousands of candidate programs cost a handful of array
+operations per step instead of thousands of Simulator objects.
+
+The runs follow the same rules as core.simulator.Simulator, step for step, but record no
+events: only where each run ended up and how it ended.
+"""
+import numpy as np
+
+from core.peephole import optimize_program
+from core.program import MOVE, TURN, TEST, JUMP, COUNT_RESET, COUNT_TEST
+
+# condition name -> the number a TEST instruction's condition is stored as; any other
+# condition is false, as in Simulator.check_condition
+CONDITION_CODES = {
+    "true": 0,
+    "wall ahead": 1,
+    "wall not ahead": 2,
+    "button is pressed": 3,
+    "door is open": 4,
+}
+UNKNOWN_CONDITION = len(CONDITION_CODES)
+
+# the most buttons or doors a board may have, so their bitsets fit in an int64
+MAX_SWITCHES = 62
+
+
+class BatchSimulator:
+    """
+    Runs a batch of compiled programs on one board in lock-step.
+
+    The board is turned into lookup arrays indexed by cell index, so the wall ahead and
+    walkability checks of a whole batch are a few array lookups. The programs are padded
+    into tables of shape (programs, longest program + 1), so the instruction every run is
+    at is fetched with one indexing operation.
+
+    Attributes:
+        board (Board): The level being played.
+        count (int): The number of programs in the batch.
+        lengths (np.ndarray): The number of instructions in each program.
+        ops (np.ndarray): The opcode of each program's instructions, -1 past the end.
+        args (np.ndarray): The tiles of a move, the turns of a turn, the condition code of a
+            test or the counter slot of a counted loop.
+        limits (np.ndarray): The limit of each counted test.
+        targets (np.ndarray): The jump target of each instruction, or -1.
+        slots (int): The most counter slots any of the programs uses.
+        position (np.ndarray): The cell index each bot is on.
+        direction (np.ndarray): The direction each bot faces.
+        open_door_bits (np.ndarray): The bitset of each run's opened doors.
+        pressed_bits (np.ndarray): The bitset of each run's pressed buttons.
+        wormhole (np.ndarray): The wormhole each bot last arrived through, or -1.
+        pc (np.ndarray): The instruction each run is at.
+        counters (np.ndarray): The counters of each run, one column per slot.
+        moved (np.ndarray): The tiles moved so far by each run's current move instruction.
+        steps (np.ndarray): The number of steps each run has taken.
+        done (np.ndarray): True for runs that have ended.
+        solved (np.ndarray): True for runs that collected the bolt.
+        looping (np.ndarray): True for runs found to loop forever.
+        detect_loops (bool): Whether to look for endless loops.
+    """
+    def __init__(self, board, programs, detect_loops=True, start=None):
+        """
+        Initializes a new BatchSimulator with every bot at the start.
+
+        Parameters:
+            board (Board): The level to play.
+            programs (list): The compiled programs to run.
+            detect_loops (bool): Whether to end runs that loop forever. Defaults to True.
+            start (tuple, optional): The (position, direction, pressed buttons bitset, wormhole)
+                every bot starts from instead, as if earlier blocks had brought it there.
+
+        Raises:
+            ValueError: If the board has more buttons or doors than a bitset can hold.
+        """
+        if len(board.button_ids) > MAX_SWITCHES or len(board.door_ids) > MAX_SWITCHES:
+            raise ValueError(f"a batch can only run boards with up to {MAX_SWITCHES} buttons and doors")
+        self.board = board
+        self.count = len(programs)
+        self.detect_loops = detect_loops
+
+        self.ahead = np.array(board.ahead, dtype=np.int64)
+        self.walls = np.array([(board.wall_bits >> index) & 1 == 1 for index in range(len(board.cells))])
+        self.door_at = np.array(board.door_at, dtype=np.int64)
+        self.button_at = np.array(board.button_at, dtype=np.int64)
+        self.goals = np.array([trigger is not None and trigger.goal for trigger in board.triggers])
+        self.wormhole_to = np.array(
+            [-1 if trigger is None or trigger.wormhole is None else trigger.wormhole for trigger in board.triggers],
+            dtype=np.int64,
+        )
+        # padded so that looking up a missing button's door is a valid index
+        self.button_doors = np.array([-1 if door is None else door for door in board.button_doors] + [-1], dtype=np.int64)
+
+        width = max((len(program.instructions) for program in programs), default=0) + 1
+        self.slots = max((program.counter_count for program in programs), default=0)
+        self.lengths = np.array([len(program.instructions) for program in programs], dtype=np.int64)
+        self.ops = np.full((self.count, width), -1, dtype=np.int64)
+        self.args = np.zeros((self.count, width), dtype=np.int64)
+        self.limits = np.zeros((self.count, width), dtype=np.int64)
+        self.targets = np.full((self.count, width), -1, dtype=np.int64)
+        for number, program in enumerate(programs):
+            for pc, instruction in enumerate(program.instructions):
+                self.ops[number, pc] = instruction.op
+                if instruction.target is not None:
+                    self.targets[number, pc] = instruction.target
+                if instruction.op == TEST:
+                    self.args[number, pc] = CONDITION_CODES.get(instruction.arg, UNKNOWN_CONDITION)
+                elif instruction.op == COUNT_TEST:
+                    self.args[number, pc], self.limits[number, pc] = instruction.arg
+                elif instruction.arg is not None:
+                    self.args[number, pc] = instruction.arg
+
+        self.reset(start)
+
+    def reset(self, start=None):
+        """
+        Puts every bot back at the start and every program back at its first instruction,
+        so the same batch of programs can be run again from somewhere else.
+
+        Parameters:
+            start (tuple, optional): The (position, direction, pressed buttons bitset, wormhole)
+                every bot starts from. Defaults to the board's start.
+        """
+        board = self.board
+        if start is None:
+            start = (board.index[board.start], board.start_direction, 0, -1)
+        position, direction, pressed_bits, wormhole = start
+        open_door_bits = 0
+        for button, door in enumerate(board.button_doors):
+            if door is not None and (pressed_bits >> button) & 1:
+                open_door_bits |= 1 << door
+        self.position = np.full(self.count, position, dtype=np.int64)
+        self.direction = np.full(self.count, direction, dtype=np.int64)
+        self.open_door_bits = np.full(self.count, open_door_bits, dtype=np.int64)
+        self.pressed_bits = np.full(self.count, pressed_bits, dtype=np.int64)
+        self.wormhole = np.full(self.count, wormhole, dtype=np.int64)
+        self.pc = np.zeros(self.count, dtype=np.int64)
+        self.counters = np.zeros((self.count, self.slots), dtype=np.int64)
+        self.moved = np.zeros(self.count, dtype=np.int64)
+        self.steps = np.zeros(self.count, dtype=np.int64)
+        self.solved = np.zeros(self.count, dtype=bool)
+        self.looping = np.zeros(self.count, dtype=bool)
+        self.done = self.lengths == 0
+
+        # Brent's cycle detection, as in Simulator.check_for_loop, kept for every run at once
+        self.cycle_mark = self.state()
+        self.cycle_power = np.ones(self.count, dtype=np.int64)
+        self.cycle_length = np.zeros(self.count, dtype=np.int64)
+
+    @property
+    def cells(self):
+        """
+        list: The (row, col) cell each bot is on.
+        """
+        return [self.board.cells[index] for index in self.position]
+
+    def state(self):
+        """
+        Copies everything that decides how the rest of each run goes, like Simulator.state.
+
+        Returns:
+            list: The state arrays, the counters last.
+        """
+        return [
+            self.pc.copy(),
+            self.position.copy(),
+            self.direction.copy(),
+            self.moved.copy(),
+            self.wormhole.copy(),
+            self.pressed_bits.copy(),
+            self.counters.copy(),
+        ]
+
+    def tile_open(self, runs, cells):
+        """
+        Checks whether bots can move onto cells.
+
+        Parameters:
+            runs (np.ndarray): The numbers of the runs.
+            cells (np.ndarray): The cell index each of those bots would move onto, or -1.
+
+        Returns:
+            np.ndarray: True where the cell is on the grid and not a wall or a closed door.
+        """
+        safe = np.maximum(cells, 0)
+        doors = self.door_at[safe]
+        door_open = (self.open_door_bits[runs] >> np.maximum(doors, 0)) & 1 == 1
+        return (cells >= 0) & ~self.walls[safe] & ((doors < 0) | door_open)
+
+    def check_conditions(self, runs, conditions):
+        """
+        Evaluates the conditions of test instructions, like Simulator.check_condition.
+
+        Parameters:
+            runs (np.ndarray): The numbers of the runs.
+            conditions (np.ndarray): The condition code each of those runs tests.
+
+        Returns:
+            np.ndarray: True where the condition holds.
+        """
+        ahead = self.ahead[self.position[runs] * 4 + self.direction[runs]]
+        safe = np.maximum(ahead, 0)
+        wall_ahead = (ahead < 0) | self.walls[safe]
+        buttons = np.where(ahead >= 0, self.button_at[safe], -1)
+        doors = np.where(ahead >= 0, self.door_at[safe], -1)
+        button_pressed = (buttons >= 0) & ((self.pressed_bits[runs] >> np.maximum(buttons, 0)) & 1 == 1)
+        door_open = (doors >= 0) & ((self.open_door_bits[runs] >> np.maximum(doors, 0)) & 1 == 1)
+        return np.select(
+            [conditions == 0, conditions == 1, conditions == 2, conditions == 3, conditions == 4],
+            [True, wall_ahead, ~wall_ahead, button_pressed, door_open],
+            False,
+        )
+
+    def step(self):
+        """
+        Runs one step of every unfinished program.
+
+        Returns:
+            int: The number of runs that took a step, 0 once every run has ended.
+        """
+        runs = np.flatnonzero(~self.done)
+        if len(runs) == 0:
+            return 0
+        self.steps[runs] += 1
+        pcs = self.pc[runs]
+        ops = self.ops[runs, pcs]
+
+        moving = runs[ops == MOVE]
+        if len(moving):
+            self.step_moves(moving)
+
+        turning = runs[ops == TURN]
+        if len(turning):
+            turns = self.args[turning, self.pc[turning]]
+            self.direction[turning] = (self.direction[turning] - turns) % 4
+            self.pc[turning] += 1
+
+        testing = runs[ops == TEST]
+        if len(testing):
+            pcs = self.pc[testing]
+            holds = self.check_conditions(testing, self.args[testing, pcs])
+            self.pc[testing] = np.where(holds, pcs + 1, self.targets[testing, pcs])
+
+        jumping = runs[ops == JUMP]
+        self.pc[jumping] = self.targets[jumping, self.pc[jumping]]
+
+        resetting = runs[ops == COUNT_RESET]
+        self.counters[resetting, self.args[resetting, self.pc[resetting]]] = 0
+        self.pc[resetting] += 1
+
+        counting = runs[ops == COUNT_TEST]
+        if len(counting):
+            pcs = self.pc[counting]
+            slots = self.args[counting, pcs]
+            used_up = self.counters[counting, slots] >= self.limits[counting, pcs]
+            self.pc[counting] = np.where(used_up, self.targets[counting, pcs], pcs + 1)
+            self.counters[counting[~used_up], slots[~used_up]] += 1
+
+        ended = runs[~self.solved[runs] & (self.pc[runs] >= self.lengths[runs])]
+        self.done[ended] = True
+        if self.detect_loops:
+            self.check_for_loops(runs[~self.done[runs]])
+        return len(runs)
+
+    def step_moves(self, runs):
+        """
+        Moves bots one tile for their move instructions, or ends the instructions of the
+        bots that cannot go on.
+
+        Parameters:
+            runs (np.ndarray): The numbers of the runs at a move instruction.
+        """
+        pcs = self.pc[runs]
+        tiles = self.args[runs, pcs]
+        ahead = self.ahead[self.position[runs] * 4 + self.direction[runs]]
+        going = (tiles > 0) & self.tile_open(runs, ahead)
+
+        stopped = runs[~going]
+        self.moved[stopped] = 0
+        self.pc[stopped] += 1
+
+        runs = runs[going]
+        tiles = tiles[going]
+        self.position[runs] = ahead[going]
+        self.enter_cells(runs)
+        self.moved[runs] += 1
+        ahead = self.ahead[self.position[runs] * 4 + self.direction[runs]]
+        finished = runs[(self.moved[runs] >= tiles) | ~self.tile_open(runs, ahead)]
+        self.moved[finished] = 0
+        self.pc[finished] += 1
+
+    def enter_cells(self, runs):
+        """
+        Fires whatever is on the cells bots just moved onto, like Simulator.enter_cell.
+
+        Parameters:
+            runs (np.ndarray): The numbers of the runs whose bot just moved.
+        """
+        positions = self.position[runs]
+        buttons = self.button_at[positions]
+        pressing = (buttons >= 0) & ((self.pressed_bits[runs] >> np.maximum(buttons, 0)) & 1 == 0)
+        pressers = runs[pressing]
+        buttons = buttons[pressing]
+        self.pressed_bits[pressers] |= np.left_shift(1, buttons)
+        doors = self.button_doors[buttons]
+        self.open_door_bits[pressers[doors >= 0]] |= np.left_shift(1, doors[doors >= 0])
+
+        destinations = self.wormhole_to[positions]
+        travelling = (destinations >= 0) & (positions != self.wormhole[runs])
+        travellers = runs[travelling]
+        self.position[travellers] = destinations[travelling]
+        self.wormhole[travellers] = destinations[travelling]
+
+        collectors = runs[self.goals[self.position[runs]]]
+        self.solved[collectors] = True
+        self.done[collectors] = True
+
+    def check_for_loops(self, runs):
+        """
+        Compares the runs' states with their marked ones and ends those that have come
+        round again, moving each mark on after 1, 2, 4, 8, ... steps.
+
+        Parameters:
+            runs (np.ndarray): The numbers of the runs still going.
+        """
+        current = [self.pc, self.position, self.direction, self.moved, self.wormhole, self.pressed_bits]
+        repeated = np.ones(len(runs), dtype=bool)
+        for now, mark in zip(current, self.cycle_mark):
+            repeated &= now[runs] == mark[runs]
+        repeated &= np.all(self.counters[runs] == self.cycle_mark[-1][runs], axis=1)
+        self.looping[runs[repeated]] = True
+        self.done[runs[repeated]] = True
+
+        runs = runs[~repeated]
+        self.cycle_length[runs] += 1
+        due = runs[self.cycle_length[runs] == self.cycle_power[runs]]
+        for now, mark in zip(current + [self.counters], self.cycle_mark):
+            mark[due] = now[due]
+        self.cycle_power[due] *= 2
+        self.cycle_length[due] = 0
+
+    def run(self, max_steps=None):
+        """
+        Runs every program until it ends, collects the bolt, is found to loop forever or
+        reaches the step limit.
+
+        Parameters:
+            max_steps (int, optional): The most steps to run, or None for no limit.
+
+        Returns:
+            BatchSimulator: This batch, for chaining.
+        """
+        taken = 0
+        while max_steps is None or taken < max_steps:
+            if not self.step():
+                break
+            taken += 1
+        return self
+
+
+def run_batch(board, programs, max_steps=None, optimize=False):
+    """
+    Runs compiled programs on a board from the start, all at once.
+
+    Parameters:
+        board (Board): The level to play.
+        programs (list): The compiled programs.
+        max_steps (int, optional): The most steps to run each program, or None for no limit.
+        optimize (bool): Whether to run each program through core.peephole first. The bots
+            end up in the same places, and the bolt is collected and loops found just the
+            same, in fewer steps; steps and the step limit then count the optimized steps.
+            Defaults to False.
+
+    Returns:
+        BatchSimulator: The batch after the runs, holding every bot's final state.
+    """
+    if optimize:
+        programs = [optimize_program(program) for program in programs]
+    return BatchSimulator(board, programs).run(max_steps)
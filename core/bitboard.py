@@ -0,0 +1,84 @@
+"""
+Helpers for the simulator's compact state: sets of cells and of numbered doors and
+buttons are stored as the bits of a Python int, and the whole state of a run is summed
+up by a Zobrist hash, the xor of one random 64 bit key per part of the state.
+"""
+from functools import lru_cache
+
+MASK64 = (1 << 64) - 1
+
+# the parts of the state that get Zobrist keys
+POSITION = 1
+PC = 2
+PROGRESS = 3
+WORMHOLE = 4
+BUTTON = 5
+COUNTER = 6
+
+
+def to_bits(indices):
+    """
+    Builds a bitset.
+
+    Parameters:
+        indices (iterable): The numbers of the bits to set.
+
+    Returns:
+        int: The bitset.
+    """
+    bits = 0
+    for index in indices:
+        bits |= 1 << index
+    return bits
+
+
+def from_bits(bits):
+    """
+    Lists the bits set in a bitset.
+
+    Parameters:
+        bits (int): The bitset.
+
+    Returns:
+        list: The numbers of the set bits, lowest first.
+    """
+    indices = []
+    while bits:
+        lowest = bits & -bits
+        indices.append(lowest.bit_length() - 1)
+        bits ^= lowest
+    return indices
+
+
+def mix64(value):
+    """
+    Scrambles a number into a well spread 64 bit number (the splitmix64 finalizer).
+
+    Parameters:
+        value (int): Any non-negative number.
+
+    Returns:
+        int: The scrambled number.
+    """
+    value = (value + 0x9E3779B97F4A7C15) & MASK64
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK64
+    return value ^ (value >> 31)
+
+
+@lru_cache(maxsize=1 << 16)
+def zobrist_key(part, value, slot=0):
+    """
+    Gives the Zobrist key of one part of the state having a value. Keys are worked out
+    rather than drawn from a table, so parts with no fixed range, like loop counters, have
+    keys too, and the same state hashes the same in every process.
+
+    Parameters:
+        part (int): Which part of the state, one of the constants above.
+        value (int): The part's value, at least 0.
+        slot (int): Which of several parts of the same kind, such as the counter slot.
+
+    Returns:
+        int: The 64 bit key.
+    """
+    return mix64((part << 56) ^ (slot << 32) ^ value)
@@ -0,0 +1,143 @@
+import json
+import os
+import tempfile
+
+# the folder every on-disk cache of the game lives under, one subfolder per kind of result
+CACHE_DIRECTORY = "cache"
+
+
+class DiskCache:
+    """
+    A folder of JSON files keyed by string, shared by every process that opens the same
+    folder. Files are replaced atomically, so readers never see half a file, and the least
+    recently used entries are deleted once there are more than max_entries of them.
+
+    Attributes:
+        directory (str): The folder holding the entries.
+        max_entries (int): The most entries kept.
+    """
+    def __init__(self, directory, max_entries=2000):
+        """
+        Initializes a new DiskCache. The folder is created on the first write.
+
+        Parameters:
+            directory (str): The folder holding the entries.
+            max_entries (int): The most entries kept. Defaults to 2000.
+        """
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def path(self, key):
+        """
+        Gives the file an entry is stored in.
+
+        Parameters:
+            key (str): The entry's key, which must be usable as a file name.
+
+        Returns:
+            str: The path of the entry's file.
+        """
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key, default=None):
+        """
+        Reads an entry and marks it as recently used.
+
+        Parameters:
+            key (str): The entry's key.
+            default: What to return if there is no readable entry. Defaults to None.
+
+        Returns:
+            The stored value, or default.
+        """
+        path = self.path(key)
+        try:
+            with open(path) as file:
+                value = json.load(file)
+            os.utime(path)
+        except (OSError, ValueError):
+            return default
+        return value
+
+    def put(self, key, value):
+        """
+        Stores an entry, replacing any entry with the same key, and evicts the least
+        recently used entries if the cache is full. Failing to write is not an error,
+        since the value can always be worked out again. Nothing is left behind if the
+        value cannot be stored.
+
+        Parameters:
+            key (str): The entry's key.
+            value: Any value json can store.
+
+        Raises:
+            TypeError: If json cannot store the value.
+            ValueError: If the value holds itself, or a float json cannot store.
+        """
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            handle, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(handle, "w") as file:
+                json.dump(value, file, separators=(",", ":"))
+            os.replace(temp_path, self.path(key))
+        except OSError:
+            return
+        finally:
+            # still there unless the replace worked
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        self.evict()
+
+    def keys(self):
+        """
+        Lists the keys of the stored entries.
+
+        Returns:
+            list: The keys, in no particular order.
+        """
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return [name[:-5] for name in names if name.endswith(".json")]
+
+    def evict(self):
+        """
+        Deletes the least recently used entries until at most max_entries are left.
+        """
+        keys = self.keys()
+        if len(keys) <= self.max_entries:
+            return
+        used = []
+        for key in keys:
+            try:
+                used.append((os.path.getmtime(self.path(key)), key))
+            except OSError:
+                pass
+        used.sort()
+        for _, key in used[:len(used) - self.max_entries]:
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        """
+        Deletes every entry.
+        """
+        for key in self.keys():
+            try:
+                os.remove(self.path(key))
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __contains__(self, key):
+        return os.path.exists(self.path(key))
@@ -0,0 +1,495 @@
+"""
+The model behind the teacher's level editor: a grid of tiles that can be changed one tile
+at a time, with the problems of the level kept up to date as it is edited.
+
+Checking a level from scratch means searching every state the bot can reach, which on a
+large grid takes longer than a frame. The editor instead keeps the open floor cut into
+regions, the stretches of floor, bolt and button tiles the bot can walk around freely.
+Changing a tile only floods the regions next to it: a new floor tile joins the regions
+around it, and a new wall can only split the one region it was placed in. Reachability
+is then searched over the regions and the door and wormhole tiles between them, which are
+few, following the same rules as core.solver.
+"""
+from core.generator import WORMHOLE_COLORS
+from core.layouts import BOLT, BUTTON, DOOR, FLOOR, TILES, WALL, WORMHOLE, LevelLayout, save_layout
+from core.simulator import OFFSETS, UP
+
+# tiles the bot walks over without anything stopping or moving it
+OPEN_TILES = (FLOOR, BOLT, BUTTON)
+
+
+class RegionMap:
+    """
+    The open cells of a grid cut into regions of cells joined side by side, kept up to date
+    as cells are opened and closed.
+
+    Attributes:
+        rows (int): The number of rows in the grid.
+        cols (int): The number of columns in the grid.
+        labels (list): The region of each cell index, or -1 for closed cells.
+        regions (dict): The set of cell indexes of each region, by label.
+        neighbours (list): The indexes of the cells next to each cell.
+        changed (set): The labels of the regions made or changed since clear_changes.
+        next_label (int): The label the next new region gets.
+    """
+    def __init__(self, rows, cols, open_cells=()):
+        """
+        Initializes a new RegionMap.
+
+        Parameters:
+            rows (int): The number of rows in the grid.
+            cols (int): The number of columns in the grid.
+            open_cells (iterable): The indexes of the cells that start open.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.labels = [-1] * (rows * cols)
+        self.regions = {}
+        self.changed = set()
+        self.next_label = 0
+        self.neighbours = []
+        for index in range(rows * cols):
+            row, col = divmod(index, cols)
+            self.neighbours.append([
+                (row + row_offset) * cols + col + col_offset
+                for row_offset, col_offset in OFFSETS
+                if 0 <= row + row_offset < rows and 0 <= col + col_offset < cols
+            ])
+        for index in open_cells:
+            self.open(index)
+
+    def new_region(self, cells):
+        """
+        Labels a set of cells as a new region.
+
+        Parameters:
+            cells (set): The cell indexes.
+
+        Returns:
+            int: The new region's label.
+        """
+        label = self.next_label
+        self.next_label += 1
+        self.regions[label] = cells
+        for index in cells:
+            self.labels[index] = label
+        self.changed.add(label)
+        return label
+
+    def open(self, index):
+        """
+        Opens a cell, joining it and the regions next to it into one region. The cells of the
+        smaller regions are relabelled into the largest one.
+
+        Parameters:
+            index (int): The cell index.
+        """
+        if self.labels[index] >= 0:
+            return
+        joined = {self.labels[other] for other in self.neighbours[index] if self.labels[other] >= 0}
+        if not joined:
+            self.new_region({index})
+            return
+        label = max(joined, key=lambda label: len(self.regions[label]))
+        region = self.regions[label]
+        for other in joined - {label}:
+            cells = self.regions.pop(other)
+            for cell in cells:
+                self.labels[cell] = label
+            region |= cells
+            self.changed.add(other)
+        region.add(index)
+        self.labels[index] = label
+        self.changed.add(label)
+
+    def close(self, index):
+        """
+        Closes a cell. Only the region it was in is flooded again, from each of the cell's
+        open neighbours; if they are no longer joined the region splits, the first part
+        keeping its label.
+
+        Parameters:
+            index (int): The cell index.
+        """
+        label = self.labels[index]
+        if label < 0:
+            return
+        region = self.regions[label]
+        region.discard(index)
+        self.labels[index] = -1
+        self.changed.add(label)
+        if not region:
+            del self.regions[label]
+            return
+
+        parts = []
+        seen = set()
+        for start in self.neighbours[index]:
+            if self.labels[start] != label or start in seen:
+                continue
+            part = {start}
+            stack = [start]
+            while stack:
+                cell = stack.pop()
+                for other in self.neighbours[cell]:
+                    if self.labels[other] == label and other not in part:
+                        part.add(other)
+                        stack.append(other)
+            seen |= part
+            parts.append(part)
+            if len(part) == len(region):
+                return
+        self.regions[label] = parts[0]
+        for part in parts[1:]:
+            self.new_region(part)
+
+    def clear_changes(self):
+        """
+        Returns:
+            set: The labels of the regions made or changed since the last call, some of
+            which may since have been merged away.
+        """
+        changed = self.changed
+        self.changed = set()
+        return changed
+
+
+class LevelEditor:
+    """
+    A level being edited one tile at a time, which keeps a list of what is wrong with it.
+
+    Buttons and doors are linked as they are placed: a new button opens the first door
+    that has no button, and a new door is opened by the first button that opens nothing.
+    Wormholes are paired in the order they are placed. Other links can be made with link.
+
+    Attributes:
+        name (str): The level identifier.
+        rows (int): The number of rows in the grid.
+        cols (int): The number of columns in the grid.
+        grid (list): The tile character of each cell index, row by row.
+        cells (dict): The cells holding each kind of tile other than floor.
+        links (dict): Maps button cells to the door cell each one opens.
+        wormholes (list): (cell, cell, color) triples, one per pair of wormholes.
+        unpaired (list): The wormhole cells not yet in a pair, oldest first.
+        start (tuple): The cell the bot starts on, always a floor tile.
+        start_direction (int): The direction the bot starts facing.
+        hint (str): The level's hint, or None.
+        background (str): The image drawn behind the level.
+        par (dict): The par of the level it started from, or None. It is only used while the
+            level is still the same, see core.scoring.layout_par.
+        regions (RegionMap): The regions of open tiles.
+        summaries (dict): By region label, the (buttons, bolt, border) of each region looked
+            at since it last changed: its button cell indexes, whether it holds a bolt, and
+            the indexes of the closed cells next to it.
+        found (list): The problems found since the last edit, or None if not yet checked.
+    """
+    def __init__(self, layout):
+        """
+        Initializes a new LevelEditor.
+
+        Parameters:
+            layout (LevelLayout): The level to start from.
+
+        Raises:
+            ValueError: If the layout's start is not on a floor tile.
+        """
+        if layout.tile(layout.start) != FLOOR:
+            raise ValueError(f"level {layout.name}: the start must be on a floor tile")
+        self.name = layout.name
+        self.rows = layout.rows
+        self.cols = layout.cols
+        self.grid = [character for line in layout.grid for character in line]
+        self.cells = {tile: set() for tile in TILES if tile != FLOOR}
+        for index, tile in enumerate(self.grid):
+            if tile != FLOOR:
+                self.cells[tile].add(self.cell(index))
+        self.links = dict(layout.links)
+        self.wormholes = list(layout.wormholes)
+        self.unpaired = []
+        self.start = layout.start
+        self.start_direction = layout.start_direction
+        self.hint = layout.hint
+        self.background = layout.background
+        self.par = layout.par
+        self.regions = RegionMap(
+            self.rows, self.cols, [index for index, tile in enumerate(self.grid) if tile in OPEN_TILES]
+        )
+        self.summaries = {}
+        self.found = None
+
+    @classmethod
+    def blank(cls, name, rows=9, cols=18):
+        """
+        Makes an editor for a new level of bare floor, with the bot in the bottom right corner
+        facing up.
+
+        Parameters:
+            name (str): The level identifier.
+            rows (int): The number of rows. Defaults to 9.
+            cols (int): The number of columns. Defaults to 18.
+
+        Returns:
+            LevelEditor: The editor.
+        """
+        return cls(LevelLayout(name, [FLOOR * cols] * rows, start=(rows - 1, cols - 1), start_direction=UP))
+
+    def cell(self, index):
+        """
+        Returns:
+            tuple: The (row, col) of a cell index.
+        """
+        return divmod(index, self.cols)
+
+    def index(self, cell):
+        """
+        Returns:
+            int: The cell index of a (row, col).
+        """
+        return cell[0] * self.cols + cell[1]
+
+    def tile(self, cell):
+        """
+        Returns:
+            str: The tile character on a (row, col) cell.
+        """
+        return self.grid[self.index(cell)]
+
+    def place(self, cell, tile):
+        """
+        Puts a tile on a cell, replacing what was there. The start cell always stays floor.
+
+        Parameters:
+            cell (tuple): The (row, col) cell.
+            tile (str): The tile character.
+
+        Returns:
+            bool: True if the tile was placed.
+        """
+        if tile not in TILES:
+            raise ValueError(f"unknown tile {tile!r}")
+        if cell == self.start and tile != FLOOR:
+            return False
+        old = self.tile(cell)
+        if old == tile:
+            return True
+        self.unlink(cell)
+        index = self.index(cell)
+        self.grid[index] = tile
+        if old != FLOOR:
+            self.cells[old].discard(cell)
+        if tile != FLOOR:
+            self.cells[tile].add(cell)
+
+        if old in OPEN_TILES and tile in OPEN_TILES:
+            # the region is the same, but not what is in it
+            self.summaries.pop(self.regions.labels[index], None)
+        elif old in OPEN_TILES:
+            self.regions.close(index)
+        elif tile in OPEN_TILES:
+            self.regions.open(index)
+
+        if tile == BUTTON:
+            doors = sorted(self.cells[DOOR] - set(self.links.values()))
+            if doors:
+                self.links[cell] = doors[0]
+        elif tile == DOOR:
+            buttons = sorted(self.cells[BUTTON] - set(self.links))
+            if buttons:
+                self.links[buttons[0]] = cell
+        elif tile == WORMHOLE:
+            if self.unpaired:
+                color = WORMHOLE_COLORS[len(self.wormholes) % len(WORMHOLE_COLORS)]
+                self.wormholes.append((self.unpaired.pop(0), cell, color))
+            else:
+                self.unpaired.append(cell)
+        self.found = None
+        return True
+
+    def unlink(self, cell):
+        """
+        Undoes the links of a cell about to be replaced. A wormhole's partner is left waiting
+        for a new pair.
+
+        Parameters:
+            cell (tuple): The (row, col) cell.
+        """
+        self.links = {button: door for button, door in self.links.items() if cell not in (button, door)}
+        if cell in self.unpaired:
+            self.unpaired.remove(cell)
+        for pair in self.wormholes:
+            if cell in pair[:2]:
+                self.wormholes.remove(pair)
+                self.unpaired.append(pair[1] if pair[0] == cell else pair[0])
+                break
+
+    def link(self, button, door):
+        """
+        Makes a button open a door, in place of whatever it opened before.
+
+        Parameters:
+            button (tuple): The button's cell.
+            door (tuple): The door's cell.
+
+        Returns:
+            bool: True if the cells hold a button and a door and were linked.
+        """
+        if self.tile(button) != BUTTON or self.tile(door) != DOOR:
+            return False
+        self.links[button] = door
+        self.found = None
+        return True
+
+    def set_start(self, cell):
+        """
+        Moves the bot's starting cell.
+
+        Parameters:
+            cell (tuple): The (row, col) cell, which must hold floor.
+
+        Returns:
+            bool: True if the start was moved.
+        """
+        if self.tile(cell) != FLOOR:
+            return False
+        self.start = cell
+        self.found = None
+        return True
+
+    def summary(self, label):
+        """
+        Gives what is in a region and around it, looking only at that region's cells.
+
+        Parameters:
+            label (int): The region's label.
+
+        Returns:
+            tuple: (buttons, bolt, border), see summaries.
+        """
+        for changed in self.regions.clear_changes():
+            self.summaries.pop(changed, None)
+        if label not in self.summaries:
+            cells = self.regions.regions[label]
+            labels = self.regions.labels
+            neighbours = self.regions.neighbours
+            self.summaries[label] = (
+                [index for index in cells if self.grid[index] == BUTTON],
+                any(self.grid[index] == BOLT for index in cells),
+                {other for index in cells for other in neighbours[index] if labels[other] < 0},
+            )
+        return self.summaries[label]
+
+    def search(self):
+        """
+        Finds everywhere the bot can get to. The bot can walk anywhere in a region, pressing
+        every button there, so the search is over regions and the door and wormhole tiles,
+        together with the open doors and the wormhole last arrived through, as in core.solver.
+
+        Returns:
+            tuple: (solved, reached), whether the bolt can be collected and the labels of the
+            regions the bot can get to.
+        """
+        door_ids = {self.index(cell): number for number, cell in enumerate(sorted(self.cells[DOOR]))}
+        opens = {self.index(button): 1 << door_ids[self.index(door)] for button, door in self.links.items()}
+        partners = {}
+        for first, second, _ in self.wormholes:
+            partners[self.index(first)] = self.index(second)
+            partners[self.index(second)] = self.index(first)
+        labels = self.regions.labels
+        solved = False
+        reached = set()
+
+        def enter(index, doors, wormhole):
+            # the state after stepping onto a cell, or None if the bot cannot
+            nonlocal solved
+            tile = self.grid[index]
+            if tile == WALL or (tile == DOOR and not doors & (1 << door_ids[index])):
+                return None
+            if tile == WORMHOLE and index in partners and index != wormhole:
+                index = wormhole = partners[index]
+            if tile not in OPEN_TILES:
+                return (index, doors, wormhole)
+            label = labels[index]
+            buttons, bolt, _ = self.summary(label)
+            for button in buttons:
+                doors |= opens.get(button, 0)
+            solved = solved or bolt
+            reached.add(label)
+            return (-1 - label, doors, wormhole)
+
+        start = enter(self.index(self.start), 0, -1)
+        seen = {start}
+        stack = [start]
+        while stack:
+            node, doors, wormhole = stack.pop()
+            exits = self.summary(-1 - node)[2] if node < 0 else self.regions.neighbours[node]
+            for index in exits:
+                state = enter(index, doors, wormhole)
+                if state is not None and state not in seen:
+                    seen.add(state)
+                    stack.append(state)
+        return solved, reached
+
+    def problems(self):
+        """
+        Lists what is wrong with the level, checking it again only if it changed since the
+        last call.
+
+        Returns:
+            list: Short descriptions, such as "bolt unreachable", or an empty list if the
+            level is ready to play.
+        """
+        if self.found is not None:
+            return self.found
+        found = []
+        doors_opened = set(self.links.values())
+        for door in sorted(self.cells[DOOR] - doors_opened):
+            found.append(f"door at {door} with no button")
+        for wormhole in self.unpaired:
+            found.append(f"wormhole at {wormhole} with no pair")
+
+        solved, reached = self.search()
+        if not self.cells[BOLT]:
+            found.append("no bolt")
+        elif not solved:
+            found.append("bolt unreachable")
+        # buttons that open nothing are allowed, as decoys
+        labels = self.regions.labels
+        for button in sorted(self.links):
+            if labels[self.index(button)] not in reached:
+                found.append(f"button at {button} unreachable")
+        self.found = found
+        return found
+
+    def layout(self):
+        """
+        Returns:
+            LevelLayout: The level as edited so far.
+
+        Raises:
+            ValueError: If a wormhole has no pair.
+        """
+        if self.unpaired:
+            raise ValueError(f"level {self.name}: wormhole at {self.unpaired[0]} has no pair")
+        return LevelLayout(
+            self.name,
+            ["".join(self.grid[row * self.cols:(row + 1) * self.cols]) for row in range(self.rows)],
+            self.links,
+            self.wormholes,
+            start=self.start,
+            start_direction=self.start_direction,
+            hint=self.hint,
+            background=self.background,
+            par=self.par,
+        )
+
+    def save(self, path):
+        """
+        Writes the level to a level file, see core.layouts.save_layout.
+
+        Parameters:
+            path (str): The file to write.
+
+        Raises:
+            ValueError: If a wormhole has no pair.
+        """
+        save_layout(self.layout(), path)
@@ -0,0 +1,249 @@
+"""
+Makes new levels for students who have run out of built-in ones. A level is laid out at
+random from the same tiles as the built-in levels: wall segments, the bolt, doors shut by
+buttons and pairs of wormholes. It is only kept if the solver finds the bolt can be
+reached, its doors have to be opened on the way, and its shortest solution is as long as
+its difficulty asks for. Levels are made in parallel, one process per CPU, and saved as
+JSON files that core.layouts.load_layout reads back.
+
+Run it from the command line to make a folder of levels:
+
+    python -m core.generator 50 --difficulty medium --output generated_levels
+
+The game does not read that folder. A level is put into play by copying its file into
+level_data in place of one of the levels 1 to 5, see README.txt.
+"""
+import argparse
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from core.layouts import BOLT, BUTTON, DOOR, FLOOR, WALL, WORMHOLE, LevelLayout, save_layout
+from core.scoring import fewest_blocks
+from core.simulator import OFFSETS, Board
+from core.solver import solve
+
+# the size of the game's grid, and the cell the bot starts on facing up
+ROWS = 9
+COLS = 18
+START = (8, 17)
+
+# difficulty -> walls: the number of wall segments, doors: the number of door and button
+# pairs, wormholes: the number of wormhole pairs, steps: the fewest and most steps the
+# shortest solution may take
+DIFFICULTIES = {
+    "easy": {"walls": 6, "doors": 0, "wormholes": 0, "steps": (12, 35)},
+    "medium": {"walls": 10, "doors": 1, "wormholes": 1, "steps": (25, 60)},
+    "hard": {"walls": 14, "doors": 2, "wormholes": 2, "steps": (40, 120)},
+}
+
+# the most layouts tried for one level before giving up on it
+MAX_ATTEMPTS = 2000
+
+WORMHOLE_COLORS = (None, "red", "blue")
+
+# where made levels are saved for a teacher to look through; the game only plays level_data
+GENERATED_DIRECTORY = "generated_levels"
+
+
+def random_layout(rng, name, settings):
+    """
+    Lays out a level at random. Each door shuts in the bolt, or the button of the door
+    before it, by walling up the other sides of its tile, so the doors have to be opened
+    in turn.
+
+    Parameters:
+        rng (random.Random): The source of randomness.
+        name (str): The level identifier.
+        settings (dict): The difficulty's settings, see DIFFICULTIES.
+
+    Returns:
+        LevelLayout: The layout, or None if the tiles did not fit.
+    """
+    grid = [[FLOOR] * COLS for _ in range(ROWS)]
+
+    def free_cell():
+        cells = [
+            (row, col)
+            for row in range(ROWS)
+            for col in range(COLS)
+            if grid[row][col] == FLOOR and (row, col) != START
+        ]
+        return rng.choice(cells) if cells else None
+
+    for _ in range(settings["walls"]):
+        row, col = rng.randrange(ROWS), rng.randrange(COLS)
+        row_step, col_step = rng.choice(((0, 1), (1, 0)))
+        for _ in range(rng.randint(2, 6)):
+            if 0 <= row < ROWS and 0 <= col < COLS and (row, col) != START:
+                grid[row][col] = WALL
+            row, col = row + row_step, col + col_step
+
+    target = free_cell()
+    if target is None:
+        return None
+    grid[target[0]][target[1]] = BOLT
+
+    links = {}
+    for _ in range(settings["doors"]):
+        sides = [
+            (target[0] + row_offset, target[1] + col_offset)
+            for row_offset, col_offset in OFFSETS
+            if 0 <= target[0] + row_offset < ROWS and 0 <= target[1] + col_offset < COLS
+        ]
+        if START in sides or any(grid[row][col] not in (FLOOR, WALL) for row, col in sides):
+            return None
+        door = rng.choice(sides)
+        for row, col in sides:
+            grid[row][col] = DOOR if (row, col) == door else WALL
+        button = free_cell()
+        if button is None:
+            return None
+        grid[button[0]][button[1]] = BUTTON
+        links[button] = door
+        target = button
+
+    wormholes = []
+    for number in range(settings["wormholes"]):
+        pair = []
+        for _ in range(2):
+            cell = free_cell()
+            if cell is None:
+                return None
+            grid[cell[0]][cell[1]] = WORMHOLE
+            pair.append(cell)
+        wormholes.append((pair[0], pair[1], WORMHOLE_COLORS[number % len(WORMHOLE_COLORS)]))
+
+    return LevelLayout(name, ["".join(line) for line in grid], links, wormholes, start=START)
+
+
+def rate_layout(layout, settings):
+    """
+    Checks that a level can be solved, needs its doors and is as hard as its difficulty asks.
+
+    Parameters:
+        layout (LevelLayout): The level.
+        settings (dict): The difficulty's settings, see DIFFICULTIES.
+
+    Returns:
+        dict: The steps of the shortest solution and the fewest move and turn blocks that
+        solve the level, or None if the level is not good enough to keep.
+    """
+    board = layout.board()
+    actions = solve(board)
+    if actions is None:
+        return None
+    fewest, most = settings["steps"]
+    if not fewest <= len(actions) <= most:
+        return None
+    if board.doors:
+        # with every door shut for good the bolt must be out of reach
+        shut = Board(
+            board.rows,
+            board.cols,
+            walls=board.walls | board.doors,
+            bolts=board.bolts,
+            wormholes=board.wormholes,
+            start=board.start,
+            start_direction=board.start_direction,
+        )
+        if solve(shut) is not None:
+            return None
+    return {"steps": len(actions), "blocks": len(fewest_blocks(board))}
+
+
+def generate_level(seed, difficulty="medium"):
+    """
+    Makes one level, trying random layouts until one is good enough. The same seed always
+    gives the same level.
+
+    Parameters:
+        seed (int): Seeds the random layouts, and names the level.
+        difficulty (str): One of the keys of DIFFICULTIES. Defaults to "medium".
+
+    Returns:
+        tuple: (layout, rating), the level's layout as saved by LevelLayout.to_json and
+        its rating as given by rate_layout, or None if no layout was good enough.
+    """
+    settings = DIFFICULTIES[difficulty]
+    rng = random.Random(seed)
+    name = f"{difficulty}-{seed}"
+    for _ in range(MAX_ATTEMPTS):
+        layout = random_layout(rng, name, settings)
+        if layout is None:
+            continue
+        rating = rate_layout(layout, settings)
+        if rating is not None:
+            return layout.to_json(), rating
+    return None
+
+
+def generate_levels(count, difficulty="medium", seed=0, workers=None):
+    """
+    Makes levels in parallel.
+
+    Parameters:
+        count (int): The number of levels to make.
+        difficulty (str): One of the keys of DIFFICULTIES. Defaults to "medium".
+        seed (int): The seed of the first level; the others follow on. Defaults to 0.
+        workers (int, optional): The number of processes. Defaults to one per CPU.
+
+    Returns:
+        list: (layout, rating) tuples, see generate_level, for the levels that could be made.
+    """
+    if difficulty not in DIFFICULTIES:
+        raise ValueError(f"unknown difficulty {difficulty!r}")
+    seeds = range(seed, seed + count)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        levels = pool.map(generate_level, seeds, [difficulty] * count, chunksize=max(1, count // 32))
+        return [level for level in levels if level is not None]
+
+
+def save_levels(levels, directory=GENERATED_DIRECTORY):
+    """
+    Saves made levels as one JSON file each, named after the level.
+
+    Parameters:
+        levels (list): (layout, rating) tuples, as returned by generate_levels.
+        directory (str): The folder to save them in, created if needed.
+
+    Returns:
+        list: The paths of the files written.
+    """
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for data, rating in levels:
+        layout = LevelLayout.from_json(data)
+        path = os.path.join(directory, f"{layout.name}.json")
+        save_layout(layout, path, **rating)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    """
+    Runs the generator from the command line.
+
+    Parameters:
+        argv (list, optional): The command line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: The exit status, 0 if every level asked for was made and 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Make new ProBot levels.")
+    parser.add_argument("count", type=int, help="number of levels to make")
+    parser.add_argument("--difficulty", choices=sorted(DIFFICULTIES), default="medium", help="how hard the levels are")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first level, so runs can be repeated")
+    parser.add_argument("--workers", type=int, default=None, help="processes to use (default: one per CPU)")
+    parser.add_argument("--output", default=GENERATED_DIRECTORY, help="folder to save the levels in")
+    args = parser.parse_args(argv)
+
+    levels = generate_levels(args.count, args.difficulty, args.seed, args.workers)
+    paths = save_levels(levels, args.output)
+    print(f"{len(paths)} of {args.count} levels saved in {args.output}", file=sys.stderr)
+    return 0 if len(paths) == args.count else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
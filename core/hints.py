@@ -0,0 +1,185 @@
+from array import array
+from collections import deque
+
+from core.results import board_hash
+from core.simulator import MOVED, TURNED, TELEPORTED, PRESSED
+from core.solver import ACTIONS, start_state, successors
+
+# how far the bot is from the bolt in a state the bot cannot reach or cannot win from
+UNREACHABLE = -1
+
+# the most states a distance field is worked out for; every door doubles what a level can
+# have, and a level with many doors would take minutes to search and gigabytes to store
+MAX_STATES = 100000
+
+
+class DistanceField:
+    """
+    How far every state of a level is from collecting the bolt, and the best action to take
+    in it, worked out once so a hint can be given without searching.
+
+    States are those of core.solver. Only the states the bot can reach are stored: each is
+    given a slot, in the order the search finds it, in two flat arrays, so looking one up is
+    a dict lookup and two array reads.
+
+    Attributes:
+        board (Board): The level.
+        slots (dict): Maps each state the bot can reach to its slot.
+        distances (array): The fewest actions to the bolt from each state, or UNREACHABLE.
+        actions (array): The number in ACTIONS of the best action in each state, or -1.
+    """
+    def __init__(self, board, max_states=MAX_STATES):
+        """
+        Initializes a new DistanceField, searching the level.
+
+        Parameters:
+            board (Board): The level.
+            max_states (int): The most states to search. Defaults to MAX_STATES.
+
+        Raises:
+            ValueError: If the bot can reach more than max_states states.
+        """
+        self.board = board
+        self.slots = {}
+        self.distances = array("i")
+        self.actions = array("b")
+        self.search(max_states)
+
+    def slot(self, state):
+        """
+        Gives the place of a state in the arrays.
+
+        Parameters:
+            state (tuple): The state, see core.solver.start_state.
+
+        Returns:
+            int: The index into distances and actions, or None if the bot cannot reach the state.
+        """
+        return self.slots.get(state)
+
+    def search(self, max_states):
+        """
+        Fills in the arrays. Every state the bot can reach is found by searching forward from
+        the start, then a breadth first search runs backward from the states one action
+        from the bolt, so each state is reached first by one of its shortest ways home.
+
+        Parameters:
+            max_states (int): The most states to search.
+
+        Raises:
+            ValueError: If the bot can reach more than max_states states.
+        """
+        board = self.board
+        start = start_state(board)
+        parents = {start: []}
+        finishing = []
+        queue = deque([start])
+        while queue:
+            state = queue.popleft()
+            for action, following, solved in successors(board, state):
+                if solved:
+                    finishing.append((state, action))
+                    continue
+                if following not in parents:
+                    if len(parents) >= max_states:
+                        raise ValueError(f"the level has more than {max_states} states")
+                    parents[following] = []
+                    queue.append(following)
+                parents[following].append((state, action))
+
+        self.slots = {state: slot for slot, state in enumerate(parents)}
+        self.distances = array("i", [UNREACHABLE]) * len(parents)
+        self.actions = array("b", [-1]) * len(parents)
+
+        queue = deque()
+        for state, action in finishing:
+            slot = self.slot(state)
+            if self.distances[slot] == UNREACHABLE:
+                self.distances[slot] = 1
+                self.actions[slot] = ACTIONS.index(action)
+                queue.append(state)
+        while queue:
+            state = queue.popleft()
+            distance = self.distances[self.slot(state)] + 1
+            for parent, action in parents[state]:
+                slot = self.slot(parent)
+                if self.distances[slot] == UNREACHABLE:
+                    self.distances[slot] = distance
+                    self.actions[slot] = ACTIONS.index(action)
+                    queue.append(parent)
+
+    def distance(self, state):
+        """
+        Gives how many actions the bolt is away.
+
+        Parameters:
+            state (tuple): The bot's state.
+
+        Returns:
+            int: The fewest actions to collect the bolt, or UNREACHABLE.
+        """
+        slot = self.slot(state)
+        return UNREACHABLE if slot is None else self.distances[slot]
+
+    def next_action(self, state):
+        """
+        Gives the first action of a shortest way to the bolt.
+
+        Parameters:
+            state (tuple): The bot's state.
+
+        Returns:
+            str: One of the actions of core.solver, or None if the bolt cannot be reached.
+        """
+        slot = self.slot(state)
+        action = -1 if slot is None else self.actions[slot]
+        return ACTIONS[action] if action >= 0 else None
+
+
+def advance(board, state, event):
+    """
+    Follows a simulator event from one state to the next, so the state of the bot on screen
+    can be kept up to date while a run, or a replay of one, is shown.
+
+    Parameters:
+        board (Board): The level.
+        state (tuple): The state before the event.
+        event (Event): The event.
+
+    Returns:
+        tuple: The state after the event.
+    """
+    position, direction, doors, wormhole = state
+    if event.kind == MOVED:
+        position = board.index[event.cell]
+    elif event.kind == TURNED:
+        direction = event.direction
+    elif event.kind == TELEPORTED:
+        position = wormhole = board.index[event.cell]
+    elif event.kind == PRESSED and event.other is not None:
+        doors |= 1 << board.door_ids[event.other]
+    return (position, direction, doors, wormhole)
+
+
+# distance fields already worked out, by level hash, or None for levels with too many states
+fields = {}
+
+
+def distance_field(board):
+    """
+    Gives the distance field of a level, working it out the first time the level is asked about.
+
+    Parameters:
+        board (Board): The level.
+
+    Returns:
+        DistanceField: The level's distance field, or None if the level has too many states,
+        see MAX_STATES.
+    """
+    key = board_hash(board)
+    if key not in fields:
+        try:
+            fields[key] = DistanceField(board, MAX_STATES)
+        except ValueError:
+            fields[key] = None
+    return fields[key]
@@ -0,0 +1,149 @@
+from core.program import OPCODE_NAMES, TEST, COUNT_TEST
+from core.simulator import Simulator
+
+# how many of the latest steps an InstrumentedSimulator remembers
+RECENT_STEPS = 256
+
+
+class InstrumentedSimulator(Simulator):
+    """
+    A Simulator that also counts what the program did: how often each instruction ran, how
+    often each test came out true, how often the bot entered each tile, and the last few
+    steps in a ring buffer. Runs that do not need the counts use a plain Simulator, so the
+    counting costs nothing when it is not wanted.
+
+    Attributes:
+        hits (list): The number of times each instruction ran.
+        taken (list): The number of times each test instruction came out true.
+        visits (list): The number of times the bot entered each cell index, counting the start.
+        recent (list): The ring buffer of the latest steps, each (step, pc, position, direction),
+            where position is the cell index after the step.
+        recent_size (int): The most steps remembered.
+        recent_next (int): The slot of recent the next step is written to.
+    """
+    def __init__(self, board, program, detect_loops=True, recent_size=RECENT_STEPS):
+        """
+        Initializes a new InstrumentedSimulator.
+
+        Parameters:
+            board (Board): The level to play.
+            program (Program): The compiled program to run.
+            detect_loops (bool): Whether to end the run when the program loops forever.
+            recent_size (int): The most steps to remember. Defaults to RECENT_STEPS.
+        """
+        super().__init__(board, program, detect_loops)
+        self.hits = [0] * len(program.instructions)
+        self.taken = [0] * len(program.instructions)
+        self.visits = [0] * len(board.cells)
+        self.visits[self.position] = 1
+        self.recent = [None] * recent_size
+        self.recent_size = recent_size
+        self.recent_next = 0
+
+    def step(self):
+        """
+        Runs one step of the program and counts it.
+
+        Returns:
+            list: The events caused by the step.
+        """
+        if self.done:
+            return []
+        pc = self.pc
+        position = self.position
+        events = super().step()
+        self.hits[pc] += 1
+        op = self.program.instructions[pc].op
+        if (op == TEST or op == COUNT_TEST) and self.pc == pc + 1:
+            self.taken[pc] += 1
+        if self.position != position:
+            self.visits[self.position] += 1
+        self.recent[self.recent_next] = (self.steps, pc, self.position, self.direction)
+        self.recent_next = (self.recent_next + 1) % self.recent_size
+        return events
+
+    def recent_steps(self):
+        """
+        Lists the remembered steps, oldest first.
+
+        Returns:
+            list: (step, pc, position, direction) tuples.
+        """
+        ordered = self.recent[self.recent_next:] + self.recent[:self.recent_next]
+        return [entry for entry in ordered if entry is not None]
+
+    def block_hits(self):
+        """
+        Sums the counts by the code block each instruction was compiled from. A block that
+        compiles to several instructions, like a "for" block, is counted by its first one.
+
+        Returns:
+            dict: Maps each code block to its (hits, taken) counts.
+        """
+        counts = {}
+        for pc, instruction in enumerate(self.program.instructions):
+            if instruction.block is not None and instruction.block not in counts:
+                counts[instruction.block] = (self.hits[pc], self.taken[pc])
+        return counts
+
+    def snapshot(self):
+        """
+        Takes a copy of the run, counts included, so seeking back does not count steps twice.
+
+        Returns:
+            tuple: The snapshot.
+        """
+        return (
+            super().snapshot(),
+            tuple(self.hits),
+            tuple(self.taken),
+            tuple(self.visits),
+            tuple(self.recent),
+            self.recent_next,
+        )
+
+    def restore(self, snapshot):
+        """
+        Puts the run and its counts back to the point a snapshot was taken at.
+
+        Parameters:
+            snapshot (tuple): A snapshot taken by this simulator.
+        """
+        state, hits, taken, visits, recent, self.recent_next = snapshot
+        super().restore(state)
+        self.hits = list(hits)
+        self.taken = list(taken)
+        self.visits = list(visits)
+        self.recent = list(recent)
+
+    def export(self):
+        """
+        Gives the counts as plain data, ready to be written out as JSON.
+
+        Returns:
+            dict: The run's steps and outcome, a count per instruction, the visited tiles
+            and the remembered steps.
+        """
+        board = self.board
+        instructions = []
+        for pc, instruction in enumerate(self.program.instructions):
+            entry = {"pc": pc, "op": OPCODE_NAMES[instruction.op], "arg": instruction.arg, "hits": self.hits[pc]}
+            if instruction.op == TEST or instruction.op == COUNT_TEST:
+                entry["taken"] = self.taken[pc]
+            instructions.append(entry)
+        return {
+            "steps": self.steps,
+            "solved": self.solved,
+            "looping": self.looping,
+            "instructions": instructions,
+            "tiles": [
+                {"row": board.cells[index][0], "col": board.cells[index][1], "visits": count}
+                for index, count in enumerate(self.visits)
+                if count
+            ],
+            "recent": [
+                {"step": step, "pc": pc, "row": board.cells[position][0], "col": board.cells[position][1],
+                 "direction": direction}
+                for step, pc, position, direction in self.recent_steps()
+            ],
+        }
@@ -0,0 +1,468 @@
+import json
+import os
+import sys
+import time
+from collections.abc import Mapping
+
+from core.simulator import UP, Board
+
+
+def find_level_data():
+    """
+    Finds the folder holding the game's levels. Like images, it is looked for in the
+    current folder; a frozen build with no level_data next to it uses the copy bundled
+    into it by run.spec.
+
+    Returns:
+        str: The folder's path.
+    """
+    if getattr(sys, "frozen", False) and not os.path.isdir("level_data"):
+        return os.path.join(sys._MEIPASS, "level_data")
+    return "level_data"
+
+
+# the folder holding the game's levels, one JSON file per level named after the level
+LEVEL_DATA_DIRECTORY = find_level_data()
+
+# the background drawn behind levels that do not name their own
+DEFAULT_BACKGROUND = "game_screen.png"
+
+# the least time between two checks of the level files for changes, in seconds
+POLL_SECONDS = 0.5
+
+# tile characters
+FLOOR = "."
+WALL = "#"
+BOLT = "*"
+DOOR = "D"
+BUTTON = "B"
+WORMHOLE = "O"
+
+TILES = (FLOOR, WALL, BOLT, DOOR, BUTTON, WORMHOLE)
+
+
+class LevelLayout:
+    """
+    The definition of a level: what is on every tile and how the tiles are linked.
+
+    Attributes:
+        name (str): The level identifier, as used by the level select screen.
+        grid (tuple): One string per row, one tile character per column.
+        links (dict): Maps button cells to the door cell each one opens. Buttons not in
+            the dict open nothing.
+        wormholes (list): (cell, cell, color) triples, one per linked pair of wormholes, where
+            color is None for the default wormhole image, "red" or "blue".
+        start (tuple): The (row, col) cell the bot starts on.
+        start_direction (int): The direction the bot starts facing.
+        hint (str): The hint shown by the level's hint button, or None.
+        background (str): The image in images/menus drawn behind the level.
+        par (dict): The level's par as plain data, see core.scoring.layout_par, or None if
+            it has not been worked out.
+    """
+    def __init__(
+        self,
+        name,
+        grid,
+        links=None,
+        wormholes=(),
+        start=(8, 17),
+        start_direction=UP,
+        hint=None,
+        background=DEFAULT_BACKGROUND,
+        par=None,
+    ):
+        """
+        Initializes a new LevelLayout and checks that it is consistent.
+
+        Parameters:
+            name (str): The level identifier.
+            grid (iterable): The rows of tile characters.
+            links (dict, optional): Button cell -> door cell.
+            wormholes (iterable): (cell, cell, color) wormhole pairs.
+            start (tuple): The bot's starting cell. Defaults to the bottom right corner.
+            start_direction (int): The bot's starting direction. Defaults to UP.
+            hint (str, optional): The level's hint.
+            background (str): The background image. Defaults to DEFAULT_BACKGROUND.
+            par (dict, optional): The level's par.
+
+        Raises:
+            ValueError: If the grid is ragged, holds unknown tiles, or a link or wormhole
+                does not sit on a tile of the right kind.
+        """
+        self.name = name
+        self.grid = tuple(grid)
+        self.links = dict(links or {})
+        self.wormholes = [tuple(pair) for pair in wormholes]
+        self.start = start
+        self.start_direction = start_direction
+        self.hint = hint
+        self.background = background
+        self.par = par
+        self.validate()
+
+    @property
+    def rows(self):
+        """
+        int: The number of rows in the grid.
+        """
+        return len(self.grid)
+
+    @property
+    def cols(self):
+        """
+        int: The number of columns in the grid.
+        """
+        return len(self.grid[0])
+
+    def tile(self, cell):
+        """
+        Returns the tile character on a cell.
+
+        Parameters:
+            cell (tuple): The (row, col) cell.
+
+        Returns:
+            str: The tile character.
+        """
+        return self.grid[cell[0]][cell[1]]
+
+    def cells(self, tile):
+        """
+        Lists the cells holding a kind of tile, in reading order.
+
+        Parameters:
+            tile (str): The tile character.
+
+        Returns:
+            list: The (row, col) cells.
+        """
+        return [
+            (row, col)
+            for row, line in enumerate(self.grid)
+            for col, character in enumerate(line)
+            if character == tile
+        ]
+
+    def validate(self):
+        """
+        Checks that the grid is rectangular and that links and wormholes match their tiles.
+
+        Raises:
+            ValueError: If the layout is not consistent.
+        """
+        if not self.grid or any(len(line) != len(self.grid[0]) for line in self.grid):
+            raise ValueError(f"level {self.name}: the grid must be a non-empty rectangle")
+        for line in self.grid:
+            for character in line:
+                if character not in TILES:
+                    raise ValueError(f"level {self.name}: unknown tile {character!r}")
+
+        for button, door in self.links.items():
+            if self.tile(button) != BUTTON or self.tile(door) != DOOR:
+                raise ValueError(f"level {self.name}: {button} does not link a button to a door")
+
+        paired = []
+        for first, second, _ in self.wormholes:
+            paired += [first, second]
+        if sorted(paired) != self.cells(WORMHOLE):
+            raise ValueError(f"level {self.name}: every wormhole must be in exactly one pair")
+
+        if not (0 <= self.start[0] < self.rows and 0 <= self.start[1] < self.cols):
+            raise ValueError(f"level {self.name}: the start is off the grid")
+
+    def to_json(self):
+        """
+        Returns:
+            dict: The layout as plain data for saving, with cells as [row, col] lists.
+        """
+        return {
+            "name": self.name,
+            "grid": list(self.grid),
+            "links": [[list(button), list(door)] for button, door in self.links.items()],
+            "wormholes": [[list(first), list(second), color] for first, second, color in self.wormholes],
+            "start": list(self.start),
+            "start_direction": self.start_direction,
+            "hint": self.hint,
+            "background": self.background,
+            "par": self.par,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Parameters:
+            data (dict): A layout saved by to_json. Keys it does not know are ignored.
+
+        Returns:
+            LevelLayout: The layout.
+
+        Raises:
+            ValueError: If the layout is not consistent.
+        """
+        return cls(
+            data["name"],
+            data["grid"],
+            links={tuple(button): tuple(door) for button, door in data.get("links", [])},
+            wormholes=[(tuple(first), tuple(second), color) for first, second, color in data.get("wormholes", [])],
+            start=tuple(data.get("start", (8, 17))),
+            start_direction=data.get("start_direction", UP),
+            hint=data.get("hint"),
+            background=data.get("background", DEFAULT_BACKGROUND),
+            par=data.get("par"),
+        )
+
+    def board(self):
+        """
+        Builds the simulator's view of the level.
+
+        Returns:
+            Board: The walls, bolts, doors, buttons and wormholes of the level.
+        """
+        wormholes = {}
+        for first, second, _ in self.wormholes:
+            wormholes[first] = second
+            wormholes[second] = first
+        return Board(
+            self.rows,
+            self.cols,
+            walls=self.cells(WALL),
+            bolts=self.cells(BOLT),
+            doors=self.cells(DOOR),
+            buttons={cell: self.links.get(cell) for cell in self.cells(BUTTON)},
+            wormholes=wormholes,
+            start=self.start,
+            start_direction=self.start_direction,
+        )
+
+
+def save_layout(layout, path, **extra):
+    """
+    Writes a level layout to a JSON file, laid out with one row of the grid per line so the
+    file can be read and edited by hand.
+
+    Parameters:
+        layout (LevelLayout): The layout.
+        path (str): The file to write.
+        **extra: More keys to save alongside the layout, such as how hard the level is.
+    """
+    lines = []
+    for key, value in dict(layout.to_json(), **extra).items():
+        if key == "grid":
+            rows = ",\n".join(f"    {json.dumps(row)}" for row in value)
+            lines.append(f'  "grid": [\n{rows}\n  ]')
+        else:
+            lines.append(f"  {json.dumps(key)}: {json.dumps(value)}")
+    with open(path, "w") as file:
+        file.write("{\n" + ",\n".join(lines) + "\n}\n")
+
+
+def load_layout(path):
+    """
+    Reads a level layout from a JSON file written by save_layout.
+
+    Parameters:
+        path (str): The file to read.
+
+    Returns:
+        LevelLayout: The layout.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file does not hold a consistent layout.
+    """
+    with open(path) as file:
+        data = json.load(file)
+    try:
+        return LevelLayout.from_json(data)
+    except (KeyError, TypeError) as error:
+        raise ValueError(f"{path}: not a level layout ({error})")
+
+
+class LevelRegistry(Mapping):
+    """
+    The levels of the game by name, read from a folder of level files. Listing the folder
+    only reads the file names; a file is parsed the first time its level is looked up, and
+    the layout is kept for later lookups. Layouts can also be added in code.
+
+    While the game runs, poll checks the files that have been parsed for changes, by their
+    modification time and size, and parses a changed file again, so a level can be edited
+    and played without restarting the game.
+
+    A registry is a read only mapping from level name to LevelLayout, like a dict.
+
+    Attributes:
+        directory (str): The folder of level files, each named after its level.
+        paths (dict): Maps each level name to its file, once the folder has been listed.
+        layouts (dict): The layouts parsed or added so far, by name.
+        stamps (dict): The (modification time, size) of each parsed file when it was read,
+            by level name.
+        directory_stamp (int): The folder's modification time when it was listed.
+        polled (float): When poll last checked the files, or None.
+    """
+    def __init__(self, directory=LEVEL_DATA_DIRECTORY):
+        """
+        Initializes a new LevelRegistry. The folder is not read until a level is asked for.
+
+        Parameters:
+            directory (str): The folder of level files. Defaults to LEVEL_DATA_DIRECTORY.
+        """
+        self.directory = directory
+        self.paths = None
+        self.layouts = {}
+        self.stamps = {}
+        self.directory_stamp = None
+        self.polled = None
+
+    def index(self):
+        """
+        Lists the level files, the first time it is called.
+
+        Returns:
+            dict: Level name -> file.
+        """
+        if self.paths is None:
+            self.paths = {}
+            if os.path.isdir(self.directory):
+                self.directory_stamp = os.stat(self.directory).st_mtime_ns
+                for file_name in sorted(os.listdir(self.directory)):
+                    name, extension = os.path.splitext(file_name)
+                    if extension == ".json":
+                        self.paths[name] = os.path.join(self.directory, file_name)
+        return self.paths
+
+    def add(self, layout):
+        """
+        Registers a layout under its name, in place of any file of the same name. If that
+        file has been parsed and later changes, poll replaces the layout again.
+
+        Parameters:
+            layout (LevelLayout): The layout.
+        """
+        self.layouts[layout.name] = layout
+
+    def parse(self, name):
+        """
+        Reads a level's file and keeps its layout, noting the file's modification time and
+        size as they were before reading, so a change made while reading is seen next time.
+
+        Parameters:
+            name (str): The level name.
+
+        Returns:
+            LevelLayout: The layout.
+
+        Raises:
+            KeyError: If there is no file for the level.
+            ValueError: If the file does not hold a consistent layout of the level.
+        """
+        path = self.index()[name]
+        stamp = file_stamp(path)
+        layout = load_layout(path)
+        if layout.name != name:
+            raise ValueError(f"{path}: holds level {layout.name}, not {name}")
+        self.layouts[name] = layout
+        self.stamps[name] = stamp
+        return layout
+
+    def reload_changed(self):
+        """
+        Parses again the files changed since they were read, and lists the folder again if
+        files were added or removed. A file that cannot be parsed, perhaps because it is
+        still being written, leaves the level as it was.
+
+        Returns:
+            list: The names of the levels whose layouts were replaced.
+        """
+        if self.paths is not None and os.path.isdir(self.directory):
+            if os.stat(self.directory).st_mtime_ns != self.directory_stamp:
+                self.paths = None
+                self.index()
+        reloaded = []
+        for name, stamp in list(self.stamps.items()):
+            path = self.index().get(name)
+            if path is None or file_stamp(path) in (stamp, None):
+                continue
+            try:
+                self.parse(name)
+            except (OSError, ValueError):
+                self.stamps[name] = file_stamp(path)
+                continue
+            reloaded.append(name)
+        return reloaded
+
+    def poll(self):
+        """
+        Calls reload_changed, at most once every POLL_SECONDS, so it can be called every frame.
+
+        Returns:
+            list: The names of the levels whose layouts were replaced.
+        """
+        now = time.monotonic()
+        if self.polled is not None and now - self.polled < POLL_SECONDS:
+            return []
+        self.polled = now
+        return self.reload_changed()
+
+    def __getitem__(self, name):
+        if name not in self.layouts:
+            return self.parse(name)
+        return self.layouts[name]
+
+    def __contains__(self, name):
+        return name in self.layouts or name in self.index()
+
+    def __iter__(self):
+        names = list(self.index())
+        return iter(names + [name for name in self.layouts if name not in names])
+
+    def __len__(self):
+        return len(set(self.index()) | set(self.layouts))
+
+
+def file_stamp(path):
+    """
+    Parameters:
+        path (str): A file.
+
+    Returns:
+        tuple: The file's (modification time in nanoseconds, size), or None if it is gone.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+LAYOUTS = LevelRegistry()
+
+
+def add_layout(layout):
+    """
+    Registers a level layout under its name.
+
+    Parameters:
+        layout (LevelLayout): The layout to register.
+
+    Returns:
+        LevelLayout: The layout, for chaining.
+    """
+    LAYOUTS.add(layout)
+    return layout
+
+
+def get_layout(name):
+    """
+    Looks up a level layout by name.
+
+    Parameters:
+        name (str): The level identifier, such as "1" or "tutorial".
+
+    Returns:
+        LevelLayout: The layout.
+
+    Raises:
+        KeyError: If there is no level with that name.
+        ValueError: If the level's file does not hold a consistent layout.
+    """
+    return LAYOUTS[name]
@@ -0,0 +1,219 @@
+"""
+A peephole optimizer for compiled programs. Student programs are full of blocks that do
+nothing or could be one block: "turn 5" is "turn 1", two moves in a row are one longer
+move, "turn 2" twice is no turn at all and a "for" loop around a move is one long move.
+The optimized program takes fewer steps to do the same thing.
+
+Every rewrite keeps the tile events of a run the same, and in the same order: the bot's
+moves, teleports, button presses and collecting the bolt, each with the direction the bot
+faced. Turn events can change, since turns are folded together, but the bot faces the same
+way whenever it moves or a condition is checked, and at the end. Whether the bolt is
+collected and whether the program loops forever stay the same; the number of steps does not.
+
+The rewrites, each only made where nothing jumps into the middle of what it changes:
+
+- A move of no tiles, a turn by a whole number of circles, a test of "true" and a jump or
+  test whose target is the next instruction do nothing, so they are dropped. A turn by more
+  than three is taken mod 4.
+- Two moves in a row are one move of both lengths: a move stops early only where the way
+  ahead is blocked, and then the second move does not go anywhere either. Two turns in a
+  row are one turn.
+- A "for" loop with a fixed count around moves only is one move of count times the body's
+  tiles, and likewise for turns. Other bodies of moves and turns are written out count times
+  if that is short enough. A loop that runs no times is dropped.
+- Instructions that can never be reached, such as those after a "while true" loop, are dropped.
+"""
+from core.program import COUNT_RESET, COUNT_TEST, JUMP, MOVE, TEST, TURN, Instruction, Program
+from core.simulator import TURNED
+
+# the most instructions a "for" loop may be written out into
+UNROLL_LIMIT = 32
+
+
+def splice(instructions, start, end, replacement):
+    """
+    Replaces a run of instructions, moving jump targets to match. A target inside the run
+    is moved to the start of the replacement.
+
+    Parameters:
+        instructions (list): The instructions, changed in place.
+        start (int): The index of the first instruction replaced.
+        end (int): The index after the last instruction replaced.
+        replacement (list): The new instructions.
+    """
+    shift = len(replacement) - (end - start)
+    instructions[start:end] = replacement
+    for instruction in instructions:
+        target = instruction.target
+        if target is None or target < start:
+            continue
+        instruction.target = start if target < end else target + shift
+
+
+def targets(instructions):
+    """
+    Returns:
+        set: The indexes jumped to by any instruction.
+    """
+    return {instruction.target for instruction in instructions if instruction.target is not None}
+
+
+def drop_no_ops(instructions):
+    """
+    Drops one instruction that does nothing, or takes a turn mod 4.
+
+    Returns:
+        bool: True if the program changed.
+    """
+    reset_slots = {instruction.arg for instruction in instructions if instruction.op == COUNT_RESET}
+    for index, instruction in enumerate(instructions):
+        op = instruction.op
+        if op == TURN and not 0 <= instruction.arg < 4:
+            instruction.arg %= 4
+            return True
+        if (
+            (op == MOVE and instruction.arg <= 0)
+            or (op == TURN and instruction.arg == 0)
+            or (op == TEST and instruction.arg == "true")
+            or (op in (TEST, JUMP) and instruction.target == index + 1)
+            # an "if" with a count and an empty body: its counter is never seen
+            or (op == COUNT_TEST and instruction.target == index + 1 and instruction.arg[0] not in reset_slots)
+        ):
+            splice(instructions, index, index + 1, [])
+            return True
+    return False
+
+
+def merge_runs(instructions):
+    """
+    Joins one pair of moves, or turns, that follow each other.
+
+    Returns:
+        bool: True if the program changed.
+    """
+    jumped_to = targets(instructions)
+    for index in range(len(instructions) - 1):
+        first, second = instructions[index], instructions[index + 1]
+        if first.op == second.op and first.op in (MOVE, TURN) and index + 1 not in jumped_to:
+            merged = first.arg + second.arg
+            instructions[index] = Instruction(first.op, merged % 4 if first.op == TURN else merged, block=first.block)
+            splice(instructions, index + 1, index + 2, [])
+            return True
+    return False
+
+
+def collapse_loop(instructions):
+    """
+    Replaces one "for" loop with a fixed count around moves and turns by what it does.
+
+    A compiled "for" loop is a COUNT_RESET, a COUNT_TEST that leaves the loop, the body and
+    a JUMP back to the COUNT_TEST.
+
+    Returns:
+        bool: True if the program changed.
+    """
+    for index in range(len(instructions) - 2):
+        reset, test = instructions[index], instructions[index + 1]
+        if reset.op != COUNT_RESET or test.op != COUNT_TEST or test.arg[0] != reset.arg:
+            continue
+        end = test.target
+        back = instructions[end - 1]
+        if back.op != JUMP or back.target != index + 1:
+            # the loop never ends, and the code after it has been dropped
+            continue
+        body = instructions[index + 2:end - 1]
+        if any(instruction.op not in (MOVE, TURN) for instruction in body):
+            continue
+        # nothing but the loop's own jump back may land inside the loop
+        inside = [
+            instruction.target
+            for number, instruction in enumerate(instructions)
+            if instruction.target is not None and index < instruction.target < end and number != end - 1
+        ]
+        if inside:
+            continue
+
+        count = test.arg[1]
+        ops = {instruction.op for instruction in body}
+        if count <= 0 or not body:
+            replacement = []
+        elif len(ops) == 1:
+            op = ops.pop()
+            total = count * sum(instruction.arg for instruction in body)
+            replacement = [Instruction(op, total % 4 if op == TURN else total, block=body[0].block)]
+        elif count * len(body) <= UNROLL_LIMIT:
+            replacement = [
+                Instruction(instruction.op, instruction.arg, block=instruction.block)
+                for _ in range(count)
+                for instruction in body
+            ]
+        else:
+            continue
+        splice(instructions, index, end, replacement)
+        return True
+    return False
+
+
+def drop_unreachable(instructions):
+    """
+    Drops the instructions no run can get to.
+
+    Returns:
+        bool: True if the program changed.
+    """
+    reached = set()
+    stack = [0]
+    while stack:
+        index = stack.pop()
+        if index in reached or index >= len(instructions):
+            continue
+        reached.add(index)
+        instruction = instructions[index]
+        if instruction.op == JUMP:
+            stack.append(instruction.target)
+            continue
+        stack.append(index + 1)
+        if instruction.target is not None and not (instruction.op == TEST and instruction.arg == "true"):
+            stack.append(instruction.target)
+
+    unreached = [index for index in range(len(instructions)) if index not in reached]
+    for index in reversed(unreached):
+        splice(instructions, index, index + 1, [])
+    return bool(unreached)
+
+
+# tried in order, so each rewrite only sees programs the ones before it no longer apply to:
+# merge_runs relies on moves of no tiles having been dropped
+REWRITES = (drop_no_ops, merge_runs, collapse_loop, drop_unreachable)
+
+
+def optimize_program(program):
+    """
+    Makes an optimized copy of a compiled program, applying the rewrites until none applies.
+
+    Parameters:
+        program (Program): The compiled program, which is left as it is.
+
+    Returns:
+        Program: A program with the same tile events that takes no more steps.
+    """
+    instructions = [
+        Instruction(instruction.op, instruction.arg, instruction.target, instruction.block)
+        for instruction in program.instructions
+    ]
+    while any(rewrite(instructions) for rewrite in REWRITES):
+        pass
+    return Program(instructions, program.counter_count)
+
+
+def tile_events(events):
+    """
+    Leaves out the turn events of a run, which optimize_program may change.
+
+    Parameters:
+        events (list): A run's events.
+
+    Returns:
+        list: The other events, in order.
+    """
+    return [event for event in events if event.kind != TURNED]
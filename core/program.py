@@ -0,0 +1,220 @@
+# opcodes
+MOVE = 0  # arg: number of tiles
+TURN = 1  # arg: number of 90 degree turns
+TEST = 2  # arg: condition name, target: where to go when the condition is false
+JUMP = 3  # target: where to go
+COUNT_RESET = 4  # arg: counter slot to reset when a counted loop is entered
+COUNT_TEST = 5  # arg: (counter slot, limit), target: where to go once the count is used up
+
+OPCODE_NAMES = {
+    MOVE: "move",
+    TURN: "turn",
+    TEST: "test",
+    JUMP: "jump",
+    COUNT_RESET: "count_reset",
+    COUNT_TEST: "count_test",
+}
+
+CONDITIONS = ("wall ahead", "wall not ahead", "button is pressed", "door is open", "true")
+
+# end block command -> the block command it closes
+END_COMMANDS = {
+    "endif": "if",
+    "endelse": "else",
+    "endwhile": "while",
+    "endfor": "for",
+}
+
+
+class CompileError(Exception):
+    """
+    Raised when the block chain is not a well formed program, such as a loop without
+    its end block. The message is short enough to show to the student as is.
+    """
+
+
+class Instruction:
+    """
+    A single compiled instruction.
+
+    Attributes:
+        op (int): The opcode.
+        arg: The operand, see the opcode constants.
+        target (int): The instruction index to jump to, for jumps and tests.
+        block: The code block the instruction was compiled from, if any.
+    """
+    __slots__ = ("op", "arg", "target", "block")
+
+    def __init__(self, op, arg=None, target=None, block=None):
+        """
+        Initializes a new Instruction.
+
+        Parameters:
+            op (int): The opcode.
+            arg: The operand.
+            target (int, optional): The jump target.
+            block (CodeBlock, optional): The source code block.
+        """
+        self.op = op
+        self.arg = arg
+        self.target = target
+        self.block = block
+
+    def __repr__(self):
+        text = OPCODE_NAMES[self.op]
+        if self.arg is not None:
+            text += f" {self.arg!r}"
+        if self.target is not None:
+            text += f" -> {self.target}"
+        return f"<{text}>"
+
+
+class Program:
+    """
+    A compiled student program.
+
+    Attributes:
+        instructions (list): The flat list of Instruction objects.
+        counter_count (int): The number of counter slots used by counted loops and conditions.
+    """
+    def __init__(self, instructions, counter_count):
+        """
+        Initializes a new Program.
+
+        Parameters:
+            instructions (list): The compiled instructions.
+            counter_count (int): The number of counter slots the program needs.
+        """
+        self.instructions = instructions
+        self.counter_count = counter_count
+
+    def new_counters(self):
+        """
+        Creates a fresh set of counters for a run of the program.
+
+        Returns:
+            list: One zeroed counter per slot.
+        """
+        return [0] * self.counter_count
+
+    def __len__(self):
+        return len(self.instructions)
+
+
+def read_blocks(start_block):
+    """
+    Walks the chain of blocks hanging off the start block.
+
+    Parameters:
+        start_block (CodeBlock): The start block, already linked by Level.get_user_code.
+
+    Returns:
+        list: A (command, value, block) tuple per block, where value is the text typed into a
+        move or turn block, the selected condition of a conditional block, or None.
+    """
+    source = []
+    block = start_block.next
+    while block is not None:
+        if block.command in ("move", "turn"):
+            value = block.input_box.user_text
+        elif block.command in ("if", "while", "for"):
+            value = block.drop_down1.main
+        else:
+            value = None
+        source.append((block.command, value, block))
+        block = block.next
+    return source
+
+
+def compile_program(source):
+    """
+    Compiles a sequence of blocks into a Program.
+
+    An "else" block must directly follow the "endif" of the "if" it belongs to, and runs
+    its body only when that condition was false. Numeric conditions count: loops reset their
+    counter every time they are entered, while an "if" counts over the whole run.
+
+    Parameters:
+        source (list): (command, value) or (command, value, block) tuples, as returned by read_blocks.
+
+    Returns:
+        Program: The compiled program.
+
+    Raises:
+        ValueError: If a move, turn or numeric condition does not hold a whole number,
+            or no condition was selected.
+        CompileError: If the blocks are not properly nested.
+    """
+    source = [tuple(entry) + (None,) * (3 - len(entry)) for entry in source]
+    instructions = []
+    counter_count = 0
+    # (command, index of the instruction whose target the end block fills in)
+    open_blocks = []
+
+    index = 0
+    while index < len(source):
+        command, value, block = source[index]
+
+        if command == "move":
+            instructions.append(Instruction(MOVE, int(value), block=block))
+
+        elif command == "turn":
+            instructions.append(Instruction(TURN, int(value), block=block))
+
+        elif command in ("if", "while", "for"):
+            if _is_number(value):
+                slot = counter_count
+                counter_count += 1
+                if command != "if":
+                    instructions.append(Instruction(COUNT_RESET, slot, block=block))
+                open_blocks.append((command, len(instructions)))
+                instructions.append(
+                    Instruction(COUNT_TEST, (slot, int(value)), block=block)
+                )
+            elif value in CONDITIONS:
+                open_blocks.append((command, len(instructions)))
+                instructions.append(Instruction(TEST, value, block=block))
+            else:
+                raise ValueError(f"no condition selected for {command} block")
+
+        elif command in END_COMMANDS:
+            if not open_blocks:
+                raise CompileError("Missing Start Block")
+            opened, test_index = open_blocks.pop()
+            if opened != END_COMMANDS[command]:
+                raise CompileError("Mismatched End Block")
+
+            if command in ("endwhile", "endfor"):
+                instructions.append(Instruction(JUMP, target=test_index, block=block))
+                instructions[test_index].target = len(instructions)
+
+            elif command == "endif" and index + 1 < len(source) and source[index + 1][0] == "else":
+                # the true branch skips over the else body
+                index += 1
+                open_blocks.append(("else", len(instructions)))
+                instructions.append(Instruction(JUMP, block=source[index][2]))
+                instructions[test_index].target = len(instructions)
+
+            else:
+                instructions[test_index].target = len(instructions)
+
+        elif command == "else":
+            raise CompileError("Else Without If")
+
+        else:
+            raise CompileError(f"Unknown Block {command}")
+
+        index += 1
+
+    if open_blocks:
+        raise CompileError("Missing End Block")
+
+    return Program(instructions, counter_count)
+
+
+def _is_number(value):
+    try:
+        int(value)
+    except (TypeError, ValueError):
+        return False
+    return True
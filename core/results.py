@@ -0,0 +1,270 @@
+import hashlib
+import os
+
+from core.cache import CACHE_DIRECTORY, DiskCache
+from core.simulator import SIMULATOR_VERSION, Event, Simulator
+
+RESULTS_DIRECTORY = os.path.join(CACHE_DIRECTORY, "results")
+
+
+def board_hash(board):
+    """
+    Hashes everything about a level that can change how a program runs on it.
+
+    Parameters:
+        board (Board): The level.
+
+    Returns:
+        str: A hex digest, equal for equal levels.
+    """
+    text = repr((
+        board.rows,
+        board.cols,
+        sorted(board.walls),
+        sorted(board.bolts),
+        sorted(board.doors),
+        sorted(board.buttons.items(), key=lambda item: item[0]),
+        sorted(board.wormholes.items()),
+        board.start,
+        board.start_direction,
+    ))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def program_hash(program):
+    """
+    Hashes a compiled program. Programs are hashed after compiling, so block positions,
+    spacing in the number boxes and the like do not tell equal programs apart.
+
+    Parameters:
+        program (Program): The compiled program.
+
+    Returns:
+        str: A hex digest, equal for programs that compile the same.
+    """
+    text = repr([(i.op, i.arg, i.target) for i in program.instructions])
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def result_key(board, program):
+    """
+    Gives the cache key of a program's run on a level. The key includes the simulator's
+    version, so a change to the rules does not replay runs made under the old ones.
+
+    Parameters:
+        board (Board): The level.
+        program (Program): The compiled program.
+
+    Returns:
+        str: The key.
+    """
+    return f"v{SIMULATOR_VERSION}-{board_hash(board)[:32]}-{program_hash(program)[:32]}"
+
+
+def encode_trace(events):
+    """
+    Packs events into plain lists for storing as JSON.
+
+    Parameters:
+        events (list): The Event objects.
+
+    Returns:
+        list: One [kind, row, col, direction] list per event, followed by the other
+        cell's row and col when the event has one.
+    """
+    packed = []
+    for event in events:
+        entry = [event.kind, event.cell[0], event.cell[1], event.direction]
+        if event.other is not None:
+            entry += [event.other[0], event.other[1]]
+        packed.append(entry)
+    return packed
+
+
+def decode_trace(packed):
+    """
+    Unpacks events packed by encode_trace.
+
+    Parameters:
+        packed (list): The packed events.
+
+    Returns:
+        list: The Event objects.
+    """
+    events = []
+    for entry in packed:
+        other = (entry[4], entry[5]) if len(entry) > 4 else None
+        events.append(Event(entry[0], (entry[1], entry[2]), entry[3], other))
+    return events
+
+
+class RunResult:
+    """
+    How a finished run of a program on a level went.
+
+    Attributes:
+        solved (bool): True if the bolt was collected.
+        looping (bool): True if the program was found to loop forever.
+        steps (int): The number of simulator steps the run took.
+        trace (list): Every event of the run, in order.
+    """
+    def __init__(self, solved, looping, steps, trace):
+        """
+        Initializes a new RunResult.
+
+        Parameters:
+            solved (bool): True if the bolt was collected.
+            looping (bool): True if the program loops forever.
+            steps (int): The number of steps taken.
+            trace (list): The run's events.
+        """
+        self.solved = solved
+        self.looping = looping
+        self.steps = steps
+        self.trace = trace
+
+    @classmethod
+    def from_simulator(cls, simulator, trace):
+        """
+        Records the result of a finished simulator.
+
+        Parameters:
+            simulator (Simulator): The simulator, after its run.
+            trace (list): The events it returned.
+
+        Returns:
+            RunResult: The result.
+        """
+        return cls(simulator.solved, simulator.looping, simulator.steps, list(trace))
+
+    def to_json(self):
+        """
+        Returns:
+            dict: The result as plain data for storing.
+        """
+        return {
+            "solved": self.solved,
+            "looping": self.looping,
+            "steps": self.steps,
+            "trace": encode_trace(self.trace),
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Parameters:
+            data (dict): A result stored by to_json.
+
+        Returns:
+            RunResult: The result.
+        """
+        return cls(data["solved"], data["looping"], data["steps"], decode_trace(data["trace"]))
+
+
+class ResultCache:
+    """
+    Remembers how programs ran on levels, so an unchanged program is not simulated again.
+    Only runs that finished are stored, since a run cut short by a step limit says nothing
+    about how the program ends.
+
+    Attributes:
+        cache (DiskCache): Where the results are kept.
+    """
+    def __init__(self, cache=None):
+        """
+        Initializes a new ResultCache.
+
+        Parameters:
+            cache (DiskCache, optional): Where to keep the results. Defaults to the shared
+                results folder, so the game and the tools reuse each other's runs.
+        """
+        self.cache = cache if cache is not None else DiskCache(RESULTS_DIRECTORY)
+
+    def get(self, board, program):
+        """
+        Looks up a run.
+
+        Parameters:
+            board (Board): The level.
+            program (Program): The compiled program.
+
+        Returns:
+            RunResult: The stored result, or None if the run is not cached.
+        """
+        data = self.cache.get(result_key(board, program))
+        if data is None:
+            return None
+        try:
+            return RunResult.from_json(data)
+        except (KeyError, IndexError, TypeError):
+            return None
+
+    def put(self, board, program, result):
+        """
+        Stores the result of a finished run.
+
+        Parameters:
+            board (Board): The level.
+            program (Program): The compiled program.
+            result (RunResult): The result.
+        """
+        self.cache.put(result_key(board, program), result.to_json())
+
+    def run(self, board, program, max_steps=None):
+        """
+        Gives the result of running a program, simulating it only if it is not cached.
+
+        Parameters:
+            board (Board): The level.
+            program (Program): The compiled program.
+            max_steps (int, optional): The most steps to simulate, or None for no limit.
+
+        Returns:
+            RunResult: The result, or None if the run did not finish within max_steps.
+        """
+        result = self.get(board, program)
+        if result is None:
+            simulator = Simulator(board, program)
+            trace = simulator.run(max_steps)
+            if not simulator.done:
+                return None
+            result = RunResult.from_simulator(simulator, trace)
+            self.put(board, program, result)
+        return result
+
+
+class Replay:
+    """
+    Plays back a cached run in place of a Simulator, so the renderer can show it the same way.
+
+    Attributes:
+        result (RunResult): The run being played back.
+        done (bool): True once every event has been handed out.
+        solved (bool): True if the run collected the bolt.
+        looping (bool): True if the run loops forever.
+        steps (int): The number of steps of the original run.
+    """
+    def __init__(self, result):
+        """
+        Initializes a new Replay.
+
+        Parameters:
+            result (RunResult): The cached run.
+        """
+        self.result = result
+        self.done = False
+        self.solved = result.solved
+        self.looping = result.looping
+        self.steps = result.steps
+
+    def step(self):
+        """
+        Hands out the whole run at once; the renderer paces the animation itself.
+
+        Returns:
+            list: Every event of the run, or nothing once they have been handed out.
+        """
+        if self.done:
+            return []
+        self.done = True
+        return list(self.result.trace)
@@ -0,0 +1,151 @@
+import pickle
+
+# where each kind of block sits in the palette below the level; a block still there is locked
+PALETTE_POSITIONS = {
+    "move": (120, 515),
+    "turn": (245, 515),
+    "if": (370, 515),
+    "endif": (495, 515),
+    "else": (620, 515),
+    "endelse": (745, 515),
+    "while": (120, 560),
+    "endwhile": (245, 560),
+    "for": (370, 560),
+    "endfor": (495, 560),
+}
+
+# the midbottom of the start block, and the height of every block image
+START_POSITION = (890, 280)
+BLOCK_HEIGHT = 40
+
+
+class SavedBlock:
+    """
+    A code block as stored by the save button, without any of its pygame state.
+
+    Attributes:
+        command (str): The block's command, such as "move" or "endwhile".
+        position (tuple): The (x, y) midbottom of the block.
+        value (str): The text typed into a move or turn block or the selected condition, or None.
+        locked (bool): True if the block is still in the palette rather than placed by the user.
+        next (SavedBlock): The block linked below this one, or None.
+    """
+    def __init__(self, command, position, value=None):
+        """
+        Initializes a new SavedBlock.
+
+        Parameters:
+            command (str): The block's command.
+            position (tuple): The (x, y) midbottom of the block.
+            value (str, optional): The block's number or condition.
+        """
+        self.command = command
+        self.position = tuple(position)
+        self.value = value
+        self.locked = self.position == PALETTE_POSITIONS.get(command)
+        self.next = None
+
+    @property
+    def top(self):
+        """
+        int: The y coordinate of the block's top edge.
+        """
+        return self.position[1] - BLOCK_HEIGHT
+
+    @property
+    def bottom(self):
+        """
+        int: The y coordinate of the block's bottom edge.
+        """
+        return self.position[1]
+
+
+class _SavedBlockUnpickler(pickle.Unpickler):
+    """
+    Unpickles saved block lists while refusing to build any object but paths, which are
+    read back as plain strings. Saved files may come from other machines, so nothing
+    else in them is trusted.
+    """
+    def find_class(self, module, name):
+        if module == "pathlib":
+            return lambda *parts: "/".join(str(part) for part in parts)
+        raise pickle.UnpicklingError(f"saved block lists cannot hold {module}.{name}")
+
+
+def read_saved_blocks(path):
+    """
+    Reads the blocks stored in a block_list_{level}.pickle file.
+
+    Parameters:
+        path (str or Path): The saved file.
+
+    Returns:
+        list: A SavedBlock per stored block, in the order they were saved.
+
+    Raises:
+        OSError: If the file cannot be read.
+        pickle.UnpicklingError: If the file is not a saved block list.
+    """
+    blocks = []
+    with open(path, "rb") as file:
+        while True:
+            try:
+                attributes = _SavedBlockUnpickler(file).load()
+            except EOFError:
+                break
+            value = attributes[3] if len(attributes) > 3 else None
+            blocks.append(SavedBlock(attributes[2], attributes[1], value))
+    return blocks
+
+
+def link_saved_blocks(blocks):
+    """
+    Links saved blocks the way Level.get_user_code links blocks on screen: a block snaps
+    below another when its top edge touches the other's bottom edge, and locked blocks
+    only ever join the start block.
+
+    Parameters:
+        blocks (list): The SavedBlock objects, in the order they were saved.
+
+    Returns:
+        list: The (command, value) chain hanging off the start block, ready for compile_program.
+    """
+    for block in blocks:
+        block.next = None
+
+    first = None
+    for block in blocks:
+        if block.top == START_POSITION[1]:
+            first = block
+
+    for block in blocks:
+        for below in blocks:
+            if block.next is None and block.bottom == below.top and not block.locked and not below.locked:
+                block.next = below
+
+    source = []
+    block = first
+    while block is not None:
+        source.append((block.command, block.value))
+        block = block.next
+    return source
+
+
+def load_saved_program(path):
+    """
+    Loads a saved block list as a program.
+
+    Parameters:
+        path (str or Path): The saved file.
+
+    Returns:
+        tuple: (source, placed), the (command, value) chain under the start block and the
+        number of blocks the user placed, which is the score a solution earns.
+
+    Raises:
+        OSError: If the file cannot be read.
+        pickle.UnpicklingError: If the file is not a saved block list.
+    """
+    blocks = read_saved_blocks(path)
+    placed = sum(1 for block in blocks if not block.locked)
+    return link_saved_blocks(blocks), placed
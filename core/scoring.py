@@ -0,0 +1,267 @@
+import os
+from collections import deque
+
+from core.cache import CACHE_DIRECTORY, DiskCache
+from core.results import board_hash
+from core.solver import FORWARD, TURNS, optimal_steps, start_state, successors
+from core.synthesis import shortest_program
+
+PAR_DIRECTORY = os.path.join(CACHE_DIRECTORY, "pars")
+
+
+def block_moves(board, state):
+    """
+    Lists the states one move or turn block away. A move block walks until it has gone its
+    number of tiles or the way ahead is blocked, so only numbers up to the first blocked
+    tile lead anywhere new.
+
+    Parameters:
+        board (Board): The level.
+        state (tuple): The current state, see core.solver.start_state.
+
+    Returns:
+        list: ((command, value), state, solved) triples, where solved is True if the block
+        collects the bolt.
+    """
+    result = []
+    for following in successors(board, state):
+        action, turned, _ = following
+        if action != FORWARD:
+            result.append((("turn", str(TURNS[action])), turned, False))
+
+    tiles = 0
+    # a walk through wormholes could go round forever, but never usefully past every cell
+    while tiles < len(board.cells):
+        forward = [entry for entry in successors(board, state) if entry[0] == FORWARD]
+        if not forward:
+            break
+        _, state, solved = forward[0]
+        tiles += 1
+        result.append((("move", str(tiles)), state, solved))
+        if solved:
+            break
+    return result
+
+
+def fewest_blocks(board):
+    """
+    Finds a program of move and turn blocks with as few blocks as possible that collects the
+    bolt, by breadth first search where each move or turn block is one step. Programs with
+    loops can be shorter still, see core.synthesis.
+
+    Parameters:
+        board (Board): The level.
+
+    Returns:
+        list: (command, value) tuples, ready for compile_program, or None if the bolt cannot
+        be reached.
+    """
+    start = start_state(board)
+    parents = {start: None}
+    queue = deque([start])
+    while queue:
+        state = queue.popleft()
+        for block, following, solved in block_moves(board, state):
+            if solved:
+                source = [block]
+                while parents[state] is not None:
+                    state, previous_block = parents[state]
+                    source.append(previous_block)
+                source.reverse()
+                return source
+            if following not in parents:
+                parents[following] = (state, block)
+                queue.append(following)
+    return None
+
+
+class Par:
+    """
+    The best a level can be solved in, the mark each completion is measured against.
+
+    Attributes:
+        blocks (int): The fewest blocks of a program that solves the level, loops included.
+        steps (int): The fewest moves and turns the bot can collect the bolt in.
+        source (list): A program with par blocks, as (command, value) tuples, which serves
+            as the level's reference solution.
+    """
+    def __init__(self, blocks, steps, source):
+        """
+        Initializes a new Par.
+
+        Parameters:
+            blocks (int): The fewest blocks.
+            steps (int): The fewest moves and turns.
+            source (list): A program with that many blocks.
+        """
+        self.blocks = blocks
+        self.steps = steps
+        self.source = source
+
+    @classmethod
+    def from_board(cls, board):
+        """
+        Works out the par of a level by searching it for the shortest program.
+
+        Parameters:
+            board (Board): The level.
+
+        Returns:
+            Par: The par, or None if the level cannot be solved.
+        """
+        source = shortest_program(board)
+        if source is None:
+            return None
+        return cls(len(source), optimal_steps(board), source)
+
+    def to_json(self):
+        """
+        Returns:
+            dict: The par as plain data for storing.
+        """
+        return {"blocks": self.blocks, "steps": self.steps, "source": self.source}
+
+    @classmethod
+    def from_json(cls, data):
+        """
+        Parameters:
+            data (dict): A par stored by to_json.
+
+        Returns:
+            Par: The par.
+        """
+        return cls(data["blocks"], data["steps"], [tuple(block) for block in data["source"]])
+
+
+class ParCache:
+    """
+    Remembers the par of each level, in memory and on disk, keyed by a hash of the level, so
+    levels are only searched once. Searching a level can take a minute, so the game only
+    looks pars up, see layout_par; running core.synthesis works out every level's par and
+    saves it in the level's file.
+
+    Attributes:
+        cache (DiskCache): Where the pars are kept between runs.
+        pars (dict): The pars looked up so far, by level hash.
+    """
+    def __init__(self, cache=None):
+        """
+        Initializes a new ParCache.
+
+        Parameters:
+            cache (DiskCache, optional): Where to keep the pars. Defaults to the shared par folder.
+        """
+        self.cache = cache if cache is not None else DiskCache(PAR_DIRECTORY)
+        self.pars = {}
+
+    def par(self, board):
+        """
+        Gives the par of a level, searching for it if it has not been worked out before.
+
+        Parameters:
+            board (Board): The level.
+
+        Returns:
+            Par: The par, or None if the level cannot be solved.
+        """
+        key = board_hash(board)
+        if key not in self.pars:
+            stored = self.cache.get(key)
+            if stored is None:
+                par = Par.from_board(board)
+                self.cache.put(key, {"par": None if par is None else par.to_json()})
+            else:
+                par = None if stored["par"] is None else Par.from_json(stored["par"])
+            self.pars[key] = par
+        return self.pars[key]
+
+    def known(self, board):
+        """
+        Gives the par of a level if it has been worked out before, without searching.
+
+        Parameters:
+            board (Board): The level.
+
+        Returns:
+            Par: The par, or None if it has not been worked out or the level cannot be solved.
+        """
+        key = board_hash(board)
+        if key not in self.pars:
+            stored = self.cache.get(key)
+            if stored is None:
+                return None
+            self.pars[key] = None if stored["par"] is None else Par.from_json(stored["par"])
+        return self.pars[key]
+
+
+par_cache = ParCache()
+
+
+def level_par(board):
+    """
+    Gives the par of a level, using the shared cache and searching for it if need be. The
+    search can take a minute, so this is for tools, not the game.
+
+    Parameters:
+        board (Board): The level.
+
+    Returns:
+        Par: The par, or None if the level cannot be solved.
+    """
+    return par_cache.par(board)
+
+
+def par_data(board, par):
+    """
+    Packs a level's par for its level file, with the hash of the level it was worked out
+    for, so a par saved before the level was edited is not used.
+
+    Parameters:
+        board (Board): The level.
+        par (Par): Its par.
+
+    Returns:
+        dict: The par as plain data, see LevelLayout.par.
+    """
+    return dict(par.to_json(), board=board_hash(board))
+
+
+def layout_par(layout):
+    """
+    Gives the par of a level without searching for it: the par saved in the level's file if
+    it still fits the level, or else one worked out earlier on this computer.
+
+    Parameters:
+        layout (LevelLayout): The level.
+
+    Returns:
+        Par: The par, or None if it has not been worked out or the level cannot be solved.
+    """
+    board = layout.board()
+    stored = layout.par
+    if stored is not None and stored.get("board") == board_hash(board):
+        return Par.from_json(stored)
+    return par_cache.known(board)
+
+
+def efficiency(par, blocks, steps):
+    """
+    Measures a completion against par. A ratio of 1 is par, and lower is better, like scores.
+
+    Parameters:
+        par (Par): The level's par.
+        blocks (int): The number of blocks the student used.
+        steps (int): The number of moves and turns the bot made.
+
+    Returns:
+        dict: The raw counts, the par and the ratio of each count to its par, as plain data
+        so it can be kept with the user.
+    """
+    return {
+        "blocks": blocks,
+        "steps": steps,
+        "par_blocks": par.blocks,
+        "par_steps": par.steps,
+        "block_ratio": blocks / par.blocks,
+        "step_ratio": steps / par.steps,
+    }
@@ -0,0 +1,582 @@
+from collections import namedtuple
+from core.bitboard import POSITION, PC, PROGRESS, WORMHOLE, BUTTON, COUNTER, from_bits, to_bits, zobrist_key
+from core.program import MOVE, TURN, TEST, JUMP, COUNT_RESET, COUNT_TEST, compile_program
+
+# directions, clockwise so that a (counterclockwise) turn block subtracts
+UP = 0
+RIGHT = 1
+DOWN = 2
+LEFT = 3
+
+DIRECTIONS = ("up", "right", "down", "left")
+OFFSETS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+
+# event kinds
+MOVED = "move"
+TURNED = "turn"
+TELEPORTED = "teleport"
+PRESSED = "press"
+COLLECTED = "collect"
+
+# changed whenever the rules change how a program runs, so runs stored by older versions
+# of the game are not played back
+SIMULATOR_VERSION = 1
+
+# kind: one of the event kinds above
+# cell: the (row, col) the bot is on after the event, or the button pressed
+# direction: the direction the bot faces after the event
+# other: the wormhole entered for a teleport, the door opened by a press
+Event = namedtuple("Event", ["kind", "cell", "direction", "other"], defaults=[None])
+
+# what happens when the bot enters a cell
+# button: the number of the button on the cell, or None
+# wormhole: the index of the cell the wormhole sends the bot to, or None
+# goal: True if the cell holds the bolt
+Trigger = namedtuple("Trigger", ["button", "wormhole", "goal"])
+
+
+class Board:
+    """
+    The static layout of a level as seen by the simulator, in grid cells.
+
+    Besides the sets of cells it was built from, a board numbers its cells row by row so
+    that walls, bolts and doors can be held as bitboards, ints whose bit i stands for cell i,
+    and numbers its doors and buttons so their state fits in a bitset too.
+
+    Attributes:
+        rows (int): The number of rows in the grid.
+        cols (int): The number of columns in the grid.
+        walls (frozenset): The (row, col) cells holding walls.
+        bolts (frozenset): The cells holding the bolt that completes the level.
+        doors (frozenset): The cells holding doors, which block the bot until opened.
+        buttons (dict): Maps each button cell to the door cell it opens, or None.
+        wormholes (dict): Maps each wormhole cell to the cell of the wormhole it is linked to.
+        start (tuple): The cell the bot starts on.
+        start_direction (int): The direction the bot starts facing.
+        cells (list): The (row, col) of every cell index.
+        index (dict): Maps each (row, col) to its cell index.
+        wall_bits (int): The bitboard of walls.
+        bolt_bits (int): The bitboard of bolts.
+        door_bits (int): The bitboard of doors.
+        door_ids (dict): Maps each door cell to its door number.
+        button_ids (dict): Maps each button cell to its button number.
+        button_doors (list): The number of the door each button opens, or None.
+        ahead (list): The index of the cell in front of cell i facing direction d at
+            i * 4 + d, or -1 off the grid.
+        triggers (list): The Trigger of each cell index, or None for cells where nothing happens.
+        button_at (list): The number of the button on each cell index, or -1.
+        door_at (list): The number of the door on each cell index, or -1.
+    """
+    def __init__(
+        self,
+        rows,
+        cols,
+        walls=(),
+        bolts=(),
+        doors=(),
+        buttons=None,
+        wormholes=None,
+        start=(8, 17),
+        start_direction=UP,
+    ):
+        """
+        Initializes a new Board.
+
+        Parameters:
+            rows (int): The number of rows in the grid.
+            cols (int): The number of columns in the grid.
+            walls (iterable): The wall cells.
+            bolts (iterable): The bolt cells.
+            doors (iterable): The door cells.
+            buttons (dict, optional): Button cell -> linked door cell or None.
+            wormholes (dict, optional): Wormhole cell -> linked wormhole cell.
+            start (tuple): The bot's starting cell. Defaults to the bottom right corner.
+            start_direction (int): The bot's starting direction. Defaults to UP.
+        """
+        self.rows = rows
+        self.cols = cols
+        self.walls = frozenset(walls)
+        self.bolts = frozenset(bolts)
+        self.doors = frozenset(doors)
+        self.buttons = dict(buttons or {})
+        self.wormholes = dict(wormholes or {})
+        self.start = start
+        self.start_direction = start_direction
+
+        self.cells = [(row, col) for row in range(rows) for col in range(cols)]
+        self.index = {cell: index for index, cell in enumerate(self.cells)}
+        self.wall_bits = to_bits(self.index[cell] for cell in self.walls)
+        self.bolt_bits = to_bits(self.index[cell] for cell in self.bolts)
+        self.door_bits = to_bits(self.index[cell] for cell in self.doors)
+        self.door_ids = {cell: number for number, cell in enumerate(sorted(self.doors))}
+        self.button_ids = {cell: number for number, cell in enumerate(sorted(self.buttons))}
+        self.button_doors = [self.door_ids.get(self.buttons[cell]) for cell in sorted(self.buttons)]
+
+        self.button_at = [self.button_ids.get(cell, -1) for cell in self.cells]
+        self.door_at = [self.door_ids.get(cell, -1) for cell in self.cells]
+
+        self.ahead = []
+        for row, col in self.cells:
+            for row_offset, col_offset in OFFSETS:
+                self.ahead.append(self.index.get((row + row_offset, col + col_offset), -1))
+
+        self.triggers = [None] * len(self.cells)
+        for cell in set(self.buttons) | set(self.wormholes) | self.bolts:
+            destination = self.wormholes.get(cell)
+            self.triggers[self.index[cell]] = Trigger(
+                self.button_ids.get(cell),
+                None if destination is None else self.index[destination],
+                cell in self.bolts,
+            )
+
+        self.position_keys = [zobrist_key(POSITION, i) for i in range(len(self.cells) * 4)]
+        self.button_keys = [zobrist_key(BUTTON, number) for number in range(len(self.button_ids))]
+
+    def in_bounds(self, cell):
+        """
+        Checks whether a cell lies on the grid.
+
+        Parameters:
+            cell (tuple): The (row, col) cell.
+
+        Returns:
+            bool: True if the cell is on the grid.
+        """
+        return 0 <= cell[0] < self.rows and 0 <= cell[1] < self.cols
+
+
+class Simulator:
+    """
+    Runs a compiled program on a board one logical step at a time.
+
+    A step is either one control flow instruction or one tile of movement, so the cost of a
+    run depends on the program, not on how many pixels the bot is animated across. Every step
+    returns the tile level events it caused for the renderer to animate.
+
+    The bot's cell is kept as a cell index and the pressed buttons and open doors as bitsets,
+    so the checks made every step are bit operations. A Zobrist hash of the whole state is
+    kept up to date as the state changes.
+
+    A run is deterministic, so once the whole state repeats the program can never end. The
+    state after every step is checked with Brent's cycle detection, which keeps a single
+    earlier state to compare against, and a repeat ends the run with looping set.
+
+    Attributes:
+        board (Board): The level being played.
+        program (Program): The compiled program being run.
+        position (int): The index of the cell the bot is on.
+        direction (int): The direction the bot faces.
+        open_door_bits (int): The bitset of opened doors, by door number.
+        pressed_bits (int): The bitset of pressed buttons, by button number.
+        wormhole (int): The index of the wormhole the bot last arrived through, which does not
+            send it back, or -1.
+        pc (int): The index of the instruction being run.
+        counters (list): The counters of the program's counted loops and conditions.
+        moved (int): The tiles moved so far by the current move instruction.
+        steps (int): The number of steps taken.
+        done (bool): True once the program has ended, the bolt was collected or a loop was found.
+        solved (bool): True if the bolt was collected.
+        looping (bool): True if the program was found to loop forever.
+        detect_loops (bool): Whether to look for endless loops.
+        hash (int): The Zobrist hash of the current state.
+        pc_keys (list): The Zobrist key of each instruction index.
+    """
+    def __init__(self, board, program, detect_loops=True):
+        """
+        Initializes a new Simulator with the bot on the board's start cell.
+
+        Parameters:
+            board (Board): The level to play.
+            program (Program): The compiled program to run.
+            detect_loops (bool): Whether to end the run when the program loops forever. Defaults to True.
+        """
+        self.board = board
+        self.program = program
+        self.position = board.index[board.start]
+        self.direction = board.start_direction
+        self.open_door_bits = 0
+        self.pressed_bits = 0
+        self.wormhole = -1
+        self.pc = 0
+        self.counters = program.new_counters()
+        self.moved = 0
+        self.steps = 0
+        self.solved = False
+        self.looping = False
+        self.done = len(program.instructions) == 0
+        self.detect_loops = detect_loops
+
+        self.pc_keys = [zobrist_key(PC, pc) for pc in range(len(program.instructions) + 1)]
+        self.hash = self.compute_hash()
+
+        # Brent's cycle detection: the state being compared against, and when to replace it
+        self.cycle_mark = (self.hash, self.state())
+        self.cycle_power = 1
+        self.cycle_length = 0
+
+    @property
+    def cell(self):
+        """
+        tuple: The (row, col) cell the bot is on.
+        """
+        return self.board.cells[self.position]
+
+    @property
+    def open_doors(self):
+        """
+        set: The cells of the doors that have been opened.
+        """
+        doors = sorted(self.board.door_ids)
+        return {doors[number] for number in from_bits(self.open_door_bits)}
+
+    @property
+    def pressed(self):
+        """
+        set: The cells of the buttons that have been pressed.
+        """
+        buttons = sorted(self.board.button_ids)
+        return {buttons[number] for number in from_bits(self.pressed_bits)}
+
+    @property
+    def last_wormhole(self):
+        """
+        tuple: The cell of the wormhole the bot last arrived through, or None.
+        """
+        return self.board.cells[self.wormhole] if self.wormhole >= 0 else None
+
+    def state(self):
+        """
+        Returns everything that decides how the rest of the run goes. The open doors follow
+        from the pressed buttons, so they are left out.
+
+        Returns:
+            tuple: A hashable snapshot of the run.
+        """
+        return (
+            self.pc,
+            self.position,
+            self.direction,
+            self.moved,
+            self.wormhole,
+            self.pressed_bits,
+            tuple(self.counters),
+        )
+
+    def snapshot(self):
+        """
+        Takes a compact copy of everything a step can change, so the run can later be put
+        back to this point with restore.
+
+        Returns:
+            tuple: The snapshot.
+        """
+        return (
+            self.position,
+            self.direction,
+            self.open_door_bits,
+            self.pressed_bits,
+            self.wormhole,
+            self.pc,
+            tuple(self.counters),
+            self.moved,
+            self.steps,
+            self.solved,
+            self.looping,
+            self.done,
+            self.hash,
+            self.cycle_mark,
+            self.cycle_power,
+            self.cycle_length,
+        )
+
+    def restore(self, snapshot):
+        """
+        Puts the run back to the point a snapshot was taken at.
+
+        Parameters:
+            snapshot (tuple): A snapshot taken by this simulator.
+        """
+        (
+            self.position,
+            self.direction,
+            self.open_door_bits,
+            self.pressed_bits,
+            self.wormhole,
+            self.pc,
+            counters,
+            self.moved,
+            self.steps,
+            self.solved,
+            self.looping,
+            self.done,
+            self.hash,
+            self.cycle_mark,
+            self.cycle_power,
+            self.cycle_length,
+        ) = snapshot
+        self.counters = list(counters)
+
+    def compute_hash(self):
+        """
+        Works out the Zobrist hash of the current state from scratch. Steps keep self.hash
+        up to date by xoring out the keys of what changed and xoring in the new ones, so
+        this is only needed to start a run.
+
+        Returns:
+            int: The 64 bit hash.
+        """
+        board = self.board
+        value = (
+            board.position_keys[self.position * 4 + self.direction]
+            ^ self.pc_keys[self.pc]
+            ^ zobrist_key(PROGRESS, self.moved)
+            ^ zobrist_key(WORMHOLE, self.wormhole + 1)
+        )
+        for button in from_bits(self.pressed_bits):
+            value ^= board.button_keys[button]
+        for slot, count in enumerate(self.counters):
+            value ^= zobrist_key(COUNTER, count, slot)
+        return value
+
+    def facing_cell(self):
+        """
+        Returns the cell in front of the bot, which may be off the grid.
+
+        Returns:
+            tuple: The (row, col) cell the bot faces.
+        """
+        row, col = self.cell
+        row_offset, col_offset = OFFSETS[self.direction]
+        return (row + row_offset, col + col_offset)
+
+    def wall_ahead(self):
+        """
+        Checks whether the bot faces a wall or the edge of the grid.
+
+        Returns:
+            bool: True if there is a wall ahead.
+        """
+        ahead = self.board.ahead[self.position * 4 + self.direction]
+        return ahead < 0 or (self.board.wall_bits >> ahead) & 1 == 1
+
+    def tile_open(self, index):
+        """
+        Checks whether the bot can move onto a cell.
+
+        Parameters:
+            index (int): The cell index, or -1 for off the grid.
+
+        Returns:
+            bool: True if the cell is on the grid and not a wall or a closed door.
+        """
+        if index < 0 or (self.board.wall_bits >> index) & 1:
+            return False
+        if (self.board.door_bits >> index) & 1:
+            door = self.board.door_ids[self.board.cells[index]]
+            return (self.open_door_bits >> door) & 1 == 1
+        return True
+
+    def check_condition(self, condition):
+        """
+        Evaluates the condition of an if or while block. "button is pressed" and "door is
+        open" ask about the tile the bot faces, and are false if it holds no button or door.
+
+        Parameters:
+            condition (str): The condition selected in the block's drop down.
+
+        Returns:
+            bool: Whether the condition holds.
+        """
+        if condition == "true":
+            return True
+        if condition == "wall ahead":
+            return self.wall_ahead()
+        if condition == "wall not ahead":
+            return not self.wall_ahead()
+        if condition == "button is pressed":
+            ahead = self.board.ahead[self.position * 4 + self.direction]
+            button = self.board.button_at[ahead] if ahead >= 0 else -1
+            return button >= 0 and (self.pressed_bits >> button) & 1 == 1
+        if condition == "door is open":
+            ahead = self.board.ahead[self.position * 4 + self.direction]
+            door = self.board.door_at[ahead] if ahead >= 0 else -1
+            return door >= 0 and (self.open_door_bits >> door) & 1 == 1
+        return False
+
+    def set_counter(self, slot, value):
+        """
+        Sets a counter, keeping the hash up to date.
+
+        Parameters:
+            slot (int): The counter slot.
+            value (int): The new count.
+        """
+        self.hash ^= zobrist_key(COUNTER, self.counters[slot], slot) ^ zobrist_key(COUNTER, value, slot)
+        self.counters[slot] = value
+
+    def step(self):
+        """
+        Runs one step of the program.
+
+        Returns:
+            list: The events caused by the step, empty for control flow.
+        """
+        if self.done:
+            return []
+
+        board = self.board
+        self.steps += 1
+        pc = self.pc
+        instruction = self.program.instructions[pc]
+        op = instruction.op
+        events = []
+
+        # the hash is updated as each part of the state changes; xoring in a key and
+        # xoring it out again cancels, so unchanged parts need no special case
+        if op == MOVE:
+            place = self.position * 4 + self.direction
+            moved = self.moved
+            ahead = board.ahead[place]
+            if instruction.arg <= 0 or not self.tile_open(ahead):
+                self.moved = 0
+                self.pc += 1
+            else:
+                self.position = ahead
+                events.append(Event(MOVED, board.cells[ahead], self.direction))
+                self.enter_cell(events)
+                self.moved += 1
+                new_place = self.position * 4 + self.direction
+                self.hash ^= board.position_keys[place] ^ board.position_keys[new_place]
+                if self.moved >= instruction.arg or not self.tile_open(board.ahead[new_place]):
+                    self.moved = 0
+                    self.pc += 1
+            if self.moved != moved:
+                self.hash ^= zobrist_key(PROGRESS, moved) ^ zobrist_key(PROGRESS, self.moved)
+
+        elif op == TURN:
+            place = self.position * 4 + self.direction
+            self.direction = (self.direction - instruction.arg) % 4
+            self.hash ^= board.position_keys[place] ^ board.position_keys[place - place % 4 + self.direction]
+            events.append(Event(TURNED, self.cell, self.direction))
+            self.pc += 1
+
+        elif op == TEST:
+            if self.check_condition(instruction.arg):
+                self.pc += 1
+            else:
+                self.pc = instruction.target
+
+        elif op == JUMP:
+            self.pc = instruction.target
+
+        elif op == COUNT_RESET:
+            self.set_counter(instruction.arg, 0)
+            self.pc += 1
+
+        elif op == COUNT_TEST:
+            slot, limit = instruction.arg
+            if self.counters[slot] >= limit:
+                self.pc = instruction.target
+            else:
+                self.set_counter(slot, self.counters[slot] + 1)
+                self.pc += 1
+
+        self.hash ^= self.pc_keys[pc] ^ self.pc_keys[self.pc]
+
+        if not self.solved and self.pc >= len(self.program.instructions):
+            self.done = True
+        if self.detect_loops and not self.done:
+            self.check_for_loop()
+        return events
+
+    def check_for_loop(self):
+        """
+        Compares the current state with the marked one and ends the run if it has come round
+        again. The hashes are compared first, so full states are only compared on a match.
+        The mark moves to the current state after 1, 2, 4, 8, ... steps, so a loop is found
+        within a few times its length of entering it.
+        """
+        mark_hash, mark_state = self.cycle_mark
+        if self.hash == mark_hash and self.state() == mark_state:
+            self.looping = True
+            self.done = True
+            return
+        self.cycle_length += 1
+        if self.cycle_length == self.cycle_power:
+            self.cycle_mark = (self.hash, self.state())
+            self.cycle_power *= 2
+            self.cycle_length = 0
+
+    def enter_cell(self, events):
+        """
+        Fires whatever is on the cell the bot just moved onto: buttons, wormholes and the bolt.
+        Everything a cell can do is looked up in the board's trigger table, so entering a
+        plain cell costs a single lookup however many objects the level has. A button only
+        fires the first time it is entered.
+
+        Parameters:
+            events (list): The list the resulting events are appended to.
+        """
+        board = self.board
+        trigger = board.triggers[self.position]
+        if trigger is None:
+            return
+        cell = board.cells[self.position]
+
+        button = trigger.button
+        if button is not None and not (self.pressed_bits >> button) & 1:
+            self.pressed_bits |= 1 << button
+            self.hash ^= board.button_keys[button]
+            door = board.button_doors[button]
+            if door is not None:
+                self.open_door_bits |= 1 << door
+            events.append(Event(PRESSED, cell, self.direction, board.buttons[cell]))
+
+        destination = trigger.wormhole
+        if destination is not None and self.position != self.wormhole:
+            self.hash ^= zobrist_key(WORMHOLE, self.wormhole + 1) ^ zobrist_key(WORMHOLE, destination + 1)
+            self.position = destination
+            self.wormhole = destination
+            events.append(Event(TELEPORTED, board.cells[destination], self.direction, cell))
+            trigger = board.triggers[destination]
+
+        if trigger is not None and trigger.goal:
+            self.solved = True
+            self.done = True
+            events.append(Event(COLLECTED, self.cell, self.direction))
+
+    def run(self, max_steps=None):
+        """
+        Runs the program until it ends, the bolt is collected, it is found to loop forever
+        or the step limit is reached.
+
+        Parameters:
+            max_steps (int, optional): The most steps to run, or None for no limit.
+
+        Returns:
+            list: Every event of the run, in order.
+        """
+        events = []
+        while not self.done and (max_steps is None or self.steps < max_steps):
+            events.extend(self.step())
+        return events
+
+
+def run_program(board, source, max_steps=None):
+    """
+    Compiles a program and runs it on a board from the start.
+
+    Parameters:
+        board (Board): The level to play.
+        source (list): The program's blocks, as accepted by compile_program.
+        max_steps (int, optional): The most steps to run, or None for no limit.
+
+    Returns:
+        Simulator: The simulator after the run, holding the bot's final state.
+
+    Raises:
+        ValueError, CompileError: If the program does not compile.
+    """
+    simulator = Simulator(board, compile_program(source))
+    simulator.run(max_steps)
+    return simulator
@@ -0,0 +1,209 @@
+import os
+from collections import deque
+
+from core.cache import CACHE_DIRECTORY, DiskCache
+from core.results import board_hash
+
+SOLUTIONS_DIRECTORY = os.path.join(CACHE_DIRECTORY, "solutions")
+
+# the bot's actions, each one simulator step
+FORWARD = "forward"
+LEFT = "left"
+RIGHT = "right"
+AROUND = "around"
+
+ACTIONS = (FORWARD, LEFT, RIGHT, AROUND)
+
+# action -> the number typed into a turn block, which turns counterclockwise
+TURNS = {LEFT: 1, AROUND: 2, RIGHT: 3}
+
+
+def start_state(board):
+    """
+    Gives the state the bot starts a level in.
+
+    A state is (position, direction, open doors, wormhole): the bot's cell index, the
+    direction it faces, the bitset of opened doors and the index of the wormhole it last
+    arrived through or -1. Which buttons have been pressed only matters through the doors
+    they open, so buttons are not part of the state.
+
+    Parameters:
+        board (Board): The level.
+
+    Returns:
+        tuple: The starting state.
+    """
+    return (board.index[board.start], board.start_direction, 0, -1)
+
+
+def successors(board, state):
+    """
+    Lists the states one action away, following the same rules as Simulator.step.
+
+    Parameters:
+        board (Board): The level.
+        state (tuple): The current state, see start_state.
+
+    Returns:
+        list: (action, state, solved) triples, where solved is True if the action
+        collects the bolt. Moving forward into a wall or closed door does nothing and
+        is left out.
+    """
+    position, direction, doors, wormhole = state
+    result = []
+    for action, turns in TURNS.items():
+        result.append((action, (position, (direction - turns) % 4, doors, wormhole), False))
+
+    ahead = board.ahead[position * 4 + direction]
+    if ahead < 0 or (board.wall_bits >> ahead) & 1:
+        return result
+    if (board.door_bits >> ahead) & 1:
+        if not (doors >> board.door_ids[board.cells[ahead]]) & 1:
+            return result
+
+    trigger = board.triggers[ahead]
+    solved = False
+    if trigger is not None:
+        if trigger.button is not None:
+            door = board.button_doors[trigger.button]
+            if door is not None:
+                doors |= 1 << door
+        if trigger.wormhole is not None and ahead != wormhole:
+            ahead = wormhole = trigger.wormhole
+            trigger = board.triggers[ahead]
+        solved = trigger is not None and trigger.goal
+    result.append((FORWARD, (ahead, direction, doors, wormhole), solved))
+    return result
+
+
+def solve(board):
+    """
+    Finds a shortest sequence of actions that collects the bolt, by breadth first search
+    over every state the bot can reach. Every action costs one step, so the first
+    solution found is a shortest one.
+
+    Parameters:
+        board (Board): The level.
+
+    Returns:
+        list: The actions, or None if the bolt cannot be reached.
+    """
+    start = start_state(board)
+    parents = {start: None}
+    queue = deque([start])
+    while queue:
+        state = queue.popleft()
+        for action, following, solved in successors(board, state):
+            if solved:
+                actions = [action]
+                while parents[state] is not None:
+                    state, previous_action = parents[state]
+                    actions.append(previous_action)
+                actions.reverse()
+                return actions
+            if following not in parents:
+                parents[following] = (state, action)
+                queue.append(following)
+    return None
+
+
+def actions_to_source(actions):
+    """
+    Turns a sequence of actions into blocks, joining runs of forward moves into one move block.
+
+    Parameters:
+        actions (list): The actions.
+
+    Returns:
+        list: (command, value) tuples, ready for compile_program.
+    """
+    source = []
+    for action in actions:
+        if action == FORWARD:
+            if source and source[-1][0] == "move":
+                source[-1] = ("move", str(int(source[-1][1]) + 1))
+            else:
+                source.append(("move", "1"))
+        else:
+            source.append(("turn", str(TURNS[action])))
+    return source
+
+
+class SolutionCache:
+    """
+    Remembers the shortest solution of each level, in memory and on disk, keyed by a hash
+    of the level, so the search only runs the first time a level is asked about.
+
+    Attributes:
+        cache (DiskCache): Where the solutions are kept between runs.
+        solutions (dict): The solutions looked up so far, by level hash.
+    """
+    def __init__(self, cache=None):
+        """
+        Initializes a new SolutionCache.
+
+        Parameters:
+            cache (DiskCache, optional): Where to keep the solutions. Defaults to the
+                shared solutions folder.
+        """
+        self.cache = cache if cache is not None else DiskCache(SOLUTIONS_DIRECTORY)
+        self.solutions = {}
+
+    def solution(self, board):
+        """
+        Gives a shortest solution of a level, solving it if it has not been solved before.
+
+        Parameters:
+            board (Board): The level.
+
+        Returns:
+            list: The actions, or None if the level cannot be solved.
+        """
+        key = board_hash(board)
+        if key not in self.solutions:
+            stored = self.cache.get(key)
+            if stored is None:
+                stored = {"actions": solve(board)}
+                self.cache.put(key, stored)
+            self.solutions[key] = stored["actions"]
+        return self.solutions[key]
+
+    def optimal_steps(self, board):
+        """
+        Gives the fewest steps any program can collect the bolt in.
+
+        Parameters:
+            board (Board): The level.
+
+        Returns:
+            int: The number of steps, or None if the level cannot be solved.
+        """
+        actions = self.solution(board)
+        return None if actions is None else len(actions)
+
+
+solution_cache = SolutionCache()
+
+
+def optimal_steps(board):
+    """
+    Gives the fewest steps any program can collect the bolt in, using the shared cache.
+
+    Parameters:
+        board (Board): The level.
+
+    Returns:
+        int: The number of steps, or None if the level cannot be solved.
+    """
+    return solution_cache.optimal_steps(board)
+
+
+if __name__ == "__main__":
+    from core.layouts import LAYOUTS
+
+    for name, layout in LAYOUTS.items():
+        actions = solution_cache.solution(layout.board())
+        if actions is None:
+            print(f"level {name}: no solution")
+        else:
+            print(f"level {name}: {len(actions)} steps, {actions_to_source(actions)}")
@@ -0,0 +1,360 @@
+"""
+Searches for the program with the fewest blocks that solves a level, using loops and
+conditions as well as move and turn blocks, to give teachers a reference solution and a par
+that rewards programs with loops.
+
+A program is a sequence of statements: a move or turn block, or a whole loop or if block
+with its body. Between statements the bot's situation is just its state: its cell, the
+direction it faces, the buttons pressed and the wormhole it last arrived through. So the
+search is over states, where each statement leads from one state to another and costs its
+number of blocks. Two programs that bring the bot to the same state are equivalent for the
+rest of the program, and only the first one found is kept.
+
+The search deepens one block at a time: the states first reached with 1 block, then with
+2, and so on, so the first program found to collect the bolt has the fewest blocks of any.
+The statements are tried from every state with NumPy batches, spread over a process pool.
+The programs found are kept with each level's par, see core.scoring.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+from core.batch import BatchSimulator
+from core.hints import UNREACHABLE, distance_field
+from core.program import compile_program
+
+# the most blocks in a single loop or if statement, end block included
+STATEMENT_BLOCKS = 6
+
+# the largest move inside a loop or if body; moves outside them go up to the grid's size
+BODY_MOVES = 5
+
+# the counts tried for "for" loops
+LOOP_COUNTS = range(2, 10)
+
+# the most steps a statement may run for from one state, per cell of the level
+STEPS_PER_CELL = 8
+
+# the most statements run in one batch, so large sizes are split across the pool
+CHUNK_STATEMENTS = 4096
+
+
+class StatementLibrary:
+    """
+    Every statement the search tries, grouped by their number of blocks.
+
+    Statements are kept in a canonical form to leave out ones that can never be part of a
+    shortest program: two move blocks or two turn blocks in a row can always be joined into
+    one, a "for" loop must move the bot, and "while true" only ends by collecting the bolt,
+    so it is never put inside another statement. An if block only pays off inside a loop:
+    at the top of the program it runs once from a known state, where its body alone, or
+    nothing, does the same with fewer blocks.
+
+    Attributes:
+        conditions (list): The conditions tried by while and if blocks.
+        moves (int): The largest move tried outside loop and if bodies.
+        statement_blocks (int): The most blocks in one statement.
+        statements (dict): The statements of each size, each a tuple of (command, value) blocks.
+        nested (dict): The statements of each size that can go in a body.
+        sequences (dict): The bodies of each size.
+    """
+    def __init__(self, board, statement_blocks=STATEMENT_BLOCKS):
+        """
+        Initializes a new StatementLibrary.
+
+        Parameters:
+            board (Board): The level, which decides the largest moves and which conditions
+                can ever hold.
+            statement_blocks (int): The most blocks in one statement. Defaults to STATEMENT_BLOCKS.
+        """
+        self.conditions = ["wall ahead", "wall not ahead"]
+        if board.buttons:
+            self.conditions.append("button is pressed")
+        if board.doors:
+            self.conditions.append("door is open")
+        self.moves = max(board.rows, board.cols)
+        self.statement_blocks = statement_blocks
+        self.nested = {}
+        self.sequences = {}
+        self.statements = {1: self.simple(self.moves)}
+        for size in range(3, statement_blocks + 1):
+            self.statements[size] = self.compound(size, top=True)
+
+    @staticmethod
+    def simple(moves):
+        """
+        Lists the move and turn blocks.
+
+        Parameters:
+            moves (int): The largest move.
+
+        Returns:
+            list: One-block statements.
+        """
+        return [(("move", str(tiles)),) for tiles in range(1, moves + 1)] + [
+            (("turn", str(turns)),) for turns in (1, 2, 3)
+        ]
+
+    def compound(self, size, top=False):
+        """
+        Lists the loop and if statements with a number of blocks.
+
+        Parameters:
+            size (int): The number of blocks, the start and end blocks included.
+            top (bool): Whether the statement stands at the top of the program rather than
+                in a body. Only "while true" is tried at the top, and only if blocks in a body.
+
+        Returns:
+            list: The statements.
+        """
+        result = []
+        headers = [("while", condition) for condition in self.conditions]
+        if top:
+            headers.insert(0, ("while", "true"))
+        for header in headers:
+            result.extend((header,) + body + (("endwhile", None),) for body in self.sequence(size - 2))
+        for body in self.sequence(size - 2):
+            if any(block[0] == "move" for block in body):
+                result.extend((("for", str(count)),) + body + (("endfor", None),) for count in LOOP_COUNTS)
+        for condition in [] if top else self.conditions:
+            result.extend((("if", condition),) + body + (("endif", None),) for body in self.sequence(size - 2))
+            for first in range(1, size - 4):
+                for body in self.sequence(first):
+                    for other in self.sequence(size - 4 - first):
+                        result.append(
+                            (("if", condition),) + body + (("endif", None), ("else", None)) + other + (("endelse", None),)
+                        )
+        return result
+
+    def statement(self, size):
+        """
+        Lists the statements that can go in a body, with a number of blocks.
+
+        Parameters:
+            size (int): The number of blocks.
+
+        Returns:
+            list: The statements.
+        """
+        if size not in self.nested:
+            self.nested[size] = self.simple(BODY_MOVES) if size == 1 else self.compound(size)
+        return self.nested[size]
+
+    def sequence(self, size):
+        """
+        Lists the bodies with a number of blocks, in canonical form.
+
+        Parameters:
+            size (int): The number of blocks.
+
+        Returns:
+            list: Tuples of (command, value) blocks.
+        """
+        if size in self.sequences:
+            return self.sequences[size]
+        result = []
+        for first in range(1, size + 1):
+            for statement in self.statement(first):
+                if first == size:
+                    result.append(statement)
+                    continue
+                for rest in self.sequence(size - first):
+                    if first == 1 and statement[0][0] == rest[0][0] and rest[0][0] in ("move", "turn"):
+                        continue
+                    result.append(statement + rest)
+        self.sequences[size] = result
+        return result
+
+    def chunks(self, size):
+        """
+        Returns:
+            int: How many batches the statements of a size are run in.
+        """
+        return -(-len(self.statements[size]) // CHUNK_STATEMENTS)
+
+
+# the library and batches of the current process, set up once per worker
+_worker = {}
+
+
+def start_worker(board, statement_blocks):
+    """
+    Prepares a process to run statements on a level.
+
+    Parameters:
+        board (Board): The level.
+        statement_blocks (int): The most blocks in one statement.
+    """
+    _worker["board"] = board
+    _worker["library"] = StatementLibrary(board, statement_blocks)
+    _worker["batches"] = {}
+    _worker["max_steps"] = STEPS_PER_CELL * len(board.cells)
+
+
+def statement_effects(task):
+    """
+    Runs a chunk of the statements of one size from a state.
+
+    Parameters:
+        task (tuple): (state, size, chunk), where state is (position, direction, pressed
+            buttons bitset, wormhole).
+
+    Returns:
+        tuple: (effects, solved), where effects lists a (state, statement number) pair for
+        each different state the statements end in, and solved is the number of the first
+        statement that collects the bolt, or None. Statements that loop forever or run too
+        long are left out.
+    """
+    state, size, chunk = task
+    board = _worker["board"]
+    batches = _worker["batches"]
+    if (size, chunk) not in batches:
+        statements = _worker["library"].statements[size][chunk * CHUNK_STATEMENTS:(chunk + 1) * CHUNK_STATEMENTS]
+        batches[size, chunk] = BatchSimulator(board, [compile_program(statement) for statement in statements])
+    batch = batches[size, chunk]
+    batch.reset(state)
+    batch.run(_worker["max_steps"])
+
+    first = chunk * CHUNK_STATEMENTS
+    solved = np.flatnonzero(batch.solved)
+    if len(solved):
+        return [], first + int(solved[0])
+
+    ended = np.flatnonzero(batch.done & ~batch.looping)
+    keys = np.stack(
+        [batch.position[ended], batch.direction[ended], batch.pressed_bits[ended], batch.wormhole[ended]], axis=1
+    )
+    _, firsts = np.unique(keys, axis=0, return_index=True)
+    effects = []
+    for row in sorted(firsts):
+        following = tuple(int(value) for value in keys[row])
+        if following != state:
+            effects.append((following, first + int(ended[row])))
+    return effects, None
+
+
+@contextmanager
+def task_runner(board, statement_blocks, workers):
+    """
+    Gives a function that runs statement_effects on many tasks, in a process pool unless
+    a single worker is asked for.
+
+    Parameters:
+        board (Board): The level.
+        statement_blocks (int): The most blocks in one statement.
+        workers (int): The number of processes, or None for one per CPU.
+
+    Yields:
+        callable: Takes a list of tasks and returns their results in the same order.
+    """
+    if workers == 1:
+        start_worker(board, statement_blocks)
+        yield lambda tasks: [statement_effects(task) for task in tasks]
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=start_worker, initargs=(board, statement_blocks)) as pool:
+        yield lambda tasks: list(pool.map(statement_effects, tasks, chunksize=max(1, len(tasks) // 64)))
+
+
+def shortest_program(board, statement_blocks=STATEMENT_BLOCKS, workers=None):
+    """
+    Finds a program with as few blocks as possible that collects the bolt.
+
+    The search only tries statements of up to statement_blocks blocks, moves up to
+    BODY_MOVES inside bodies and the counts in LOOP_COUNTS, so a shorter program outside
+    those limits can be missed. Move and turn blocks are always tried, so it never does
+    worse than a program of those alone.
+
+    Parameters:
+        board (Board): The level.
+        statement_blocks (int): The most blocks in one statement. Defaults to STATEMENT_BLOCKS.
+        workers (int, optional): The number of processes. Defaults to one per CPU.
+
+    Returns:
+        list: (command, value) tuples, ready for compile_program, or None if the bolt cannot
+        be reached.
+
+    Raises:
+        ValueError: If the level has too many states to search, see core.hints.MAX_STATES.
+    """
+    field = distance_field(board)
+    if field is None:
+        raise ValueError("the level has too many states to search")
+    start = (board.index[board.start], board.start_direction, 0, -1)
+    if field.distance(solver_state(board, start)) == UNREACHABLE:
+        return None
+    library = StatementLibrary(board, statement_blocks)
+    # state -> (earlier state, size, statement number) of the statement that first reached it
+    parents = {start: None}
+    # the states first reached with each number of blocks
+    layers = [[start]]
+
+    def program(state):
+        source = []
+        while parents[state] is not None:
+            state, size, number = parents[state]
+            source[:0] = library.statements[size][number]
+        return source
+
+    with task_runner(board, statement_blocks, workers) as run_tasks:
+        blocks = 0
+        # states that can still reach the bolt keep turning up until a program is found
+        while any(layers[-statement_blocks:]):
+            blocks += 1
+            tasks = [
+                (state, size, chunk)
+                for size in library.statements
+                if size <= blocks
+                for state in layers[blocks - size]
+                for chunk in range(library.chunks(size))
+            ]
+            layer = []
+            for (state, size, _), (effects, solved) in zip(tasks, run_tasks(tasks)):
+                if solved is not None:
+                    return program(state) + list(library.statements[size][solved])
+                for following, number in effects:
+                    if following not in parents and field.distance(solver_state(board, following)) != UNREACHABLE:
+                        parents[following] = (state, size, number)
+                        layer.append(following)
+            layers.append(layer)
+    return None
+
+
+def solver_state(board, state):
+    """
+    Turns a search state into the state core.solver and core.hints use, which holds the
+    open doors in place of the pressed buttons.
+
+    Parameters:
+        board (Board): The level.
+        state (tuple): (position, direction, pressed buttons bitset, wormhole).
+
+    Returns:
+        tuple: (position, direction, open doors bitset, wormhole).
+    """
+    position, direction, pressed_bits, wormhole = state
+    doors = 0
+    for button, door in enumerate(board.button_doors):
+        if door is not None and (pressed_bits >> button) & 1:
+            doors |= 1 << door
+    return (position, direction, doors, wormhole)
+
+
+if __name__ == "__main__":
+    from core.layouts import LAYOUTS, save_layout
+    from core.scoring import layout_par, level_par, par_data
+
+    # works out the par of every level without one and saves it in the level's file, since
+    # the game only looks pars up
+    for name, layout in LAYOUTS.items():
+        par = layout_par(layout)
+        if par is None:
+            board = layout.board()
+            par = level_par(board)
+            if par is not None:
+                layout.par = par_data(board, par)
+                save_layout(layout, LAYOUTS.index()[name])
+        if par is None:
+            print(f"level {name}: no solution")
+        else:
+            print(f"level {name}: {par.blocks} blocks, {par.source}")
@@ -0,0 +1,77 @@
+from core.simulator import MOVED, TURNED, Simulator
+
+
+class Timeline:
+    """
+    A run that can be wound back and forth. The simulator's state is snapshotted every
+    interval steps, and seeking to a step restores the last snapshot before it and simulates
+    forward from there, so no seek simulates more than interval steps.
+
+    The snapshots are kept in a buffer of bounded size. When it fills up, every other
+    snapshot is dropped and the interval doubles, so the snapshots still cover the whole run
+    however long it gets, and memory stays bounded while seeks get slower only slowly.
+
+    Attributes:
+        simulator (Simulator): The run.
+        interval (int): The number of steps between snapshots.
+        capacity (int): The most snapshots kept.
+        checkpoints (list): (actions, snapshot) pairs, the one at index i taken at step
+            i * interval.
+        actions (int): The moves and turns the bot has made up to the simulator's step.
+        furthest (int): The furthest step simulated so far.
+    """
+    def __init__(self, board, program, interval=32, capacity=128, simulator_class=Simulator):
+        """
+        Initializes a new Timeline at the start of the run.
+
+        Parameters:
+            board (Board): The level.
+            program (Program): The compiled program.
+            interval (int): The number of steps between snapshots to start with. Defaults to 32.
+            capacity (int): The most snapshots kept. Defaults to 128.
+            simulator_class (type): The Simulator class to run, such as InstrumentedSimulator.
+        """
+        self.simulator = simulator_class(board, program)
+        self.interval = interval
+        self.capacity = capacity
+        self.actions = 0
+        self.furthest = 0
+        self.checkpoints = [(0, self.simulator.snapshot())]
+
+    def step(self):
+        """
+        Runs one step of the simulator, taking a snapshot when one is due.
+
+        Returns:
+            list: The events caused by the step.
+        """
+        events = self.simulator.step()
+        for event in events:
+            if event.kind == MOVED or event.kind == TURNED:
+                self.actions += 1
+        steps = self.simulator.steps
+        if steps > self.furthest:
+            self.furthest = steps
+            if steps % self.interval == 0:
+                self.checkpoints.append((self.actions, self.simulator.snapshot()))
+                if len(self.checkpoints) > self.capacity:
+                    self.checkpoints = self.checkpoints[::2]
+                    self.interval *= 2
+        return events
+
+    def seek(self, step):
+        """
+        Puts the run at a step, restoring the nearest earlier snapshot and simulating forward.
+
+        Parameters:
+            step (int): The step to go to.
+
+        Returns:
+            int: The step reached, earlier than asked for if the run ended first.
+        """
+        index = min(max(step, 0) // self.interval, len(self.checkpoints) - 1)
+        self.actions, snapshot = self.checkpoints[index]
+        self.simulator.restore(snapshot)
+        while self.simulator.steps < step and not self.simulator.done:
+            self.step()
+        return self.simulator.steps
@@ -0,0 +1,221 @@
+"""
+Grades saved student programs without opening the game.
+
+Every block_list_{level}.pickle file found under a directory is run headlessly on its
+level, spread over a pool of processes, and the results are written as a CSV or JSON
+report. The folder a file was found in names the student, so a class can be graded by
+collecting each student's saved files into a folder of their own:
+
+    python grader.py submissions --levels 1 2 3 4 5 --output report.csv
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from core.cache import DiskCache
+from core.layouts import LAYOUTS, get_layout
+from core.program import CompileError, compile_program
+from core.results import RESULTS_DIRECTORY, ResultCache, RunResult
+from core.saved import load_saved_program
+from core.simulator import Simulator
+
+SAVED_FILE = re.compile(r"block_list_(\w+)\.pickle$")
+
+REPORT_FIELDS = ["student", "level", "file", "passed", "status", "steps", "score"]
+
+# steps run between checks of the time limit
+TIME_CHECK_INTERVAL = 1024
+
+
+def find_saved_programs(directory, levels=None):
+    """
+    Finds the saved programs under a directory.
+
+    Parameters:
+        directory (str): The directory to search, including its subdirectories.
+        levels (iterable, optional): The levels to grade. Defaults to every level.
+
+    Returns:
+        list: (student, level, path) tuples sorted by student then level, where student is
+        the path of the file's folder relative to the directory.
+    """
+    levels = set(LAYOUTS if levels is None else levels)
+    found = []
+    for folder, _, filenames in os.walk(directory):
+        student = os.path.relpath(folder, directory).replace(os.sep, "/")
+        for filename in filenames:
+            match = SAVED_FILE.match(filename)
+            if match and match.group(1) in levels:
+                found.append((student, match.group(1), os.path.join(folder, filename)))
+    return sorted(found)
+
+
+def simulate(board, program, max_steps, time_limit):
+    """
+    Runs a program within the grader's limits.
+
+    Parameters:
+        board (Board): The level.
+        program (Program): The compiled program.
+        max_steps (int): The most simulator steps the program may take.
+        time_limit (float): The most seconds the program may run for.
+
+    Returns:
+        tuple: (result, steps, limit), where result is the RunResult of a finished run or
+        None, and limit names the limit that cut the run short, if any.
+    """
+    simulator = Simulator(board, program)
+    trace = []
+    deadline = time.perf_counter() + time_limit
+    while not simulator.done:
+        if simulator.steps >= max_steps:
+            return None, simulator.steps, "step limit"
+        if simulator.steps % TIME_CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+            return None, simulator.steps, "time limit"
+        trace.extend(simulator.step())
+    return RunResult.from_simulator(simulator, trace), simulator.steps, None
+
+
+def grade_program(student, level, path, max_steps, time_limit, cache_directory=None):
+    """
+    Runs one saved program on its level.
+
+    Parameters:
+        student (str): The student the program belongs to.
+        level (str): The level the program was saved for.
+        path (str): The saved file.
+        max_steps (int): The most simulator steps the program may take.
+        time_limit (float): The most seconds the program may run for.
+        cache_directory (str, optional): The result cache to reuse and fill, or None to
+            simulate every program.
+
+    Returns:
+        dict: The report row: the REPORT_FIELDS keys. The score is the number of blocks the
+        student placed, as awarded by the game, and is only given for a solution.
+    """
+    row = dict(student=student, level=level, file=path, passed=False, status=None, steps=0, score=None)
+    try:
+        source, placed = load_saved_program(path)
+        board = get_layout(level).board()
+        program = compile_program(source)
+    except (CompileError, ValueError) as error:
+        row["status"] = f"error: {error}"
+        return row
+    except Exception as error:
+        row["status"] = f"unreadable: {error}"
+        return row
+
+    results = ResultCache(DiskCache(cache_directory)) if cache_directory else None
+    result = results.get(board, program) if results else None
+    if result is not None and result.steps <= max_steps:
+        row["steps"] = result.steps
+    else:
+        result, row["steps"], limit = simulate(board, program, max_steps, time_limit)
+        if result is None:
+            row["status"] = limit
+            return row
+        if results:
+            results.put(board, program, result)
+
+    if result.solved:
+        row.update(passed=True, status="solved", score=placed)
+    elif result.looping:
+        row["status"] = "infinite loop"
+    else:
+        row["status"] = "not solved"
+    return row
+
+
+def grade(directory, levels=None, max_steps=100000, time_limit=5.0, workers=None, cache_directory=None):
+    """
+    Grades every saved program under a directory in parallel.
+
+    Parameters:
+        directory (str): The directory holding the saved programs.
+        levels (iterable, optional): The levels to grade. Defaults to every level.
+        max_steps (int): The most simulator steps per program. Defaults to 100000.
+        time_limit (float): The most seconds per program. Defaults to 5.
+        workers (int, optional): The number of processes. Defaults to one per CPU.
+        cache_directory (str, optional): The result cache to share, or None to not cache.
+
+    Returns:
+        list: A report row per program, see grade_program.
+    """
+    jobs = find_saved_programs(directory, levels)
+    if not jobs:
+        return []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(grade_program, student, level, path, max_steps, time_limit, cache_directory)
+            for student, level, path in jobs
+        ]
+        return [future.result() for future in futures]
+
+
+def write_report(rows, file, report_format="csv"):
+    """
+    Writes a grading report.
+
+    Parameters:
+        rows (list): The report rows, as returned by grade.
+        file (file): The text file to write to.
+        report_format (str): "csv" or "json". Defaults to "csv".
+    """
+    if report_format == "json":
+        json.dump(rows, file, indent=2)
+        file.write("\n")
+    else:
+        writer = csv.DictWriter(file, fieldnames=REPORT_FIELDS, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    """
+    Runs the grader from the command line.
+
+    Parameters:
+        argv (list, optional): The command line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: The exit status, 0 if every program passed and 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description="Grade saved ProBot programs.")
+    parser.add_argument("directory", help="folder holding the saved block_list_{level}.pickle files")
+    parser.add_argument("--levels", nargs="+", help="levels to grade (default: all)")
+    parser.add_argument("--max-steps", type=int, default=100000, help="step limit per program")
+    parser.add_argument("--time-limit", type=float, default=5.0, help="seconds allowed per program")
+    parser.add_argument("--workers", type=int, default=None, help="processes to use (default: one per CPU)")
+    parser.add_argument("--format", choices=("csv", "json"), help="report format (default: from --output, else csv)")
+    parser.add_argument("--output", help="report file (default: print the report)")
+    parser.add_argument("--cache", default=RESULTS_DIRECTORY, help="result cache shared with the game")
+    parser.add_argument("--no-cache", action="store_true", help="simulate every program again")
+    args = parser.parse_args(argv)
+
+    report_format = args.format
+    if report_format is None:
+        report_format = "json" if args.output and args.output.endswith(".json") else "csv"
+
+    cache_directory = None if args.no_cache else args.cache
+    rows = grade(
+        args.directory, args.levels, args.max_steps, args.time_limit, args.workers, cache_directory
+    )
+
+    if args.output:
+        with open(args.output, "w", newline="") as file:
+            write_report(rows, file, report_format)
+    else:
+        write_report(rows, sys.stdout, report_format)
+
+    passed = sum(row["passed"] for row in rows)
+    print(f"{passed} of {len(rows)} programs passed", file=sys.stderr)
+    return 0 if rows and passed == len(rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,7 +21,12 @@ class Leaderboard:
                 temp_user = self.user_dict[key]
                 # Create a text surface with the user's ID and score for the current level.
                 # The score is rendered in black (0, 0, 0) with a font size of 32.
-                text_surface = pygame.font.SysFont(None, 32).render(f"{temp_user.id}, {temp_user.score[self.level]}", True, (255, 255, 255))
+                text = f"{temp_user.id}, {temp_user.score[self.level]}"
+                # Add how the completion compared to par, for users who have one recorded.
+                record = getattr(temp_user, "efficiency", {}).get(self.level)
+                if record is not None:
+                    text += f" ({record['block_ratio']:.2f}x par)"
+                text_surface = pygame.font.SysFont(None, 32).render(text, True, (255, 255, 255))
                 # Draw the text surface onto the screen at the specified position (100, y_pos).
                 screen.blit(text_surface, (550, y_pos))
 
@@ -38,6 +43,35 @@ class Leaderboard:
                     highest_scoring_user = user.id
         return "User: " + str(highest_scoring_user) + ", Score: " +  str(highest_score)
 
+    def get_best_efficiency(self):
+        best_ratio = None
+        best_user = None
+        for user in self.user_dict.values():
+            if user.id != "admin" and user.id != "teacher":
+                record = getattr(user, "efficiency", {}).get(self.level)
+                if record is not None and (best_ratio is None or record["block_ratio"] < best_ratio):
+                    best_ratio = record["block_ratio"]
+                    best_user = user.id
+        if best_ratio is None:
+            return None
+        return "User: " + str(best_user) + ", Blocks vs Par: " + f"{best_ratio:.2f}x"
+
+    def get_average_efficiency(self):
+        total_ratio = 0
+        num_of_users = 0
+
+        for user in self.user_dict.values():
+            if user.id != "admin" and user.id != "teacher":
+                record = getattr(user, "efficiency", {}).get(self.level)
+                if record is not None:
+                    total_ratio += record["block_ratio"]
+                    num_of_users += 1
+
+        if num_of_users > 0:
+            return total_ratio / num_of_users
+        else:
+            return None
+
     def get_highest_overall_score(self):
         highest_score = float('0')
         highest_scoring_user = None
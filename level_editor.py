@@ -0,0 +1,198 @@
+"""
+The teacher's level editor: tiles are placed on the level's grid with the mouse, and what
+is wrong with the level is listed under the grid as it is edited, see core.editor. Saving
+writes the level's file, which the game reads from then on.
+
+The instructor dashboard only opens levels 1 to 5, which all have files, so a blank level is
+only made when edit_level is called with a new name; Clear empties the grid of any level.
+"""
+import os
+
+import pygame
+
+from assets import load_image
+from button import Button
+from core.editor import LevelEditor
+from core.layouts import BOLT, BUTTON, DOOR, FLOOR, LAYOUTS, LEVEL_DATA_DIRECTORY, WALL, WORMHOLE
+from levels import grid_left, grid_top, images, tile_height, tile_location, tile_width
+from sprites import tile_size
+
+# tool name -> the tile it places, or None for the tools that do something else
+TOOLS = {
+    "Floor": FLOOR,
+    "Wall": WALL,
+    "Bolt": BOLT,
+    "Door": DOOR,
+    "Button": BUTTON,
+    "Wormhole": WORMHOLE,
+    "Start": None,
+    "Link": None,
+}
+
+# tools that paint while the mouse is dragged
+PAINT_TOOLS = ("Floor", "Wall")
+
+
+def cell_at(editor, pos):
+    """
+    Gives the cell under a point of the screen.
+
+    Parameters:
+        editor (LevelEditor): The level being edited.
+        pos (tuple): The (x, y) point.
+
+    Returns:
+        tuple: The (row, col) cell, or None if the point is off the grid.
+    """
+    # tile_location gives the centre of a tile
+    col = (pos[0] - grid_left + tile_width // 2) // tile_width
+    row = (pos[1] - grid_top + tile_height // 2) // tile_height
+    if 0 <= row < editor.rows and 0 <= col < editor.cols:
+        return (row, col)
+    return None
+
+
+def draw_level(screen, editor, selected):
+    """
+    Draws the level's tiles, the start, the button to door links and the problems.
+
+    Parameters:
+        screen (pygame.Surface): The surface to draw on.
+        editor (LevelEditor): The level being edited.
+        selected (tuple): The button picked by the link tool, or None.
+    """
+    assets = images / "level_assets"
+    tile_images = {
+        WALL: load_image(assets / "wall.png", tile_size),
+        BOLT: load_image(assets / "bolt.png", tile_size),
+        DOOR: load_image(assets / "door_close.png", tile_size),
+        BUTTON: load_image(assets / "button1.png", tile_size),
+        WORMHOLE: load_image(assets / "wormhole.png", tile_size),
+    }
+    wormhole_images = {
+        "red": load_image(assets / "wormhole2.png", tile_size),
+        "blue": load_image(assets / "wormhole3.png", tile_size),
+    }
+    colors = {}
+    for first, second, color in editor.wormholes:
+        colors[first] = colors[second] = color
+
+    for row in range(editor.rows):
+        for col in range(editor.cols):
+            tile = editor.tile((row, col))
+            if tile == FLOOR:
+                continue
+            image = wormhole_images.get(colors.get((row, col)), tile_images[tile])
+            screen.blit(image, image.get_rect(center=tile_location((row, col))))
+
+    bot = load_image(images / "robot" / "ProBot-1.png", tile_size)
+    screen.blit(bot, bot.get_rect(center=tile_location(editor.start)))
+    for button, door in editor.links.items():
+        pygame.draw.line(screen, "yellow", tile_location(button), tile_location(door), 3)
+    if selected is not None:
+        rect = pygame.Rect((0, 0), tile_size)
+        rect.center = tile_location(selected)
+        pygame.draw.rect(screen, "yellow", rect, 3)
+
+    font = pygame.font.SysFont(None, 24)
+    problems = editor.problems()
+    lines = problems[:5] if problems else ["No problems found"]
+    if len(problems) > 5:
+        lines[-1] = f"... and {len(problems) - 4} more"
+    for number, line in enumerate(lines):
+        color = (180, 0, 0) if problems else (0, 120, 0)
+        screen.blit(font.render(line, True, color), (220, 450 + 20 * number))
+
+
+def edit_level(screen, name, directory=LEVEL_DATA_DIRECTORY):
+    """
+    Runs the level editor for a level until the back button is clicked.
+
+    The left mouse button uses the chosen tool and the right one puts back floor. The
+    link tool links the button clicked first to the door clicked next.
+
+    Parameters:
+        screen (pygame.Surface): The surface to draw on.
+        name (str): The level to edit.
+        directory (str): The folder to save the level file in. Defaults to LEVEL_DATA_DIRECTORY.
+    """
+    name = str(name)
+    editor = LevelEditor(LAYOUTS[name]) if name in LAYOUTS else LevelEditor.blank(name)
+    background = load_image(images / "menus" / editor.background, (1200, 600))
+    tool_buttons = {
+        tool: Button((1075, 80 + 50 * number), (160, 40), "white", tool, 32)
+        for number, tool in enumerate(TOOLS)
+    }
+    back_button = Button((50, 575), (100, 50), "blue", "Back", 32)
+    clear_button = Button((950, 575), (100, 40), "Red", "Clear", 26)
+    save_button = Button((1100, 575), (100, 40), "Green", "Save", 26)
+    font = pygame.font.SysFont(None, 32)
+    tool = "Wall"
+    selected = None
+    message = ""
+    clock = pygame.time.Clock()
+
+    def use_tool(cell, mouse_button):
+        nonlocal selected, message
+        if mouse_button == 3:
+            editor.place(cell, FLOOR)
+        elif tool == "Start":
+            if not editor.set_start(cell):
+                message = "The bot must start on a floor tile"
+        elif tool == "Link":
+            if editor.tile(cell) == BUTTON:
+                selected = cell
+            elif selected is not None and editor.link(selected, cell):
+                selected = None
+        elif not editor.place(cell, TOOLS[tool]):
+            message = "The start tile must stay floor"
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                exit()
+            if back_button.is_clicked(event):
+                return
+            if clear_button.is_clicked(event):
+                editor = LevelEditor.blank(name, editor.rows, editor.cols)
+                selected = None
+            if save_button.is_clicked(event):
+                if editor.unpaired:
+                    message = "Every wormhole needs a pair before saving"
+                else:
+                    editor.save(os.path.join(directory, f"{name}.json"))
+                    LAYOUTS.add(editor.layout())
+                    message = f"Saved level {name}"
+                    if editor.problems():
+                        message += " (it still has problems)"
+            for tool_name, tool_button in tool_buttons.items():
+                if tool_button.is_clicked(event):
+                    tool = tool_name
+                    selected = None
+
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button in (1, 3):
+                cell = cell_at(editor, event.pos)
+                if cell is not None:
+                    message = ""
+                    use_tool(cell, event.button)
+            elif event.type == pygame.MOUSEMOTION and (event.buttons[0] or event.buttons[2]):
+                cell = cell_at(editor, event.pos)
+                if cell is not None and (tool in PAINT_TOOLS or event.buttons[2]):
+                    use_tool(cell, 3 if event.buttons[2] else 1)
+
+        screen.blit(background, (0, 0))
+        draw_level(screen, editor, selected)
+        for tool_name, tool_button in tool_buttons.items():
+            tool_button.draw(screen)
+            if tool_name == tool:
+                pygame.draw.rect(screen, "yellow", tool_button.rect, 3)
+        screen.blit(font.render(f"Editing level {name}", True, (0, 0, 0)), (220, 20))
+        if message:
+            screen.blit(font.render(message, True, (0, 0, 0)), (600, 20))
+
+        back_button.draw(screen)
+        clear_button.draw(screen)
+        save_button.draw(screen)
+        pygame.display.update()
+        clock.tick(60)
@@ -1,7 +1,10 @@
 import pygame
 import pickle
 import os
+import json
 import pathlib
+from collections import deque
+from assets import load_image
 from button import Button
 from code_block import (
     CodeBlock,
@@ -9,6 +12,27 @@ from code_block import (
     ConditionalBlock,
     EndConditionalBlock,
 )
+from core.hints import advance, distance_field
+from core.instrument import InstrumentedSimulator
+from core.layouts import LAYOUTS, get_layout
+from core.program import CompileError, compile_program, read_blocks
+from core.results import Replay, ResultCache, RunResult
+from core.saved import PALETTE_POSITIONS
+from core.scoring import efficiency, layout_par
+from core.solver import AROUND, FORWARD, LEFT, RIGHT, start_state
+from core.timeline import Timeline
+from core.simulator import (
+    UP,
+    DIRECTIONS,
+    MOVED,
+    TURNED,
+    TELEPORTED,
+    PRESSED,
+    COLLECTED,
+    Simulator,
+)
+from scheduler import TICKS_PER_SECOND, StepScheduler
+from scrub_bar import ScrubBar
 from sprites import Bot, Wall, Bolt, DoorButton, Door, Wormhole, Trash
 from pathlib import Path, WindowsPath, PosixPath
 
@@ -20,188 +44,322 @@ tile_height = 41
 
 images = Path("images")
 
-pixel_to_location = [
-    [
-        (79, 76),
-        (120, 76),
-        (161, 76),
-        (202, 76),
-        (243, 76),
-        (284, 76),
-        (325, 76),
-        (366, 76),
-        (407, 76),
-        (448, 76),
-        (489, 76),
-        (530, 76),
-        (571, 76),
-        (612, 76),
-        (653, 76),
-        (694, 76),
-        (735, 76),
-        (776, 76),
-    ],
-    [
-        (79, 117),
-        (120, 117),
-        (161, 117),
-        (202, 117),
-        (243, 117),
-        (284, 117),
-        (325, 117),
-        (366, 117),
-        (407, 117),
-        (448, 117),
-        (489, 117),
-        (530, 117),
-        (571, 117),
-        (612, 117),
-        (653, 117),
-        (694, 117),
-        (735, 117),
-        (776, 117),
-    ],
-    [
-        (79, 158),
-        (120, 158),
-        (161, 158),
-        (202, 158),
-        (243, 158),
-        (284, 158),
-        (325, 158),
-        (366, 158),
-        (407, 158),
-        (448, 158),
-        (489, 158),
-        (530, 158),
-        (571, 158),
-        (612, 158),
-        (653, 158),
-        (694, 158),
-        (735, 158),
-        (776, 158),
-    ],
-    [
-        (79, 199),
-        (120, 199),
-        (161, 199),
-        (202, 199),
-        (243, 199),
-        (284, 199),
-        (325, 199),
-        (366, 199),
-        (407, 199),
-        (448, 199),
-        (489, 199),
-        (530, 199),
-        (571, 199),
-        (612, 199),
-        (653, 199),
-        (694, 199),
-        (735, 199),
-        (776, 199),
-    ],
-    [
-        (79, 240),
-        (120, 240),
-        (161, 240),
-        (202, 240),
-        (243, 240),
-        (284, 240),
-        (325, 240),
-        (366, 240),
-        (407, 240),
-        (448, 240),
-        (489, 240),
-        (530, 240),
-        (571, 240),
-        (612, 240),
-        (653, 240),
-        (694, 240),
-        (735, 240),
-        (776, 240),
-    ],
-    [
-        (79, 281),
-        (120, 281),
-        (161, 281),
-        (202, 281),
-        (243, 281),
-        (284, 281),
-        (325, 281),
-        (366, 281),
-        (407, 281),
-        (448, 281),
-        (489, 281),
-        (530, 281),
-        (571, 281),
-        (612, 281),
-        (653, 281),
-        (694, 281),
-        (735, 281),
-        (776, 281),
-    ],
-    [
-        (79, 322),
-        (120, 322),
-        (161, 322),
-        (202, 322),
-        (243, 322),
-        (284, 322),
-        (325, 322),
-        (366, 322),
-        (407, 322),
-        (448, 322),
-        (489, 322),
-        (530, 322),
-        (571, 322),
-        (612, 322),
-        (653, 322),
-        (694, 322),
-        (735, 322),
-        (776, 322),
-    ],
-    [
-        (79, 363),
-        (120, 363),
-        (161, 363),
-        (202, 363),
-        (243, 363),
-        (284, 363),
-        (325, 363),
-        (366, 363),
-        (407, 363),
-        (448, 363),
-        (489, 363),
-        (530, 363),
-        (571, 363),
-        (612, 363),
-        (653, 363),
-        (694, 363),
-        (735, 363),
-        (776, 363),
-    ],
-    [
-        (79, 404),
-        (120, 404),
-        (161, 404),
-        (202, 404),
-        (243, 404),
-        (284, 404),
-        (325, 404),
-        (366, 404),
-        (407, 404),
-        (448, 404),
-        (489, 404),
-        (530, 404),
-        (571, 404),
-        (612, 404),
-        (653, 404),
-        (694, 404),
-        (735, 404),
-        (776, 404),
-    ],
-]
+# the pixel position of the top left tile, and so of the whole grid
+grid_left = 79
+grid_top = 76
+
+
+def tile_location(cell):
+    """
+    Gives the pixel position the level's sprites are drawn at on a tile.
+
+    Parameters:
+        cell (tuple): The (row, col) of the tile.
+
+    Returns:
+        tuple: The (x, y) pixel position.
+    """
+    return (grid_left + cell[1] * tile_width, grid_top + cell[0] * tile_height)
+
+
+def bot_center(cell):
+    """
+    Gives the pixel position of the bot's center when it stands on a tile.
+    The bot is drawn one pixel right of and below the level's sprites.
+
+    Parameters:
+        cell (tuple): The (row, col) of the tile.
+
+    Returns:
+        tuple: The (x, y) pixel position.
+    """
+    x, y = tile_location(cell)
+    return (x + 1, y + 1)
+
+
+class BotRun:
+    """
+    One bot running one program on a level: the simulator works out what the program does
+    and the bot sprite shows it, an event at a time. A level has a single run for the player,
+    while a race has one per entry. Every run has its own simulator, and so its own doors
+    and buttons, and opens and presses only the sprites it is given: the player's run is
+    given the level's, while race entries are given none and draw their doors another way.
+
+    Attributes:
+        board (Board): The level.
+        sprite_at (dict): The level's door, button and wormhole sprites by cell.
+        skin (str): The file name of the bot's skin.
+        results (ResultCache): The results of earlier runs, or None to always simulate.
+        instrumented (bool): Whether runs count what the program did, see InstrumentedSimulator.
+        bot (Bot): The bot sprite.
+        simulator (Simulator): The run's simulator or Replay, or None before the run starts.
+        timeline (Timeline): Snapshots of the simulator for seeking, or None for a replay
+            that has not been sought in.
+        program (Program): The program being run.
+        trace (list): The events recorded so far for the result cache, or None.
+        pending_events (deque): Events simulated but not yet shown.
+        hint_state (tuple): The state of the bot as shown on screen, see core.solver.
+        actions_taken (int): The moves and turns the bot has made so far in the run.
+        move_target (tuple): The pixel position the bot is walking to, or None.
+        previous_center (tuple): Where the bot was at the start of the latest tick, for
+            drawing it between ticks.
+        collected (bool): True once the bot has been shown collecting the bolt.
+    """
+    def __init__(self, board, sprite_at, skin="ProBot-1.png", results=None):
+        """
+        Initializes a new BotRun with the bot on its starting tile.
+
+        Parameters:
+            board (Board): The level.
+            sprite_at (dict): The level's door, button and wormhole sprites by cell, which the
+                run opens and presses. Empty to leave the level's sprites as they are.
+            skin (str): The file name of the bot's skin. Defaults to "ProBot-1.png".
+            results (ResultCache, optional): Where to look up and store results.
+        """
+        self.board = board
+        self.sprite_at = sprite_at
+        self.skin = skin
+        self.results = results
+        self.instrumented = False
+        self.reset()
+
+    def reset(self):
+        """
+        Puts the bot back on its starting tile, ready for the next run.
+        """
+        self.bot = Bot(self.skin)
+        self.bot.bot_rect.center = bot_center(self.board.start)
+        self.previous_center = self.bot.bot_rect.center
+        if self.board.start_direction != UP:
+            self.bot.face(DIRECTIONS[self.board.start_direction])
+        self.simulator = None
+        self.timeline = None
+        self.program = None
+        self.trace = None
+        self.pending_events = deque()
+        self.hint_state = start_state(self.board)
+        self.actions_taken = 0
+        self.move_target = None
+        self.collected = False
+
+    def start(self, program):
+        """
+        Starts running a compiled program from the beginning of the level. A program that
+        has been run on this level before is played back from the result cache; otherwise
+        it is simulated and its events are recorded for the cache as they are shown.
+
+        Parameters:
+            program (Program): The compiled program.
+        """
+        self.reset()
+        self.program = program
+        # a replay has no counts, so instrumented runs are always simulated
+        cached = None
+        if self.results is not None and not self.instrumented:
+            cached = self.results.get(self.board, program)
+        if cached is not None:
+            self.simulator = Replay(cached)
+        else:
+            self.timeline = self.new_timeline()
+            self.simulator = self.timeline.simulator
+            if self.results is not None:
+                self.trace = []
+
+    def new_timeline(self):
+        """
+        Returns:
+            Timeline: A fresh run of the program, counted if the run is instrumented.
+        """
+        simulator_class = InstrumentedSimulator if self.instrumented else Simulator
+        return Timeline(self.board, self.program, simulator_class=simulator_class)
+
+    def step(self):
+        """
+        Runs one step of the simulator, queueing its events to be shown.
+        """
+        if self.timeline is not None:
+            events = self.timeline.step()
+        else:
+            events = self.simulator.step()
+        self.pending_events.extend(events)
+        if self.trace is not None:
+            self.record_events(events)
+
+    def play_frame(self, pixels, may_step, seconds=1 / TICKS_PER_SECOND):
+        """
+        Shows one tick of the run. The bot walks up to the given number of pixels, applying
+        the simulator's events and stepping the simulator in between for as long as it may.
+
+        Parameters:
+            pixels (int): The most pixels to walk, or None to jump straight to each tile.
+            may_step (callable): Asked before each simulator step; the run stops stepping for
+                this tick once it returns False.
+            seconds (float): How long the tick lasts, for the walk animation.
+
+        Returns:
+            int: The pixels left unwalked, or None if pixels was None.
+        """
+        self.previous_center = self.bot.bot_rect.center
+        walked = False
+        while not self.collected:
+            if self.move_target is not None:
+                if pixels is None:
+                    self.bot.bot_rect.center = self.move_target
+                    self.move_target = None
+                elif pixels > 0:
+                    pixels -= self.animate_move(pixels)
+                    walked = True
+                else:
+                    break
+            elif self.pending_events:
+                self.apply_event(self.pending_events.popleft())
+            elif self.simulator.done or not may_step():
+                break
+            else:
+                self.step()
+        if walked:
+            self.bot.animate_bot(seconds)
+        else:
+            self.previous_center = self.bot.bot_rect.center
+        return pixels
+
+    def draw(self, screen, alpha=1.0):
+        """
+        Draws the bot part way between where it was at the start of the latest tick and
+        where it is now, so its walk looks smooth at any frame rate.
+
+        Parameters:
+            screen (pygame.Surface): The surface to draw on.
+            alpha (float): How far between the two to draw it, from 0 to 1. Defaults to 1,
+                where the bot is now.
+        """
+        (old_x, old_y), (x, y) = self.previous_center, self.bot.bot_rect.center
+        center = (round(old_x + (x - old_x) * alpha), round(old_y + (y - old_y) * alpha))
+        screen.blit(self.bot.bot_surface, self.bot.bot_surface.get_rect(center=center))
+
+    def last_step(self):
+        """
+        Gives the furthest step of the run that can be sought to.
+
+        Returns:
+            int: The furthest step simulated, or the length of a replayed run.
+        """
+        if self.timeline is not None:
+            return max(self.timeline.furthest, self.simulator.steps)
+        return self.simulator.steps
+
+    def seek(self, step):
+        """
+        Jumps the run to a step and shows the bot, doors and buttons as they were then.
+        A replayed run is simulated again the first time it is sought in. The run is no
+        longer recorded for the result cache after a seek.
+
+        Parameters:
+            step (int): The step to go to.
+        """
+        if self.timeline is None:
+            self.timeline = self.new_timeline()
+        self.timeline.seek(step)
+        simulator = self.simulator = self.timeline.simulator
+        self.trace = None
+        self.pending_events.clear()
+        self.move_target = None
+        self.collected = simulator.solved
+        self.bot.bot_rect.center = bot_center(simulator.cell)
+        self.previous_center = self.bot.bot_rect.center
+        self.bot.face(DIRECTIONS[simulator.direction])
+        pressed = simulator.pressed
+        open_doors = simulator.open_doors
+        for cell, sprite in self.sprite_at.items():
+            if type(sprite) is DoorButton:
+                if cell in pressed:
+                    sprite.setPressed()
+                else:
+                    sprite.un_press()
+            elif type(sprite) is Door:
+                if cell in open_doors:
+                    sprite.openDoor()
+                else:
+                    sprite.closeDoor()
+        self.hint_state = (simulator.position, simulator.direction, simulator.open_door_bits, simulator.wormhole)
+        self.actions_taken = self.timeline.actions
+
+    def record_events(self, events):
+        """
+        Adds a step's events to the trace of the run, and stores the run in the result
+        cache once the simulator is done.
+
+        Parameters:
+            events (list): The events of the latest step.
+        """
+        self.trace.extend(events)
+        if self.simulator.done:
+            self.results.put(
+                self.board, self.program, RunResult.from_simulator(self.simulator, self.trace)
+            )
+            self.trace = None
+
+    def apply_event(self, event):
+        """
+        Shows a single simulator event.
+
+        Parameters:
+            event (Event): The event to show.
+        """
+        self.hint_state = advance(self.board, self.hint_state, event)
+        if event.kind == MOVED:
+            self.move_target = bot_center(event.cell)
+            self.actions_taken += 1
+        elif event.kind == TURNED:
+            self.bot.face(DIRECTIONS[event.direction])
+            self.actions_taken += 1
+        elif event.kind == TELEPORTED:
+            self.bot.bot_rect.center = bot_center(event.cell)
+            self.previous_center = self.bot.bot_rect.center
+        elif event.kind == PRESSED and event.cell in self.sprite_at:
+            button = self.sprite_at[event.cell]
+            button.setPressed()
+            if button.linkedDoor is not None:
+                button.linkedDoor.openDoor()
+        elif event.kind == COLLECTED:
+            self.collected = True
+
+    def animate_move(self, pixels=1):
+        """
+        Walks the bot towards the tile it is moving onto.
+
+        Parameters:
+            pixels (int): The most pixels to walk. Defaults to 1.
+
+        Returns:
+            int: The pixels actually walked, less than asked for if the tile was reached.
+        """
+        x, y = self.bot.bot_rect.center
+        target_x, target_y = self.move_target
+        step_x = max(-pixels, min(pixels, target_x - x))
+        step_y = max(-pixels, min(pixels, target_y - y))
+        self.bot.bot_rect.center = (x + step_x, y + step_y)
+        if self.bot.bot_rect.center == self.move_target:
+            self.move_target = None
+        return max(abs(step_x), abs(step_y))
+
+    def showing(self):
+        """
+        Checks whether the bot still has simulated events to show.
+
+        Returns:
+            bool: True if the bot is walking or has events waiting.
+        """
+        return self.move_target is not None or bool(self.pending_events)
+
+    def finished(self):
+        """
+        Checks whether the run has ended and everything it did has been shown.
+
+        Returns:
+            bool: True if there is nothing left to simulate or animate.
+        """
+        return self.collected or (self.simulator.done and not self.showing())
 
 
 class Tutorial:
@@ -310,34 +468,49 @@ class Tutorial:
 class Level:
     """
     This class manages the levels in the game, including drawing the level layout,
-    executing user code, and handling level completion.
+    executing user code, and handling level completion. The rules of the level live in
+    the core package; this class draws them and animates the simulator's events.
     
     Attributes:
         user (User): The user object for the level.
         screen (pygame.Surface): The screen surface to display the level.
         level (str): The level identifier.
         hint (str, optional): A hint for the level.
+        given_hint (str): The hint passed in place of the level file's, or None.
         hint_button (Button): Button to display the hint.
+        smart_hint_button (Button): Button to display the best next move from where the bot is.
+        stats_button (Button): Button to count what the next runs do and show the counts.
+        export_button (Button): Button to save the counts of the run to a file.
+        show_stats (bool): Whether runs are counted and the counts shown.
+        hint_text (str): The text shown in the hint box.
+        level_layout (LevelLayout): The core definition of the level.
+        board (Board): The simulator's view of the level.
+        sprite_at (dict): Maps the cells of doors, buttons and wormholes to their sprites.
+        scheduler (StepScheduler): Paces the running of the user's code.
+        results (ResultCache): The results of earlier runs, replayed instead of simulated again.
+        runner (BotRun): The player's bot and the run of their code.
+        scrub_bar (ScrubBar): Seeks to any step of the run.
     """
     def __init__(self, level, user, screen, hint=None):
         """
         Initialize the Level object with a level number, user, screen, and an optional hint.
+        The level's layout, hint and background come from its level file.
         
         Parameters:
             level (str): The identifier for the level.
             user (User): The user playing the level.
             screen (pygame.Surface): The surface to draw the level on.
-            hint (str, optional): The hint text for the level.
+            hint (str, optional): The hint text for the level, in place of the level file's.
         """
         self.user = user
         self.screen = screen
         self.level = level
-        self.pixel_count = 0
-        self.obstacle_list = pygame.sprite.Group()
-        self.hint = hint
+        self.given_hint = hint
         self.hint_button = Button((1200 - 90, 30), (80, 30), "Light Blue", "Hint", 24)  # Initialize hint button
-        self.background_image_filename = f"level{level}.png" if level != 'tutorial' else "game_screen.png"
-
+        self.smart_hint_button = Button((1200 - 180, 30), (80, 30), "Light Green", "Smart", 24)
+        self.stats_button = Button((1200 - 265, 30), (70, 30), "Light Yellow", "Stats", 24)
+        self.export_button = Button((1200 - 340, 30), (70, 30), "Light Yellow", "Export", 24)
+        self.show_stats = False
 
         sandbox_width = 1140 - 832
         sandbox_height = 578 - 177
@@ -348,7 +521,7 @@ class Level:
             bot_skin = user.skin
         else:
             bot_skin = "ProBot-1.png"  # Default skin filename with extension
-        self.bot = Bot(bot_skin)
+        self.bot_skin = bot_skin
 
         self.scroll_surf = pygame.Surface((sandbox_width, sandbox_height * 3))
         self.scroll_surf.fill("Grey")
@@ -368,317 +541,208 @@ class Level:
 
         self.show_hint = False
 
-        if level == "tutorial":
-            self.hint_button = Button(
-                (1200 - 90, 30), (80, 30), "Light Blue", "Hint", 24
-            )
+        self.scheduler = StepScheduler()
+        self.results = ResultCache()
+        self.use_layout(get_layout(level))
+        self.scrub_bar = ScrubBar((200, 22), (420, 12))
 
-            self.layout = [
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-            ]
-
-            # Add obstacles and the bolt to the obstacle list
-            for row in range(len(self.layout)):
-                for col in range(len(self.layout[row])):
-                    position = pixel_to_location[row][col]
-                    if self.layout[row][col] == 3:
-                        self.obstacle_list.add(Bolt(position))
-
-        if level == "1":
-            self.hint_button = Button(
-                (1200 - 90, 30), (80, 30), "Light Blue", "Hint", 24
-            )
+    def use_layout(self, layout):
+        """
+        Builds everything that comes from the level's layout: the hint, the background, the
+        board, the sprites and the bot, which is put back on the start tile. Called again
+        when the level's file changes while the level is open.
 
-            # add obstacles
-            self.bolt = Bolt(pixel_to_location[4][8])
-            self.obstacle_list.add(self.bolt)
-
-            # layout
-            self.layout = [
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 2, 2, 2, 0, 0, 0, 2, 0, 2, 0, 0, 0, 2, 2, 2, 0, 0],
-                [0, 2, 2, 2, 0, 0, 0, 0, 3, 0, 0, 0, 0, 2, 2, 2, 0, 0],
-                [0, 2, 2, 2, 0, 0, 0, 2, 0, 2, 0, 0, 0, 2, 2, 2, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-            ]
-
-            for row in range(len(self.layout)):
-                for col in range(len(self.layout[0])):
-                    if self.layout[row][col] == 2:
-                        self.obstacle_list.add(Wall(pixel_to_location[row][col]))
-                    elif self.layout[row][col] == 3:
-                        self.obstacle_list.add(Bolt(pixel_to_location[row][col]))
-
-        if level == "2":
-
-            self.hint_button = Button(
-                (1200 - 90, 30), (80, 30), "Light Blue", "Hint", 24
-            )
+        Parameters:
+            layout (LevelLayout): The level's layout.
+        """
+        self.level_layout = layout
+        self.hint = self.given_hint if self.given_hint is not None else (layout.hint or "")
+        self.hint_text = self.hint
+        self.background_image_filename = layout.background
+        self.board = layout.board()
+        self.obstacle_list = pygame.sprite.Group()
+        self.build_sprites()
+        self.runner = BotRun(self.board, self.sprite_at, self.bot_skin, self.results)
+        self.runner.instrumented = self.show_stats
 
-            # add obstacles
-            self.worm1 = Wormhole(pixel_to_location[0][0])
-            self.worm2 = Wormhole(pixel_to_location[8][12])
-            self.worm1.link = self.worm2
-            self.worm2.link = self.worm1
-            self.dbutton = DoorButton(pixel_to_location[0][14])
-            self.door = Door(pixel_to_location[2][16])
-            self.dbutton.linkedDoor = self.door
-            self.bolt = Bolt(pixel_to_location[2][17])
-
-            self.obstacle_list.add(self.door)
-            self.obstacle_list.add(self.dbutton)
-            self.obstacle_list.add(self.bolt)
-            self.obstacle_list.add(self.worm1)
-            self.obstacle_list.add(self.worm2)
-
-            # layout
-            self.layout = [
-                [self.worm1, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, self.dbutton, 0, 0, 0,],
-                [2, 0, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 0, 2],
-                [0, 0, 2, 0, 0, 0, 2, 0, 0, 2, 0, 2, 0, 2, 0, 0, self.door, 3],
-                [0, 0, 0, 0, 2, 0, 0, 0, 0, 2, 0, 0, 0, 2, 0, 0, 2, 2],
-                [2, 2, 2, 2, 2, 2, 2, 2, 0, 0, 0, 2, 0, 0, 0, 0, 2, 2],
-                [2, 0, 0, 0, 0, 0, 0, 2, 0, 2, 2, 2, 0, 2, 0, 0, 0, 0],
-                [2, 0, 2, 2, 0, 2, 0, 0, 0, 2, 2, 2, 0, 2, 0, 0, 0, 0],
-                [2, 0, 0, 2, 0, 2, 2, 2, 2, 2, 2, 0, 0, 2, 0, 0, 0, 0],
-                [2, 0, 0, 2, 0, 2, 2, 2, 2, 2, 2, 0, self.worm2, 2, 0, 0, 0, 0],
-            ]
-
-            for row in range(len(self.layout)):
-                for col in range(len(self.layout[0])):
-                    if self.layout[row][col] == 2:
-                        self.obstacle_list.add(Wall(pixel_to_location[row][col]))
-                    elif self.layout[row][col] == 3:
-                        self.obstacle_list.add(Bolt(pixel_to_location[row][col]))
-
-        if level == "3":
-            self.hint_button = Button(
-                (1200 - 90, 30), (80, 30), "Light Blue", "Hint", 24
-            )
+    def reload_layout(self):
+        """
+        Checks the level files for changes, see LevelRegistry.poll, and rebuilds the level
+        if its layout was replaced, so edits to its file show without restarting the game.
 
-            self.layout = [
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 0],
-                [0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 0],
-                [0, 2, 0, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 0, 2, 0],
-                [0, 2, 0, 2, 3, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 0, 2, 0],
-                [0, 2, 0, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 0, 2, 0, 2, 0],
-                [0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 0, 2, 0],
-                [0, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 0, 2, 0],
-                [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 0],
-            ]
-
-            for row in range(len(self.layout)):
-                for col in range(len(self.layout[0])):
-                    if self.layout[row][col] == 2:
-                        self.obstacle_list.add(Wall(pixel_to_location[row][col]))
-                    elif self.layout[row][col] == 3:
-                        self.obstacle_list.add(Bolt(pixel_to_location[row][col]))
-        if level == "4":
-            self.hint_button = Button(
-                (1200 - 90, 30), (80, 30), "Light Blue", "Hint", 24
-            )
+        Returns:
+            bool: True if the level was rebuilt.
+        """
+        LAYOUTS.poll()
+        layout = get_layout(self.level)
+        if layout is self.level_layout:
+            return False
+        self.use_layout(layout)
+        return True
+
+    def build_sprites(self):
+        """
+        Creates the sprites that draw the level's layout and links them the way the layout
+        links its tiles.
+        """
+        board = self.board
+        self.sprite_at = {}
+
+        for cell in board.doors:
+            self.sprite_at[cell] = Door(tile_location(cell))
+        for cell, door in board.buttons.items():
+            button = DoorButton(tile_location(cell))
+            if door is not None:
+                button.linkedDoor = self.sprite_at[door]
+            self.sprite_at[cell] = button
+        for first, second, color in self.level_layout.wormholes:
+            pair = [Wormhole(tile_location(cell)) for cell in (first, second)]
+            pair[0].link = pair[1]
+            pair[1].link = pair[0]
+            for wormhole, cell in zip(pair, (first, second)):
+                if color is not None:
+                    wormhole.image = getattr(wormhole, color)
+                self.sprite_at[cell] = wormhole
+
+        for sprite in self.sprite_at.values():
+            self.obstacle_list.add(sprite)
+        for cell in board.bolts:
+            self.obstacle_list.add(Bolt(tile_location(cell)))
+        for cell in board.walls:
+            self.obstacle_list.add(Wall(tile_location(cell)))
+
+    @property
+    def bot(self):
+        """
+        Bot: The player's bot sprite.
+        """
+        return self.runner.bot
 
-            # add obstacles
-            self.dbutton1 = DoorButton(pixel_to_location[0][3])
-            self.dbutton2 = DoorButton(pixel_to_location[0][17])
-            self.dbutton3 = DoorButton(pixel_to_location[5][3])
-            self.dbutton4 = DoorButton(pixel_to_location[5][17])
-            self.door1 = Door(pixel_to_location[3][7])
-            self.door2 = Door(pixel_to_location[3][8])
-            self.door3 = Door(pixel_to_location[3][9])
-            self.door4 = Door(pixel_to_location[3][10])
-            self.dbutton1.linkedDoor = self.door1
-            self.dbutton2.linkedDoor = self.door2
-            self.dbutton3.linkedDoor = self.door3
-            self.dbutton4.linkedDoor = self.door4
-            self.worm1 = Wormhole(pixel_to_location[8][14])
-            self.worm2 = Wormhole(pixel_to_location[8][3])
-            self.worm1.link = self.worm2
-            self.worm2.link = self.worm1
-            self.worm3 = Wormhole(pixel_to_location[8][0])
-            self.worm4 = Wormhole(pixel_to_location[3][17])
-            self.worm3.image = self.worm3.blue
-            self.worm4.image = self.worm4.blue
-            self.worm3.link = self.worm4
-            self.worm4.link = self.worm3
-            self.worm5 = Wormhole(pixel_to_location[3][14])
-            self.worm6 = Wormhole(pixel_to_location[3][3])
-            self.worm5.image = self.worm5.red
-            self.worm6.image = self.worm6.red
-            self.worm5.link = self.worm6
-            self.worm6.link = self.worm5
-            self.worm7 = Wormhole(pixel_to_location[3][0])
-            self.worm8 = Wormhole(pixel_to_location[6][10])
-            self.worm7.link = self.worm8
-            self.worm8.link = self.worm7
-            self.bolt = Bolt(pixel_to_location[6][7])
-
-            self.obstacle_list.add(self.door1)
-            self.obstacle_list.add(self.door2)
-            self.obstacle_list.add(self.door3)
-            self.obstacle_list.add(self.door4)
-            self.obstacle_list.add(self.dbutton1)
-            self.obstacle_list.add(self.dbutton2)
-            self.obstacle_list.add(self.dbutton3)
-            self.obstacle_list.add(self.dbutton4)
-            self.obstacle_list.add(self.bolt)
-            self.obstacle_list.add(self.worm1)
-            self.obstacle_list.add(self.worm2)
-            self.obstacle_list.add(self.worm3)
-            self.obstacle_list.add(self.worm4)
-            self.obstacle_list.add(self.worm5)
-            self.obstacle_list.add(self.worm6)
-            self.obstacle_list.add(self.worm7)
-            self.obstacle_list.add(self.worm8)
-
-            self.layout = [
-                [
-                    0,
-                    0,
-                    0,
-                    self.dbutton1,
-                    2,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    2,
-                    0,
-                    0,
-                    0,
-                    self.dbutton2,
-                ],
-                [0, 0, 0, 0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 2, 0, 0, 0, 0],
-                [0, 0, 0, 0, 2, 0, 2, 2, 2, 2, 2, 2, 0, 2, 0, 0, 0, 0],
-                [
-                    self.worm7,
-                    0,
-                    0,
-                    self.worm6,
-                    2,
-                    0,
-                    2,
-                    self.door1,
-                    self.door2,
-                    self.door3,
-                    self.door4,
-                    2,
-                    0,
-                    2,
-                    self.worm5,
-                    0,
-                    0,
-                    self.worm4,
-                ],
-                [2, 2, 2, 2, 2, 0, 2, 0, 2, 2, 0, 2, 0, 2, 2, 2, 2, 2],
-                [
-                    0,
-                    0,
-                    0,
-                    self.dbutton3,
-                    2,
-                    0,
-                    2,
-                    0,
-                    2,
-                    2,
-                    0,
-                    2,
-                    0,
-                    2,
-                    0,
-                    0,
-                    0,
-                    self.dbutton4,
-                ],
-                [0, 0, 0, 0, 2, 0, 2, 3, 2, 2, self.worm8, 2, 0, 2, 0, 0, 0, 0],
-                [0, 0, 0, 0, 2, 0, 2, 2, 2, 2, 2, 2, 0, 2, 0, 0, 0, 0],
-                [
-                    self.worm3,
-                    0,
-                    0,
-                    self.worm2,
-                    2,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    0,
-                    2,
-                    self.worm1,
-                    0,
-                    0,
-                    0,
-                ],
-            ]
-            for row in range(len(self.layout)):
-                for col in range(len(self.layout[0])):
-                    if self.layout[row][col] == 2:
-                        self.obstacle_list.add(Wall(pixel_to_location[row][col]))
-                    elif self.layout[row][col] == 3:
-                        self.obstacle_list.add(Bolt(pixel_to_location[row][col]))
-
-        if level == "5":
-            self.hint_button = Button(
-                (1200 - 90, 30), (80, 30), "Light Blue", "Hint", 24
-            )
+    def reset_run(self):
+        """
+        Puts the bot back on its starting tile and closes every door and button,
+        ready for the next run of the user's code.
+        """
+        self.runner.reset()
+        for sprite in self.sprite_at.values():
+            if type(sprite) is DoorButton:
+                sprite.un_press()
+            elif type(sprite) is Door:
+                sprite.closeDoor()
+
+    def start_run(self, program):
+        """
+        Starts running a compiled program from the beginning of the level.
 
-            # add obstacles
-            self.dbutton0 = DoorButton(pixel_to_location[3][8])
-            self.door1 = Door(pixel_to_location[3][1])
-            self.dbutton0.linkedDoor = self.door1
-            self.worm1 = Wormhole(pixel_to_location[1][1])
-            self.worm2 = Wormhole(pixel_to_location[2][3])
-            self.worm1.link = self.worm2
-            self.worm2.link = self.worm1
-
-            self.obstacle_list.add(self.door1)
-            self.obstacle_list.add(self.dbutton0)
-            self.obstacle_list.add(self.worm1)
-            self.obstacle_list.add(self.worm2)
-
-            self.layout = [
-                [0, 0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
-                [0, self.worm1, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2],
-                [0, 0, 2, self.worm2, 0, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8],
-                [2, 6, 2, 0, 0, 8, 8, 8, self.dbutton0, 8, 8, 8, 8, 8, 8, 8, 8, 8],
-                [2, 0, 2, 0, 0, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8],
-                [2, 3, 2, 0, 0, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8, 8],
-                [0, 0, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 2, 0],
-                [0, 0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 0, 0],
-                [0, 0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 2, 0, 0],
-            ]
-
-            for row in range(len(self.layout)):
-                for col in range(len(self.layout[0])):
-                    if self.layout[row][col] == 2:
-                        self.obstacle_list.add(Wall(pixel_to_location[row][col]))
-                    elif self.layout[row][col] == 3:
-                        self.obstacle_list.add(Bolt(pixel_to_location[row][col]))
-                    elif self.layout[row][col] == 8:
-                        db = DoorButton(pixel_to_location[row][col])
-                        self.layout[row][col] = db
-                        self.obstacle_list.add(db)
+        Parameters:
+            program (Program): The compiled user code.
+        """
+        self.reset_run()
+        self.runner.start(program)
+        self.scheduler.restart()
+
+    def play_frame(self):
+        """
+        Shows one frame of the run at the scheduler's speed. The run advances by as many fixed
+        ticks as the real time since the last frame holds, so it goes at the same pace at any
+        frame rate. In instant mode moves are not animated, so the whole run is normally
+        simulated and shown in a single frame.
+        """
+        scheduler = self.scheduler
+        scheduler.begin_frame()
+        if scheduler.instant:
+            self.runner.play_frame(None, scheduler.has_time)
+            return
+        while not self.runner.collected and scheduler.take_tick():
+            self.runner.play_frame(scheduler.pixels_per_frame, scheduler.step_quota(), scheduler.timestep)
+
+    def speed_button(self):
+        """
+        Creates the button showing the current run speed, clicked to switch to the next one.
+
+        Returns:
+            Button: The speed button.
+        """
+        return Button((1050, 200), (50, 20), "Yellow", self.scheduler.speed, 22)
+
+    def run_finished(self):
+        """
+        Checks whether the current run has ended and everything it did has been shown.
+
+        Returns:
+            bool: True if there is nothing left to simulate or animate.
+        """
+        return self.runner.finished()
+
+    def smart_hint(self):
+        """
+        Works out how far the bolt is from where the bot is on screen, even in the middle of
+        a run, and the best move to make next. The answers are worked out for every state
+        the first time a smart hint is asked for on the level, and only looked up after that.
+
+        Returns:
+            str: The hint.
+        """
+        if self.runner.collected:
+            return "You collected the bolt!"
+        distances = distance_field(self.board)
+        if distances is None:
+            return "This level is too big for smart hints."
+        distance = distances.distance(self.runner.hint_state)
+        if distance < 0:
+            return "The bolt can't be reached from here. Stop and try again."
+        moves = {
+            FORWARD: "move forward",
+            LEFT: "turn 1",
+            AROUND: "turn 2",
+            RIGHT: "turn 3",
+        }
+        step = "step" if distance == 1 else "steps"
+        move = moves[distances.next_action(self.runner.hint_state)]
+        return f"The bolt is {distance} {step} away. Best next move: {move}."
+
+    def draw_stats(self, screen):
+        """
+        Shows the counts of an instrumented run: a heatmap of how often the bot entered each
+        tile, and a badge on each block with how often it ran. Tests show how often they
+        came out true as well, as true/total.
+
+        Parameters:
+            screen (pygame.Surface): The screen surface to draw on.
+        """
+        simulator = self.runner.simulator
+        if not isinstance(simulator, InstrumentedSimulator):
+            return
+        most = max(simulator.visits)
+        heat = pygame.Surface((tile_width, tile_height), pygame.SRCALPHA)
+        for index, count in enumerate(simulator.visits):
+            if count:
+                heat.fill((255, 60, 0, 40 + 150 * count // most))
+                row, col = self.board.cells[index]
+                screen.blit(heat, heat.get_rect(center=bot_center((row, col))))
+
+        font = pygame.font.SysFont(None, 20)
+        for block, (hits, taken) in simulator.block_hits().items():
+            text = f"{taken}/{hits}" if block.command in ("if", "while") else str(hits)
+            badge = font.render(text, True, (255, 255, 255))
+            rect = badge.get_rect(midright=block.obj_rect.topright).inflate(6, 4)
+            pygame.draw.rect(screen, (200, 30, 30), rect, border_radius=6)
+            screen.blit(badge, badge.get_rect(center=rect.center))
+
+    def export_stats(self):
+        """
+        Saves the counts of an instrumented run as JSON.
+
+        Returns:
+            str: The file written, or None if the run was not instrumented.
+        """
+        simulator = self.runner.simulator
+        if not isinstance(simulator, InstrumentedSimulator):
+            return None
+        path = f"run_stats_{self.level}.json"
+        with open(path, "w") as file:
+            json.dump(simulator.export(), file, indent=2)
+        return path
 
     def display_hint(self, screen):
         """
@@ -698,7 +762,7 @@ class Level:
             hint_font = pygame.font.SysFont(None, 24)
 
             # Break the hint into lines that fit the width of the hint box
-            words = self.hint.split(" ")
+            words = self.hint_text.split(" ")
             lines = []
             while words:
                 line = ""
@@ -798,150 +862,23 @@ class Level:
         if not start_conntected:
             start_block.next = None
 
-    def get_end_block(self, start_block):
+    def compile_user_code(self, start_block, block_list):
         """
-        Finds the corresponding end block for a given control structure block in user code.
-        
-        Parameters:
-            start_block (CodeBlock): The starting block for which to find the matching end block.
-        
-        Returns:
-            CodeBlock: The end block corresponding to the given start block.
-        
-        Raises:
-            Exception: If the corresponding end block cannot be found.
-        """
-        looking_for = start_block.command
-        curr_block = start_block
-        if_count = 0
-        else_count = 0
-        while_count = 0
-        for_count = 0
-
-        while curr_block != None:
-
-            if looking_for == "if":
-                if curr_block.command == "if":
-                    if_count += 1
-                elif curr_block.command == "endif":
-                    if if_count == 1:
-                        return curr_block
-                    else:
-                        if_count -= 1
-
-            elif looking_for == "else":
-                if curr_block.command == "else":
-                    else_count += 1
-                elif curr_block.command == "endelse":
-                    if else_count == 1:
-                        return curr_block
-                    else:
-                        else_count -= 1
-
-            elif looking_for == "while":
-                if curr_block.command == "while":
-                    while_count += 1
-                elif curr_block.command == "endwhile":
-                    if while_count == 1:
-                        curr_block.return_to = start_block
-                        return curr_block
-                    else:
-                        while_count -= 1
-                        
-            elif looking_for == "for":
-                if curr_block.command == "for":
-                    for_count += 1
-                elif curr_block.command == "endfor":
-                    if for_count == 1:
-                        curr_block.return_to = start_block
-                        return curr_block
-                    else:
-                        for_count -= 1
-
-            curr_block = curr_block.next
+        Links the user's blocks and compiles the chain into a flat program.
 
-        raise Exception("Missing end block")
+        Parameters:
+            start_block (CodeBlock): The starting block of user code.
+            block_list (pygame.sprite.Group): Group of all code blocks used in the level.
 
-    def get_bot_position(self):
-        """
-        Calculates the current grid position of the bot based on its pixel position.
-        
         Returns:
-            tuple: A tuple of the form (row_index, column_index) representing the bot's position.
-        """
-        return (
-            int(((self.bot.bot_rect.centery + 20) / tile_height) - 2),
-            int(((self.bot.bot_rect.centerx + 20) / tile_width) - 2),
-        )
+            Program: The compiled program, ready to run.
 
-    def next_tile_is_open(self, layout, bot_direction, bot_pos):
-        """
-        Determines if the next tile in the direction the bot is facing is open and can be moved onto.
-        
-        Parameters:
-            layout (list of lists): The level layout matrix.
-            bot_direction (str): The current direction the bot is facing.
-            bot_pos (tuple): The current grid position of the bot.
-        
-        Returns:
-            bool: True if the next tile is open, False otherwise.
-        """
-        if bot_direction == "up":
-            if self.bot.bot_rect.y == 57:
-                return False
-            if isinstance(layout[bot_pos[0] - 1][bot_pos[1]], Door):
-                return layout[bot_pos[0] - 1][bot_pos[1]].open
-            return layout[bot_pos[0] - 1][bot_pos[1]] != 2
-        elif bot_direction == "down":
-            if self.bot.bot_rect.y == 385:
-                return False
-            if isinstance(layout[bot_pos[0] + 1][bot_pos[1]], Door):
-                return layout[bot_pos[0] + 1][bot_pos[1]].open
-            return layout[bot_pos[0] + 1][bot_pos[1]] != 2
-        elif bot_direction == "left":
-            if self.bot.bot_rect.x == 60:
-                return False
-            if isinstance(layout[bot_pos[0]][bot_pos[1] - 1], Door):
-                return layout[bot_pos[0]][bot_pos[1] - 1].open
-            return layout[bot_pos[0]][bot_pos[1] - 1] != 2
-        elif bot_direction == "right":
-            if self.bot.bot_rect.x == 757:
-                return False
-            if isinstance(layout[bot_pos[0]][bot_pos[1] + 1], Door):
-                return layout[bot_pos[0]][bot_pos[1] + 1].open
-            return layout[bot_pos[0]][bot_pos[1] + 1] != 2
-
-    def check_interactables(self, layout, bot_pos, screen):
-        """
-        Checks if the bot is currently on an interactable object and performs the necessary action.
-        
-        Parameters:
-            layout (list of lists): The level layout matrix.
-            bot_pos (tuple): The current grid position of the bot.
-            screen (pygame.Surface): The screen surface to display any changes.
-            
-        Returns:
-            None.
+        Raises:
+            ValueError: If a block holds an invalid number or no condition.
+            CompileError: If the blocks are not properly nested.
         """
-        if isinstance(layout[bot_pos[0]][bot_pos[1]], DoorButton):
-            button = layout[bot_pos[0]][bot_pos[1]]
-            button.setPressed()
-            screen.blit(button.image, button.rect)
-            if button.linkedDoor is not None:
-                button.linkedDoor.openDoor()
-                screen.blit(button.linkedDoor.image, button.linkedDoor.rect)
-        if isinstance(layout[bot_pos[0]][bot_pos[1]], Wormhole):
-            current_wormhole = layout[bot_pos[0]][bot_pos[1]]
-            if (
-                self.bot.last_wormhole != current_wormhole
-            ):  # Check if different from the last wormhole
-                worm1 = current_wormhole
-                worm2 = worm1.link
-                self.bot.bot_rect.center = worm2.pos
-                screen.blit(self.bot.bot_surface, self.bot.bot_rect)
-                self.bot.last_wormhole = worm2  # Update last used wormhole
-                self.pixel_count = 0
-                self.move_count = 0
+        self.get_user_code(start_block, block_list)
+        return compile_program(read_blocks(start_block))
 
     def level_complete_screen(self, screen):
         """
@@ -996,17 +933,15 @@ class Level:
         clock = pygame.time.Clock()
 
         background_image_path = images / "menus" / self.background_image_filename
-        background_image = pygame.image.load(background_image_path).convert_alpha()
-        background_image = pygame.transform.scale(background_image, (1200, 600)) 
+        background_image = load_image(background_image_path, (1200, 600))
         user_code_running = False
-        self.pixel_count = 0
-        self.move_count = 0
         has_moved = False
 
         # buttons
         pause_button = Button((20, 20), (40, 40), "Grey", "P", 32)
         run_button = Button((1000, 200), (40, 20), "Green", "start", 22)
         stop_button = Button((1100, 200), (40, 20), "Red", "stop", 22)
+        speed_button = self.speed_button()
         reset_all_button = Button((1165, 220), (40, 20), "Red", "all", 22)
 
         
@@ -1018,6 +953,7 @@ class Level:
         button_list.append(pause_button)
         button_list.append(run_button)
         button_list.append(stop_button)
+        button_list.append(speed_button)
         button_list.append(reset_all_button)
 
         button_list.append(scroll_up_button)
@@ -1033,22 +969,9 @@ class Level:
         
 
         # background
-        level_surface = pygame.image.load(
-            images / "menus" / "game_screen.png"
-        ).convert()
-
-        initial_positions = {
-            "move": (120, 515),
-            "turn": (245, 515),
-            "if": (370, 515),
-            "endif": (495, 515),
-            "else": (620, 515),
-            "endelse": (745, 515),
-            "while": (120, 560),
-            "endwhile": (245, 560),
-            "for": (370, 560),
-            "endfor": (495, 560),
-        }
+        level_surface = load_image(images / "menus" / "game_screen.png", alpha=False)
+
+        initial_positions = PALETTE_POSITIONS
 
         # code blocks
         move_block = MoveAndTurnBlock(
@@ -1111,6 +1034,11 @@ class Level:
         message_text = ""  # To hold the custom message
         
         while running:
+            if self.reload_layout():
+                # the level's file was saved while it was open: start again on the new layout
+                background_image = load_image(images / "menus" / self.background_image_filename, (1200, 600))
+                user_code_running = False
+
             screen.fill("white")
             screen.blit(self.scroll_surf, self.scroll_rect)   
             #background_image = pygame.image.load("images/menus/game_screen.png").convert_alpha()
@@ -1123,7 +1051,12 @@ class Level:
             # Load the background image at the beginning of the run_level method
 
             self.hint_button.draw(screen)
+            self.smart_hint_button.draw(screen)
+            self.stats_button.draw(screen)
+            if self.show_stats:
+                self.export_button.draw(screen)
 
+            start_requested = False
             event_list = pygame.event.get()
             for event in event_list:
                 if event.type == pygame.QUIT:
@@ -1137,13 +1070,36 @@ class Level:
                             running = False
                             break
                     elif event.key == pygame.K_r:
-                        self.get_user_code(start_block, block_list_1)
+                        start_requested = True
+
+                if self.runner.simulator is not None:
+                    step = self.scrub_bar.handle_event(event, self.runner.last_step())
+                    if step is not None:
+                        # seeking plays on from the chosen step, like a video
+                        self.runner.seek(step)
+                        self.scheduler.restart()
                         user_code_running = True
-                        temp_block = start_block.next
 
                 if event.type == pygame.MOUSEBUTTONDOWN:
                     if self.hint_button.is_clicked(event):
-                        self.show_hint = not self.show_hint
+                        self.show_hint = not self.show_hint or self.hint_text != self.hint
+                        self.hint_text = self.hint
+
+                    if self.stats_button.is_clicked(event):
+                        # counting starts with the next run, so runs without it pay nothing
+                        self.show_stats = not self.show_stats
+                        self.runner.instrumented = self.show_stats
+
+                    if self.show_stats and self.export_button.is_clicked(event):
+                        path = self.export_stats()
+                        show_message = True
+                        message_timer = pygame.time.get_ticks()
+                        message_text = f"stats saved to {path}" if path else "run the code to count it"
+
+                    if self.smart_hint_button.is_clicked(event):
+                        text = self.smart_hint()
+                        self.show_hint = not self.show_hint or self.hint_text != text
+                        self.hint_text = text
 
                     if event.button == 1:
 
@@ -1153,24 +1109,20 @@ class Level:
                                 return action  # Pass the action up to the caller
 
                         if run_button.is_clicked(event):
-                            self.get_user_code(start_block, block_list_1)
-                            for button in self.obstacle_list:
-                                if type(button) is DoorButton:
-                                    button.un_press()
-                            user_code_running = True
-                            temp_block = start_block.next
+                            start_requested = True
+
+                        if speed_button.is_clicked(event):
+                            self.scheduler.next_speed()
+                            index = button_list.index(speed_button)
+                            speed_button = button_list[index] = self.speed_button()
 
                         if stop_button.is_clicked(event):
                             user_code_running = False
-                            self.pixel_count = 0
-                            self.move_count = 0
-                            self.bot = Bot()
+                            self.reset_run()
 
                         if reset_all_button.is_clicked(event):
                             user_code_running = False
-                            self.pixel_count = 0
-                            self.move_count = 0
-                            self.bot = Bot()
+                            self.reset_run()
                             for block in block_list_1:
                                 if not block.locked:
                                     block_list_1.remove(block)
@@ -1178,8 +1130,8 @@ class Level:
                         try:
                             if load_auto_fill_button.is_clicked(event):
                                 if self.scroll_rect.y == 187:
-                                    self.pixel_count = 0
-                                    self.move_count = 0
+                                    user_code_running = False
+                                    self.reset_run()
                                     block_list_1.empty()
                                     temp_list = []
                                     if os.name == 'nt':
@@ -1485,6 +1437,22 @@ class Level:
                         else:
                             self.trash_bin.close_bin()
 
+            if start_requested:
+                start_requested = False
+                try:
+                    program = self.compile_user_code(start_block, block_list_1)
+                except ValueError:
+                    show_message = True
+                    message_timer = pygame.time.get_ticks()
+                    message_text = "input error"
+                except CompileError as error:
+                    show_message = True
+                    message_timer = pygame.time.get_ticks()
+                    message_text = str(error)
+                else:
+                    user_code_running = True
+                    self.start_run(program)
+
             if self.show_hint:
                 self.display_hint(screen)
 
@@ -1501,14 +1469,10 @@ class Level:
                     screen.set_clip(None)
 
                     screen.blit(level_surface, (0, 0))
-                    if self.pixel_count == 0:
-                        bot_pos = self.get_bot_position()
-                        self.check_interactables(self.layout, bot_pos, screen)
+                    if not self.scrub_bar.dragging:
+                        self.play_frame()
 
-                    bot_pos = self.get_bot_position()
-                    self.check_interactables(self.layout, bot_pos, screen)
-
-                    if (self.layout[self.get_bot_position()[0]][self.get_bot_position()[1]] == 3):
+                    if self.runner.collected:
                         user_code_running = False
                         print("Level Complete!")
                         level_complete = True
@@ -1528,90 +1492,24 @@ class Level:
 
                             print(f"Unlocked skin {skin_to_unlock} for user {self.user.id}.")
 
-                        self.user.set_score(self.level, points)
+                        # pars are worked out ahead by core.synthesis; until then there is none
+                        par = layout_par(self.level_layout)
+                        # par counts the blocks of a program, so only the blocks that ran count here,
+                        # not stray ones left on the screen
+                        blocks = len(read_blocks(start_block))
+                        record = None if par is None else efficiency(par, blocks, self.runner.actions_taken)
+                        self.user.set_score(self.level, points, record)
                         print(f"Score updated for {self.user.id} to {points} for level 1.")
                         if level_complete:
                             self.level_complete_screen(screen)
                             return
 
-                    if temp_block != None:
-                        try:
-                            if temp_block.command == "move":
-                                num_moves = int(temp_block.input_box.user_text)
-                                if self.pixel_count == 0 and not self.next_tile_is_open(
-                                    self.layout, self.bot.direction, bot_pos
-                                ):
-                                    temp_block = temp_block.next
-                                    continue
-
-                                if num_moves != 0:
-                                    self.bot.animate_bot()
-                                    if self.bot.direction == "up":
-                                        self.bot.bot_rect.y -= 1
-                                    elif self.bot.direction == "down":
-                                        self.bot.bot_rect.y += 1
-                                    elif self.bot.direction == "left":
-                                        self.bot.bot_rect.x -= 1
-                                    elif self.bot.direction == "right":
-                                        self.bot.bot_rect.x += 1
-                                self.pixel_count += 1
-                                if self.pixel_count >= tile_width:
-                                    self.pixel_count = 0
-                                    self.move_count += 1
-                                    if (
-                                        self.move_count == num_moves
-                                        or not self.next_tile_is_open(
-                                            self.layout, self.bot.direction, bot_pos
-                                        )
-                                    ):
-                                        self.move_count = 0
-                                        temp_block = temp_block.next
-
-                            elif temp_block.command == "turn":
-                                self.bot.turn_bot(int(temp_block.input_box.user_text))
-                                temp_block = temp_block.next
-
-                            elif temp_block.command == "if":
-                                end = self.get_end_block(temp_block)
-                                if temp_block.check_condition(
-                                    self.layout, self.bot.direction, bot_pos, self.bot
-                                ):
-                                    temp_block = temp_block.next
-                                else:
-                                    temp_block = end.next
-
-                            elif temp_block.command == "endif":
-                                temp_block = temp_block.next
-
-                            elif temp_block.command == "while":
-                                end = self.get_end_block(temp_block)
-                                if temp_block.check_condition(
-                                    self.layout, self.bot.direction, bot_pos, self.bot
-                                ):
-                                    temp_block = temp_block.next
-                                else:
-                                    temp_block = end.next
-
-                            elif temp_block.command == "endwhile":
-                                temp_block = temp_block.return_to
-                                
-                            elif temp_block.command == "for":
-                                end = self.get_end_block(temp_block)
-                                if temp_block.check_condition(
-                                    self.layout, self.bot.direction, bot_pos, self.bot
-                                ):
-                                    temp_block = temp_block.next
-                                else:
-                                    temp_block = end.next
-
-                            elif temp_block.command == "endfor":
-                                temp_block = temp_block.return_to
-
-                        except IndexError:
-                            temp_block = temp_block.next
-                            
-                        if temp_block == None:
-                            user_code_running = False
+                    elif self.run_finished():
+                        user_code_running = False
+                        if self.runner.simulator.looping:
+                            show_message = True
+                            message_timer = pygame.time.get_ticks()
+                            message_text = "infinite loop"
                             
             except ValueError:
                 show_message = True
@@ -1631,6 +1529,8 @@ class Level:
                     block.update(screen)
 
             self.obstacle_list.draw(screen)
+            if self.show_stats:
+                self.draw_stats(screen)
 
             for button in button_list:
                 button.draw(screen)
@@ -1655,7 +1555,12 @@ class Level:
                     show_message = False
                     message_text = ""
 
-            self.bot.update(screen)
+            if self.runner.simulator is not None:
+                self.scrub_bar.draw(screen, self.runner.simulator.steps, self.runner.last_step())
+
+            # between ticks the bot is drawn part way along its walk
+            animating = user_code_running and not self.scheduler.instant
+            self.runner.draw(screen, self.scheduler.alpha if animating else 1.0)
 
             pygame.display.update()
             clock.tick(120)
@@ -0,0 +1,266 @@
+"""
+Race mode: many saved programs run side by side on one level, so a class's submissions can
+be replayed together on a projector. Every entry gets its own bot and simulator, and the
+simulators advance in lock-step, one step each per tick, so bots that are ahead on screen
+are ahead in steps too.
+"""
+import pickle
+
+import pygame
+
+from assets import load_image
+from button import Button
+from core.program import CompileError, compile_program
+from core.saved import load_saved_program
+from grader import find_saved_programs
+from levels import BotRun, Level, images, tile_location
+from scheduler import StepScheduler
+from sprites import Door, DoorButton, tile_size
+
+# the folder the dashboard looks for submissions in, laid out as for grader.py
+SUBMISSIONS_DIRECTORY = "submissions"
+
+SKINS = [f"ProBot-{number}.png" for number in range(1, 7)]
+
+# the width and height of the bot icons that mark a door or button as open or pressed
+MARK_SIZE = 13
+
+
+def load_entries(directory, level):
+    """
+    Loads and compiles the saved programs of a level for a race. Files that cannot be read
+    or compiled are left out, since there is nothing to show for them.
+
+    Parameters:
+        directory (str): The folder holding each student's saved files, see grader.py.
+        level (str): The level to race on.
+
+    Returns:
+        list: (student, program) tuples, in the order the grader reports them.
+    """
+    entries = []
+    for student, _, path in find_saved_programs(directory, [level]):
+        try:
+            source, _ = load_saved_program(path)
+            entries.append((student, compile_program(source)))
+        except (OSError, pickle.UnpicklingError, CompileError, ValueError):
+            continue
+    return entries
+
+
+class Race:
+    """
+    Several programs running at once on the same level.
+
+    Every entry has its own doors and buttons, so the level's door and button sprites are
+    left closed and each entry's open doors and pressed buttons are marked with a small
+    copy of its bot instead.
+
+    Attributes:
+        level (Level): The level, which draws the layout.
+        names (list): The name of each entry.
+        programs (list): The compiled program of each entry.
+        runners (list): The BotRun of each entry, each with its own skin.
+        scheduler (StepScheduler): Paces the race.
+        tick (int): How many steps every simulator has been allowed so far.
+        finish_steps (dict): The step each entry collected the bolt on, by entry number.
+    """
+    def __init__(self, level, entries):
+        """
+        Initializes a new Race.
+
+        Parameters:
+            level (Level): The level to race on.
+            entries (list): (name, program) tuples.
+        """
+        self.level = level
+        self.names = [name for name, _ in entries]
+        self.programs = [program for _, program in entries]
+        # no result cache: a cached run is replayed all at once and could not be kept in step,
+        # and no sprites: one entry pressing a button must not open the door for the rest
+        self.runners = [
+            BotRun(level.board, {}, SKINS[number % len(SKINS)])
+            for number in range(len(entries))
+        ]
+        self.scheduler = StepScheduler()
+        self.start()
+
+    def start(self):
+        """
+        Puts every bot back on the start tile and starts every program again.
+        """
+        self.level.reset_run()
+        for runner, program in zip(self.runners, self.programs):
+            runner.start(program)
+        self.tick = 0
+        self.finish_steps = {}
+        self.scheduler.restart()
+
+    def play_frame(self):
+        """
+        Shows one frame of the race: as many of the scheduler's fixed ticks as the real time
+        since the last frame holds, or in instant mode as much as the frame's time budget allows.
+        """
+        scheduler = self.scheduler
+        scheduler.begin_frame()
+        if scheduler.instant:
+            self.play_tick(None, scheduler.has_time)
+            return
+        while not self.finished() and scheduler.take_tick():
+            self.play_tick(scheduler.pixels_per_frame, scheduler.step_quota())
+
+    def play_tick(self, pixels, may_step):
+        """
+        Shows one tick of the race. Once every bot has shown all it did up to the race's
+        tick, the race's tick moves on and each simulator may take one more step; this
+        repeats for as long as may_step allows.
+
+        Parameters:
+            pixels (int): The most pixels each bot walks, or None to jump straight to each tile.
+            may_step (callable): Asked before the race's tick moves on.
+        """
+        pixels = [pixels] * len(self.runners)
+        while True:
+            for number, runner in enumerate(self.runners):
+                pixels[number] = runner.play_frame(
+                    pixels[number], lambda runner=runner: runner.simulator.steps < self.tick, self.scheduler.timestep
+                )
+                if runner.collected and number not in self.finish_steps:
+                    self.finish_steps[number] = runner.simulator.steps
+            if any(runner.showing() for runner in self.runners if not runner.collected):
+                break
+            if self.finished() or not may_step():
+                break
+            self.tick += 1
+
+    def finished(self):
+        """
+        Returns:
+            bool: True once every program has ended and been shown.
+        """
+        return all(runner.finished() for runner in self.runners)
+
+    def status(self, number):
+        """
+        Describes how an entry is doing.
+
+        Parameters:
+            number (int): The entry's number.
+
+        Returns:
+            str: The step it finished on, how it ended, or its steps so far.
+        """
+        runner = self.runners[number]
+        if number in self.finish_steps:
+            return f"solved in {self.finish_steps[number]}"
+        if runner.finished():
+            return "infinite loop" if runner.simulator.looping else "not solved"
+        return f"{runner.simulator.steps} steps"
+
+    def standings(self):
+        """
+        Orders the entries: those that collected the bolt first, fewest steps first, then
+        the rest in entry order.
+
+        Returns:
+            list: The entry numbers.
+        """
+        return sorted(
+            range(len(self.runners)),
+            key=lambda number: (number not in self.finish_steps, self.finish_steps.get(number, 0), number),
+        )
+
+    def draw_switches(self, screen):
+        """
+        Marks each door with the entries that opened it and each button with the entries
+        that pressed it, as a small copy of each entry's bot along the tile, as many as fit.
+
+        Parameters:
+            screen (pygame.Surface): The surface to draw on.
+        """
+        per_row = tile_size[0] // MARK_SIZE
+        for cell, sprite in self.level.sprite_at.items():
+            if type(sprite) is Door:
+                entries = [runner for runner in self.runners if cell in runner.simulator.open_doors]
+            elif type(sprite) is DoorButton:
+                entries = [runner for runner in self.runners if cell in runner.simulator.pressed]
+            else:
+                continue
+            x, y = tile_location(cell)
+            left, top = x - tile_size[0] // 2, y - tile_size[1] // 2
+            for number, runner in enumerate(entries[:per_row * per_row]):
+                icon = pygame.transform.scale(runner.bot.bot_walk[0], (MARK_SIZE, MARK_SIZE))
+                row, col = divmod(number, per_row)
+                screen.blit(icon, (left + col * MARK_SIZE, top + row * MARK_SIZE))
+
+    def draw(self, screen, background):
+        """
+        Draws the level, which entries opened which doors, every bot and the standings.
+
+        Parameters:
+            screen (pygame.Surface): The surface to draw on.
+            background (pygame.Surface): The level's background image.
+        """
+        screen.blit(background, (0, 0))
+        self.level.obstacle_list.draw(screen)
+        self.draw_switches(screen)
+        alpha = 1.0 if self.scheduler.instant or self.finished() else self.scheduler.alpha
+        for runner in self.runners:
+            runner.draw(screen, alpha)
+
+        panel = pygame.Rect(830, 60, 360, 480)
+        pygame.draw.rect(screen, "white", panel)
+        pygame.draw.rect(screen, "black", panel, 2)
+        font = pygame.font.SysFont(None, 22)
+        y = panel.top + 8
+        for place, number in enumerate(self.standings()[:24], 1):
+            # a small copy of the entry's bot, so it can be picked out on the board
+            screen.blit(pygame.transform.scale(self.runners[number].bot.bot_walk[0], (16, 16)), (panel.left + 8, y))
+            text = f"{place}. {self.names[number]}: {self.status(number)}"
+            screen.blit(font.render(text, True, (0, 0, 0)), (panel.left + 30, y + 1))
+            y += 19
+
+
+def race_level(screen, level, directory=SUBMISSIONS_DIRECTORY):
+    """
+    Runs the race screen for a level until the back button is clicked.
+
+    Parameters:
+        screen (pygame.Surface): The surface to draw on.
+        level (str): The level to race on.
+        directory (str): The folder holding the saved programs. Defaults to SUBMISSIONS_DIRECTORY.
+    """
+    level = Level(str(level), None, screen)
+    race = Race(level, load_entries(directory, level.level))
+    background = load_image(images / "menus" / level.background_image_filename, (1200, 600))
+    back_button = Button((50, 575), (100, 50), "blue", "Back", 32)
+    restart_button = Button((1000, 575), (100, 40), "Green", "Restart", 26)
+    speed_button = Button((1120, 575), (80, 40), "Yellow", race.scheduler.speed, 26)
+    font = pygame.font.SysFont(None, 32)
+    clock = pygame.time.Clock()
+
+    while True:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                pygame.quit()
+                exit()
+            if back_button.is_clicked(event):
+                return
+            if restart_button.is_clicked(event):
+                race.start()
+            if speed_button.is_clicked(event):
+                race.scheduler.next_speed()
+                speed_button = Button((1120, 575), (80, 40), "Yellow", race.scheduler.speed, 26)
+
+        if race.runners and not race.finished():
+            race.play_frame()
+        race.draw(screen, background)
+        if not race.runners:
+            message = font.render(f"No saved programs for level {level.level} in {directory}", True, (0, 0, 0))
+            screen.blit(message, message.get_rect(center=(600, 300)))
+
+        back_button.draw(screen)
+        restart_button.draw(screen)
+        speed_button.draw(screen)
+        pygame.display.update()
+        clock.tick(120)
@@ -1,11 +1,17 @@
 import pygame
 import pickle
 import pathlib
+import multiprocessing
 from levels import Level, Tutorial
+from assets import load_image
 from button import Button
 from input_box import InputBox
 from user import User
 from leaderboards import Leaderboard
+from race import race_level
+from level_editor import edit_level
+from core.layouts import get_layout
+from core.scoring import layout_par
 from pathlib import Path
 
 # the base dictionary of users (admin and teacher will have special privalages)
@@ -193,9 +199,7 @@ def level_select(screen, user):
             if back_button.is_clicked(event):
                 return
             if button1.is_clicked(event):  # Assuming this is the tutorial button
-                tutorial_level = Level(
-                    "tutorial", user, screen, "This is where future hints will be!"
-                )  # Pass the screen here
+                tutorial_level = Level("tutorial", user, screen)  # Pass the screen here
                 tutorial = Tutorial(screen)
                 tutorial.run()
                 action = tutorial_level.run_level(
@@ -204,39 +208,38 @@ def level_select(screen, user):
                 if action == "main_menu":
                     return
             elif button2.is_clicked(event):
-                level_one = Level("1", user, screen, "Just use turn and move...")
+                level_one = Level("1", user, screen)
                 action = level_one.run_level(screen)
                 save_game()
                 if action == "main_menu":
                     return
             elif button3.is_clicked(event):
-                level_two = Level("2", user, screen, "Level 1... But longer!")
+                level_two = Level("2", user, screen)
                 action = level_two.run_level(screen)
                 save_game()
                 if action == "main_menu":
                     return
             elif button4.is_clicked(event):
-                level_three = Level("3", user, screen, "Just use one loop (make sure to check for walls!)")
+                level_three = Level("3", user, screen)
                 action = level_three.run_level(screen)
                 save_game()
                 if action == "main_menu":
                     return
             elif button5.is_clicked(event):
-                level_two = Level("4", user, screen, "Use a while loop!")
+                level_two = Level("4", user, screen)
                 action = level_two.run_level(screen)
                 save_game()
                 if action == "main_menu":
                     return
             elif button6.is_clicked(event):
-                level_three = Level("5", user, screen, "Find the right button using loops!")
+                level_three = Level("5", user, screen)
                 action = level_three.run_level(screen)
                 save_game()
                 if action == "main_menu":
                     return
 
-        background_image = pygame.image.load("images/menus/background.jpg").convert()
-        background_image = pygame.transform.scale(
-            background_image, (1200, 600)
+        background_image = load_image(
+            images / "menus" / "background.jpg", (1200, 600), alpha=False
         )  # Resize to match your screen
         screen.blit(background_image, (0, 0))
         back_button.draw(screen)
@@ -443,10 +446,13 @@ def instructor_dashboard(screen, user):
     level4_button = Button((800, 50), (125, 50), "white", "Level 4", 40)
     level5_button = Button((1000, 50), (125, 50), "white", "Level 5", 40)
     back_button = Button((50, 575), (100, 50), "blue", "Back", 32)
+    race_button = Button((1100, 575), (150, 50), "blue", "Race", 32)
+    edit_button = Button((930, 575), (150, 50), "blue", "Edit Level", 32)
 
     # Default level of interest
     current_level = 1
     leaderboard = Leaderboard(current_level, user_dict)
+    par_level = None
 
     while running:
         for event in pygame.event.get():
@@ -456,6 +462,13 @@ def instructor_dashboard(screen, user):
                 exit()
             if back_button.is_clicked(event):
                 return
+            if race_button.is_clicked(event):
+                # Replay every saved program for the level side by side
+                race_level(screen, current_level)
+            if edit_button.is_clicked(event):
+                edit_level(screen, current_level)
+                # a saved level may have a different par
+                par_level = None
 
             # Check which level button is clicked
             if level1_button.is_clicked(event):
@@ -479,6 +492,12 @@ def instructor_dashboard(screen, user):
         highest_overall_score = leaderboard.get_highest_overall_score()
         lowest_overall_score = leaderboard.get_lowest_overall_score()
         overall_average_score = leaderboard.get_average_overall_score()
+        best_efficiency = leaderboard.get_best_efficiency()
+        average_efficiency = leaderboard.get_average_efficiency()
+        if par_level != current_level:
+            # only a par worked out ahead is shown, see core.synthesis, since searching takes a minute
+            par = layout_par(get_layout(str(current_level)))
+            par_level = current_level
         font = pygame.font.SysFont(None, 32)
         if highest_score is not None:
             highest_score_text = font.render(f"Level {current_level} - Highest Score: {highest_score}", True, (0, 0, 0))
@@ -489,6 +508,17 @@ def instructor_dashboard(screen, user):
         if average_score is not None:
             average_score_text = font.render(f"Level {current_level} - Average Score: {average_score}", True, (0, 0, 0))
             screen.blit(average_score_text, (50, 200))
+        if par is not None:
+            par_text = font.render(f"Level {current_level} - Par: {par.blocks} blocks, {par.steps} steps", True, (0, 0, 0))
+        else:
+            par_text = font.render(f"Level {current_level} - Par: not computed", True, (0, 0, 0))
+        screen.blit(par_text, (50, 250))
+        if best_efficiency is not None:
+            best_efficiency_text = font.render(f"Level {current_level} - Most Efficient: {best_efficiency}", True, (0, 0, 0))
+            screen.blit(best_efficiency_text, (50, 280))
+        if average_efficiency is not None:
+            average_efficiency_text = font.render(f"Level {current_level} - Average Blocks vs Par: {average_efficiency:.2f}x", True, (0, 0, 0))
+            screen.blit(average_efficiency_text, (50, 310))
         if highest_overall_score is not None:
             highest_overall_score_text = font.render(f"Highest Overall Score: {highest_overall_score}", True, (0, 0, 0))
             screen.blit(highest_overall_score_text, (50, 350))
@@ -506,6 +536,8 @@ def instructor_dashboard(screen, user):
         level4_button.draw(screen)
         level5_button.draw(screen)
         back_button.draw(screen)
+        race_button.draw(screen)
+        edit_button.draw(screen)
 
         pygame.display.update()
         clock.tick(60)
@@ -526,18 +558,31 @@ def save_game():
         pickle.dump(user_dict, handle, protocol=pickle.HIGHEST_PROTOCOL)
 
 
-# pygame set up
-pygame.init()
-screen = pygame.display.set_mode((1200, 600))
-pygame.display.set_caption("ProBot")
+def main():
+    """
+    Sets up pygame, loads the saved game data and shows the login screen.
+    """
+    global user_dict
+
+    # pygame set up
+    pygame.init()
+    screen = pygame.display.set_mode((1200, 600))
+    pygame.display.set_caption("ProBot")
+
+    #reset_data()
+
+    # loads saved game data
+    with open("user_dict.pickle", "rb") as handle:
+        user_dict = pickle.load(handle)
 
-#reset_data()
+    login(screen)
 
-# loads saved game data
-with open("user_dict.pickle", "rb") as handle:
-    user_dict = pickle.load(handle)
 
-login(screen)
+    pygame.quit()
 
 
-pygame.quit()
+# the tools of core run searches in worker processes, which import this module again on
+# Windows, so the game only starts when run itself
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
@@ -5,7 +5,7 @@ a = Analysis(
     ['run.py'],
     pathex=[],
     binaries=[],
-    datas=[],
+    datas=[('level_data', 'level_data')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,154 @@
+import time
+
+# speed name -> pixels the bot walks per tick, None to skip animation entirely
+SPEEDS = {
+    "1x": 1,
+    "4x": 4,
+    "16x": 16,
+    "instant": None,
+}
+
+# the fixed rate animated runs advance at, whatever rate the screen is drawn at
+TICKS_PER_SECOND = 120
+
+# the most simulator steps a tick may take, so runs with long stretches of control flow
+# advance at the same pace on every machine
+STEPS_PER_TICK = 64
+
+# the most real time one frame can add, so a long stall does not need a long catch up
+MAX_FRAME_TIME = 0.25
+
+
+class StepScheduler:
+    """
+    Decides how much of a run is simulated and shown in each frame.
+
+    Animated runs advance in fixed ticks of 1 / TICKS_PER_SECOND of a second. Each frame adds
+    the real time since the last frame to an accumulator, and one tick is taken for every
+    whole tick the accumulator holds. In a tick the bot walks the speed's number of pixels
+    and the simulator may take up to STEPS_PER_TICK steps, so a run takes the same time and
+    goes the same way however fast the screen is drawn; a slow machine just takes several
+    ticks in one frame. What is left in the accumulator, as a fraction of a tick, is used to
+    draw the bot part way between where it was and where it is.
+
+    In instant mode there is no animation at all, and the simulator is stepped for as long
+    as a time budget large enough to finish any normal run in one frame lasts.
+
+    Attributes:
+        speed (str): The selected speed, one of the keys of SPEEDS.
+        frame_budget (float): Seconds of ticks allowed per animated frame; ticks left over
+            are taken in the next frame.
+        instant_budget (float): Seconds of stepping allowed per frame in instant mode.
+        deadline (float): The time.perf_counter() value the current frame must stop stepping at.
+        timestep (float): The length of a tick in seconds.
+        accumulator (float): Real time not yet taken as ticks, in seconds.
+        last_frame (float): The time.perf_counter() value of the latest frame, or None.
+    """
+    def __init__(self, speed="1x", frame_budget=0.004, instant_budget=0.25):
+        """
+        Initializes a new StepScheduler.
+
+        Parameters:
+            speed (str): The starting speed. Defaults to "1x".
+            frame_budget (float): Seconds of ticks per animated frame. Defaults to 4 ms.
+            instant_budget (float): Seconds of stepping per frame in instant mode. Defaults to 250 ms.
+        """
+        if speed not in SPEEDS:
+            raise ValueError(f"unknown speed {speed!r}")
+        self.speed = speed
+        self.frame_budget = frame_budget
+        self.instant_budget = instant_budget
+        self.deadline = 0.0
+        self.timestep = 1 / TICKS_PER_SECOND
+        self.accumulator = 0.0
+        self.last_frame = None
+
+    @property
+    def instant(self):
+        """
+        bool: True if runs are shown without animation.
+        """
+        return SPEEDS[self.speed] is None
+
+    @property
+    def pixels_per_frame(self):
+        """
+        int: The pixels the bot walks per tick, or None in instant mode.
+        """
+        return SPEEDS[self.speed]
+
+    @property
+    def alpha(self):
+        """
+        float: How far the next tick has got, from 0 to 1, for drawing between ticks.
+        """
+        return min(max(self.accumulator / self.timestep, 0.0), 1.0)
+
+    def next_speed(self):
+        """
+        Switches to the next speed, wrapping around after instant.
+
+        Returns:
+            str: The new speed.
+        """
+        names = list(SPEEDS)
+        self.speed = names[(names.index(self.speed) + 1) % len(names)]
+        return self.speed
+
+    def begin_frame(self):
+        """
+        Starts the time budget for a new frame and adds the real time since the last
+        frame to the accumulator. The first frame of a run gets exactly one tick.
+        """
+        now = time.perf_counter()
+        budget = self.instant_budget if self.instant else self.frame_budget
+        self.deadline = now + budget
+        if self.last_frame is None:
+            self.accumulator += self.timestep
+        else:
+            self.accumulator += min(now - self.last_frame, MAX_FRAME_TIME)
+        self.last_frame = now
+
+    def restart(self):
+        """
+        Forgets the time accumulated so far, so a new run starts on a whole tick.
+        """
+        self.accumulator = 0.0
+        self.last_frame = None
+
+    def take_tick(self):
+        """
+        Takes one tick from the accumulator, if it holds one and the frame has time for it.
+
+        Returns:
+            bool: True if a tick should be run now.
+        """
+        # the tolerance keeps rounding from losing a tick when frames last whole ticks
+        if self.accumulator < self.timestep - 1e-9 or not self.has_time():
+            return False
+        self.accumulator -= self.timestep
+        return True
+
+    def step_quota(self):
+        """
+        Gives what a tick may step: up to STEPS_PER_TICK simulator steps.
+
+        Returns:
+            callable: Returns True each time another step may be run in the tick.
+        """
+        remaining = [STEPS_PER_TICK]
+
+        def may_step():
+            remaining[0] -= 1
+            return remaining[0] >= 0
+
+        return may_step
+
+    def has_time(self):
+        """
+        Checks whether the current frame may run another simulator step.
+
+        Returns:
+            bool: True while the frame's budget lasts.
+        """
+        return time.perf_counter() < self.deadline
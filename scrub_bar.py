@@ -0,0 +1,75 @@
+import pygame
+
+
+class ScrubBar:
+    """
+    A bar for picking a step of a run, like the seek bar of a video player. Clicking or
+    dragging along the bar picks the step under the mouse.
+
+    Attributes:
+        rect (pygame.Rect): The area occupied by the bar.
+        dragging (bool): True while the mouse button pressed on the bar is held down.
+    """
+
+    def __init__(self, position, size):
+        """
+        Initializes a new ScrubBar.
+
+        Parameters:
+            position (tuple): The (x, y) coordinates of the top left corner of the bar.
+            size (tuple): The width and height of the bar.
+        """
+        self.rect = pygame.Rect(position, size)
+        self.dragging = False
+
+    def step_at(self, x, last_step):
+        """
+        Gives the step at a point along the bar.
+
+        Parameters:
+            x (int): The x coordinate of the point.
+            last_step (int): The step at the right end of the bar.
+
+        Returns:
+            int: The step, between 0 and last_step.
+        """
+        fraction = (x - self.rect.left) / max(self.rect.width - 1, 1)
+        return round(min(max(fraction, 0), 1) * last_step)
+
+    def handle_event(self, event, last_step):
+        """
+        Follows the mouse on the bar.
+
+        Parameters:
+            event (pygame.event.Event): The Pygame event.
+            last_step (int): The step at the right end of the bar.
+
+        Returns:
+            int: The step picked, or None if the event did not pick one.
+        """
+        if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+            if self.rect.collidepoint(event.pos):
+                self.dragging = True
+                return self.step_at(event.pos[0], last_step)
+        elif event.type == pygame.MOUSEMOTION and self.dragging:
+            return self.step_at(event.pos[0], last_step)
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 1:
+            self.dragging = False
+        return None
+
+    def draw(self, screen, step, last_step):
+        """
+        Draws the bar with a handle at the current step.
+
+        Parameters:
+            screen (pygame.Surface): The Pygame surface to draw on.
+            step (int): The current step.
+            last_step (int): The step at the right end of the bar.
+        """
+        pygame.draw.rect(screen, "Grey", self.rect)
+        pygame.draw.rect(screen, "black", self.rect, 1)
+        x = self.rect.left + round(step / max(last_step, 1) * (self.rect.width - 1))
+        pygame.draw.rect(screen, "Blue", (x - 3, self.rect.top - 3, 7, self.rect.height + 6))
+        font = pygame.font.SysFont(None, 20)
+        label = font.render(f"step {step} / {last_step}", True, (0, 0, 0))
+        screen.blit(label, (self.rect.right + 8, self.rect.top))
@@ -1,10 +1,14 @@
 import pygame
 from pathlib import Path
+from assets import load_image
 
 images = Path("images")
 
 tile_size = (41, 41)
 
+# how many walk frames the bot steps through per second of walking
+WALK_FRAMES_PER_SECOND = 12
+
 
 class Bot(pygame.sprite.Sprite):
     """
@@ -37,7 +41,6 @@ class Bot(pygame.sprite.Sprite):
         Parameters:
             skin_base_name (str): The base name of the skin to load frames for.
         """
-        self.bot_walk = []
         walking_frame_indices = {
             "ProBot-1": ["ProBot-Walk2.png", "ProBot-Walk1.png", "ProBot-Walk3.png"],
             "ProBot-2": ["ProBot-Walk5.png", "ProBot-Walk4.png", "ProBot-Walk6.png"],
@@ -50,12 +53,11 @@ class Bot(pygame.sprite.Sprite):
             skin_base_name, walking_frame_indices["ProBot-1"]
         )
 
-        for frame_filename in frame_filenames:
-            bot_image = pygame.image.load(
-                f"images/robot/{frame_filename}"
-            ).convert_alpha()
-            scaled_bot = pygame.transform.smoothscale(bot_image, (41, 41))
-            self.bot_walk.append(scaled_bot)
+        self.walk_paths = [
+            images / "robot" / frame_filename for frame_filename in frame_filenames
+        ]
+        self.rotation = 0
+        self.bot_walk = [load_image(path, tile_size) for path in self.walk_paths]
 
         self.bot_index = 0
         self.bot_surface = self.bot_walk[self.bot_index]
@@ -68,7 +70,7 @@ class Bot(pygame.sprite.Sprite):
         Parameters:
             new_skin (str): The filename of the new skin to apply.
         """
-        self.image = pygame.image.load(images / "robot" / new_skin).convert_alpha()
+        self.image = load_image(images / "robot" / new_skin)
         self.rect = self.image.get_rect(center=self.rect.center)
 
     def update(self, screen):
@@ -80,15 +82,33 @@ class Bot(pygame.sprite.Sprite):
         """
         screen.blit(self.bot_surface, self.bot_rect)
 
-    def animate_bot(self):
+    def animate_bot(self, seconds=0.1 / WALK_FRAMES_PER_SECOND):
         """
-        Animates the bot by cycling through its walk frames.
+        Animates the bot by cycling through its walk frames at a fixed rate.
+
+        Parameters:
+            seconds (float): How long the bot has walked since the last call.
+                Defaults to a tenth of a walk frame.
         """
-        self.bot_index += 0.1
+        self.bot_index += seconds * WALK_FRAMES_PER_SECOND
         if self.bot_index >= len(self.bot_walk):
             self.bot_index = 0
         self.bot_surface = self.bot_walk[int(self.bot_index)]
 
+    def face(self, direction):
+        """
+        Turns the bot to face a direction and rotates its walk frames to match.
+
+        Parameters:
+            direction (str): One of "up", "right", "down" or "left".
+        """
+        self.direction = direction
+        self.rotation = {"up": 0, "left": 90, "down": 180, "right": 270}[direction]
+        self.bot_walk = [
+            load_image(path, tile_size, self.rotation) for path in self.walk_paths
+        ]
+        self.bot_surface = self.bot_walk[int(self.bot_index)]
+
     def turn_bot(self, num_turns):
         """
         Turns the bot a given number of 90-degree turns and updates its direction.
@@ -96,8 +116,10 @@ class Bot(pygame.sprite.Sprite):
         Parameters:
             num_turns (int): The number of 90-degree turns to rotate the bot.
         """
-        for c, image in enumerate(self.bot_walk):
-            self.bot_walk[c] = pygame.transform.rotate(image, 90 * num_turns)
+        self.rotation = (self.rotation + 90 * num_turns) % 360
+        self.bot_walk = [
+            load_image(path, tile_size, self.rotation) for path in self.walk_paths
+        ]
 
         if self.direction == "up":
             if num_turns % 4 == 0:
@@ -154,10 +176,8 @@ class Wall(pygame.sprite.Sprite):
             pos (tuple): The (x, y) position for the center of the wall.
         """
         super().__init__()
-        self.obj = pygame.image.load(
-            images / "level_assets" / "wall.png"
-        ).convert_alpha()
-        self.image = pygame.transform.smoothscale(self.obj, tile_size)
+        self.obj = load_image(images / "level_assets" / "wall.png", tile_size)
+        self.image = self.obj
         self.rect = self.image.get_rect(center=pos)
 
 
@@ -178,10 +198,8 @@ class Bolt(pygame.sprite.Sprite):
             pos (tuple): The (x, y) position for the center of the bolt.
         """
         super().__init__()
-        self.obj = pygame.image.load(
-            images / "level_assets" / "bolt.png"
-        ).convert_alpha()
-        self.image = pygame.transform.smoothscale(self.obj, tile_size)
+        self.obj = load_image(images / "level_assets" / "bolt.png", tile_size)
+        self.image = self.obj
         self.rect = self.image.get_rect(center=pos)
 
 
@@ -204,13 +222,11 @@ class Door(pygame.sprite.Sprite):
             pos (tuple): The (x, y) position for the center of the door.
         """
         super().__init__()
-        self.door_close = pygame.image.load(
-            images / "level_assets" / "door_close.png"
-        ).convert_alpha()
-        self.door_open = pygame.image.load(
-            images / "level_assets" / "door_open.png"
-        ).convert_alpha()
-        self.image = pygame.transform.smoothscale(self.door_close, tile_size)
+        self.door_close = load_image(
+            images / "level_assets" / "door_close.png", tile_size
+        )
+        self.door_open = load_image(images / "level_assets" / "door_open.png", tile_size)
+        self.image = self.door_close
         self.rect = self.image.get_rect(center=pos)
         self.open = False
 
@@ -219,7 +235,14 @@ class Door(pygame.sprite.Sprite):
         Opens the door and updates its image to reflect the open state.
         """
         self.open = True
-        self.image = pygame.transform.smoothscale(self.door_open, tile_size)
+        self.image = self.door_open
+
+    def closeDoor(self):
+        """
+        Closes the door and updates its image to reflect the closed state.
+        """
+        self.open = False
+        self.image = self.door_close
 
 
 class DoorButton(pygame.sprite.Sprite):
@@ -244,13 +267,9 @@ class DoorButton(pygame.sprite.Sprite):
         """
         super().__init__()
         self.pos = pos
-        self.button1 = pygame.image.load(
-            images / "level_assets" / "button1.png"
-        ).convert_alpha()
-        self.button2 = pygame.image.load(
-            images / "level_assets" / "button2.png"
-        ).convert_alpha()
-        self.image = pygame.transform.smoothscale(self.button1, tile_size)
+        self.button1 = load_image(images / "level_assets" / "button1.png", tile_size)
+        self.button2 = load_image(images / "level_assets" / "button2.png", tile_size)
+        self.image = self.button1
 
         self.rect = self.image.get_rect(center=pos)
         self.pressed = False
@@ -261,12 +280,12 @@ class DoorButton(pygame.sprite.Sprite):
         Marks the button as pressed and updates its image to reflect the pressed state.
         """
         self.pressed = True
-        self.image = pygame.transform.smoothscale(self.button2, tile_size)
+        self.image = self.button2
         self.rect = self.image.get_rect(center=self.pos)
         
     def un_press(self):
         self.pressed = False
-        self.image = pygame.transform.smoothscale(self.button1, tile_size)
+        self.image = self.button1
         self.rect = self.image.get_rect(center=self.pos)
 
 
@@ -292,22 +311,10 @@ class Wormhole(pygame.sprite.Sprite):
         """
         super().__init__()
         self.pos = pos
-        self.wormhole = pygame.image.load(
-            images / "level_assets" / "wormhole.png"
-        ).convert_alpha()
-        self.red = pygame.transform.smoothscale(
-            pygame.image.load(
-                images / "level_assets" / "wormhole2.png"
-            ).convert_alpha(),
-            tile_size,
-        )
-        self.blue = pygame.transform.smoothscale(
-            pygame.image.load(
-                images / "level_assets" / "wormhole3.png"
-            ).convert_alpha(),
-            tile_size,
-        )
-        self.image = pygame.transform.smoothscale(self.wormhole, tile_size)
+        self.wormhole = load_image(images / "level_assets" / "wormhole.png", tile_size)
+        self.red = load_image(images / "level_assets" / "wormhole2.png", tile_size)
+        self.blue = load_image(images / "level_assets" / "wormhole3.png", tile_size)
+        self.image = self.wormhole
         self.link = None
         self.rect = self.image.get_rect(center=pos)
 
@@ -331,16 +338,8 @@ class Trash(pygame.sprite.Sprite):
             scale (tuple): The (width, height) scaling factors for the trash bin. Defaults to (50, 50).
         """
         super().__init__()
-        closed_bin_image = pygame.image.load(
-            images / "level_assets" / "closedBin.png"
-        ).convert_alpha()
-        open_bin_image = pygame.image.load(
-            images / "level_assets" / "openBin.png"
-        ).convert_alpha()
-
-        # Scale images to the new size
-        self.closed_image = pygame.transform.smoothscale(closed_bin_image, scale)
-        self.open_image = pygame.transform.smoothscale(open_bin_image, scale)
+        self.closed_image = load_image(images / "level_assets" / "closedBin.png", scale)
+        self.open_image = load_image(images / "level_assets" / "openBin.png", scale)
         self.image = self.closed_image
         self.rect = self.image.get_rect(center=pos)
 
@@ -0,0 +1,81 @@
+import unittest
+from unittest.mock import Mock, patch
+import pygame
+import os
+
+from assets import AssetCache
+import assets
+import sprites
+
+
+class TestAssetCache(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        os.environ['SDL_VIDEODRIVER'] = 'dummy'
+        pygame.init()
+
+    def setUp(self):
+        # every load returns a fresh 8x8 surface so scaling and rotation really run
+        self.load = Mock(side_effect=lambda path: self.make_image())
+        patcher = patch('pygame.image.load', self.load)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = AssetCache()
+
+    def make_image(self):
+        image = Mock()
+        image.convert_alpha = Mock(return_value=pygame.Surface((8, 8), pygame.SRCALPHA))
+        image.convert = Mock(return_value=pygame.Surface((8, 8), pygame.SRCALPHA))
+        return image
+
+    def test_repeated_request_is_a_hit(self):
+        first = self.cache.get('wall.png', (41, 41))
+        second = self.cache.get('wall.png', (41, 41))
+        self.assertIs(first, second)
+        self.assertEqual(self.load.call_count, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+        self.assertEqual(first.get_size(), (41, 41))
+
+    def test_key_includes_size_rotation_and_alpha(self):
+        self.cache.get('wall.png', (41, 41))
+        self.cache.get('wall.png', (60, 60))
+        self.cache.get('wall.png', (41, 41), rotation=90)
+        self.cache.get('wall.png', (41, 41), alpha=False)
+        self.assertEqual(self.cache.misses, 4)
+        self.assertEqual(len(self.cache), 4)
+
+    def test_rotation_reuses_scaled_surface(self):
+        self.cache.get('bot.png', (41, 41), rotation=90)
+        self.cache.get('bot.png', (41, 41), rotation=-270)
+        self.cache.get('bot.png', (41, 41))
+        self.assertEqual(self.load.call_count, 1)
+        self.assertEqual(self.cache.hits, 2)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = AssetCache(max_bytes=2 * 41 * 41 * 4)
+        cache.get('a.png', (41, 41))
+        cache.get('b.png', (41, 41))
+        cache.get('a.png', (41, 41))
+        cache.get('c.png', (41, 41))
+        self.assertEqual(cache.evictions, 1)
+        self.assertIn(AssetCache.make_key('a.png', (41, 41)), cache)
+        self.assertNotIn(AssetCache.make_key('b.png', (41, 41)), cache)
+        self.assertLessEqual(cache.size_bytes, cache.max_bytes)
+
+    def test_sprites_share_cached_surfaces(self):
+        with patch.object(assets, 'asset_cache', self.cache):
+            walls = [sprites.Wall((100, 100)) for _ in range(20)]
+            sprites.DoorButton((100, 100)).setPressed()
+            sprites.DoorButton((140, 100)).setPressed()
+        self.assertTrue(all(wall.image is walls[0].image for wall in walls))
+        self.assertEqual(self.load.call_count, 3)
+
+    @classmethod
+    def tearDownClass(cls):
+        pygame.quit()
+        del os.environ['SDL_VIDEODRIVER']
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+
+from core.batch import BatchSimulator, run_batch
+from core.layouts import get_layout
+from core.program import compile_program
+from core.simulator import Board, Simulator
+
+SOURCES = [
+    [],
+    [("move", "3")],
+    [("move", "2"), ("turn", "1"), ("move", "5")],
+    [("while", "wall not ahead"), ("move", "1"), ("endwhile", None), ("turn", "3"), ("move", "9")],
+    [("for", "3"), ("move", "1"), ("turn", "1"), ("endfor", None)],
+    [("while", "true"), ("turn", "1"), ("endwhile", None)],
+    [("while", "true"), ("move", "1"), ("if", "wall ahead"), ("turn", "1"), ("endif", None), ("endwhile", None)],
+    [("if", "2"), ("move", "1"), ("endif", None), ("else", None), ("turn", "2"), ("endelse", None)],
+    [("move", "1"), ("if", "button is pressed"), ("turn", "2"), ("endif", None), ("move", "4")],
+    [("move", "2"), ("if", "door is open"), ("move", "1"), ("endif", None), ("turn", "1")],
+]
+
+
+def final_state(simulator):
+    return (
+        simulator.position, simulator.direction, simulator.steps, simulator.pc,
+        simulator.pressed_bits, simulator.solved, simulator.looping, simulator.done,
+    )
+
+
+def batch_state(batch, number):
+    return (
+        int(batch.position[number]), int(batch.direction[number]), int(batch.steps[number]),
+        int(batch.pc[number]), int(batch.pressed_bits[number]), bool(batch.solved[number]),
+        bool(batch.looping[number]), bool(batch.done[number]),
+    )
+
+
+class TestBatchSimulator(unittest.TestCase):
+
+    def assert_matches_simulator(self, board, max_steps=500):
+        programs = [compile_program(source) for source in SOURCES]
+        batch = run_batch(board, programs, max_steps)
+        for number, program in enumerate(programs):
+            simulator = Simulator(board, program)
+            simulator.run(max_steps)
+            self.assertEqual(batch_state(batch, number), final_state(simulator), SOURCES[number])
+
+    def test_matches_the_simulator_with_walls(self):
+        self.assert_matches_simulator(Board(4, 5, walls=[(0, 4), (2, 2)], bolts=[(0, 0)], start=(3, 4)))
+
+    def test_matches_the_simulator_with_buttons_and_doors(self):
+        board = Board(4, 5, doors=[(1, 4)], buttons={(2, 4): (1, 4)}, bolts=[(0, 3)], start=(3, 4))
+        self.assert_matches_simulator(board)
+
+    def test_matches_the_simulator_with_wormholes(self):
+        board = Board(4, 5, wormholes={(2, 4): (2, 0), (2, 0): (2, 4)}, start=(3, 4))
+        self.assert_matches_simulator(board)
+
+    def test_matches_the_simulator_on_every_level(self):
+        for name in ("tutorial", "1", "2", "3", "4", "5"):
+            self.assert_matches_simulator(get_layout(name).board(), max_steps=2000)
+
+    def test_step_limit(self):
+        batch = run_batch(Board(3, 3, start=(2, 2)), [compile_program(SOURCES[5])] * 2, max_steps=3)
+        self.assertEqual(list(batch.steps), [3, 3])
+        self.assertFalse(batch.done.any())
+
+    def test_loops_are_detected(self):
+        batch = run_batch(Board(3, 3, start=(2, 2)), [compile_program(SOURCES[5])])
+        self.assertTrue(batch.looping[0])
+        self.assertTrue(batch.done[0])
+
+    def test_cells(self):
+        batch = run_batch(Board(3, 3, start=(2, 2)), [compile_program(SOURCES[1]), compile_program([])])
+        self.assertEqual(batch.cells, [(0, 2), (2, 2)])
+
+    def test_start_and_reset(self):
+        board = Board(3, 4, doors=[(0, 0)], buttons={(2, 0): (0, 0)}, bolts=[(0, 0)], start=(2, 3))
+        # as if the button had been pressed, facing up from below the door
+        batch = BatchSimulator(board, [compile_program([("move", "2")])], start=(board.index[(2, 0)], 0, 1, -1))
+        batch.run()
+        self.assertTrue(batch.solved[0])
+        batch.reset()
+        batch.run()
+        self.assertFalse(batch.solved[0])
+        self.assertEqual(batch.cells, [(0, 3)])
+
+    def test_too_many_buttons(self):
+        buttons = {(0, col): None for col in range(63)}
+        with self.assertRaises(ValueError):
+            BatchSimulator(Board(2, 63, buttons=buttons, start=(1, 0)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
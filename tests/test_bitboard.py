@@ -0,0 +1,59 @@
+import unittest
+
+from core.bitboard import from_bits, to_bits, zobrist_key
+from core.layouts import get_layout
+from core.program import compile_program
+from core.simulator import Board, Simulator
+
+
+class TestBitboard(unittest.TestCase):
+
+    def test_bits_round_trip(self):
+        self.assertEqual(to_bits([0, 3, 161]), 1 | 8 | 1 << 161)
+        self.assertEqual(from_bits(to_bits([161, 0, 3])), [0, 3, 161])
+        self.assertEqual(from_bits(0), [])
+
+    def test_zobrist_keys_differ(self):
+        keys = {zobrist_key(part, value, slot) for part in range(1, 7) for value in range(50) for slot in range(3)}
+        self.assertEqual(len(keys), 6 * 50 * 3)
+
+    def test_board_bitboards(self):
+        board = Board(2, 3, walls=[(0, 1)], doors=[(1, 2)], buttons={(1, 0): (1, 2)}, start=(1, 1))
+        self.assertEqual(board.wall_bits, 1 << 1)
+        self.assertEqual(board.door_bits, 1 << 5)
+        self.assertEqual(board.button_doors, [0])
+        # up from (1, 1) is (0, 1), right from (0, 2) is off the grid
+        self.assertEqual(board.ahead[4 * 4 + 0], 1)
+        self.assertEqual(board.ahead[2 * 4 + 1], -1)
+
+    def test_hash_is_kept_up_to_date(self):
+        source = [
+            ("for", "30"),
+            ("while", "wall not ahead"),
+            ("move", "3"),
+            ("endwhile", None),
+            ("turn", "1"),
+            ("if", "2"),
+            ("turn", "2"),
+            ("endif", None),
+            ("endfor", None),
+        ]
+        for name in ("2", "4", "5"):
+            simulator = Simulator(get_layout(name).board(), compile_program(source))
+            while not simulator.done:
+                simulator.step()
+                self.assertEqual(simulator.hash, simulator.compute_hash(), name)
+
+    def test_equal_states_hash_equal(self):
+        board = get_layout("1").board()
+        first = Simulator(board, compile_program([("turn", "4"), ("move", "1")]))
+        second = Simulator(board, compile_program([("turn", "4"), ("move", "1")]))
+        first.step()
+        second.step()
+        self.assertEqual(first.hash, second.hash)
+        second.step()
+        self.assertNotEqual(first.hash, second.hash)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+from core.cache import DiskCache
+
+
+class TestDiskCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(os.path.join(self.directory.name, "entries"), max_entries=3)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def age(self, key, seconds):
+        os.utime(self.cache.path(key), (seconds, seconds))
+
+    def test_missing_entry(self):
+        self.assertIsNone(self.cache.get("nothing"))
+        self.assertEqual(self.cache.get("nothing", 5), 5)
+
+    def test_put_and_get(self):
+        self.cache.put("a", {"steps": 3, "trace": [[1, 2]]})
+        self.assertEqual(self.cache.get("a"), {"steps": 3, "trace": [[1, 2]]})
+        self.assertIn("a", self.cache)
+        self.assertEqual(len(self.cache), 1)
+
+    def test_entries_are_shared_between_instances(self):
+        self.cache.put("a", 1)
+        self.assertEqual(DiskCache(self.cache.directory).get("a"), 1)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        for age, key in enumerate("abc"):
+            self.cache.put(key, key)
+            self.age(key, 1000 + age)
+        self.cache.get("a")
+        self.cache.put("d", "d")
+        self.assertEqual(sorted(self.cache.keys()), ["a", "c", "d"])
+
+    def test_corrupt_entry_is_a_miss(self):
+        self.cache.put("a", 1)
+        with open(self.cache.path("a"), "w") as file:
+            file.write("{")
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_failed_write_leaves_no_file(self):
+        with self.assertRaises(TypeError):
+            self.cache.put("a", {"bad": object()})
+        self.assertEqual(os.listdir(self.cache.directory), [])
+        self.assertIsNone(self.cache.get("a"))
+
+    def test_clear(self):
+        self.cache.put("a", 1)
+        self.cache.clear()
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
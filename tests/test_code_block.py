@@ -65,13 +65,6 @@ class TestCodeBlocks(unittest.TestCase):
         self.assertEqual(block.position, self.position)
         self.assertEqual(block.command, 'if')
 
-    def test_conditional_block_check_condition_true(self):
-        block = ConditionalBlock(self.code_block_image, self.position, 'if')
-        block.drop_down1 = Mock()
-        block.drop_down1.main = 'true'
-        result = block.check_condition([], 'up', (0, 0), self.bot_mock)
-        self.assertTrue(result)
-
     def test_end_conditional_block_initialization(self):
         block = EndConditionalBlock(self.code_block_image, self.position, 'end')
         self.assertEqual(block.position, self.position)
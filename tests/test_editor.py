@@ -0,0 +1,148 @@
+import os
+import random
+import tempfile
+import unittest
+
+from core.editor import OPEN_TILES, LevelEditor, RegionMap
+from core.generator import DIFFICULTIES, random_layout
+from core.layouts import BOLT, BUTTON, DOOR, FLOOR, WALL, WORMHOLE, LevelLayout, get_layout, load_layout
+from core.solver import solve
+
+
+def parts(regions):
+    return sorted(sorted(cells) for cells in regions.regions.values())
+
+
+class TestRegionMap(unittest.TestCase):
+
+    def test_walls_split_and_floor_joins(self):
+        # a 1 x 5 corridor
+        regions = RegionMap(1, 5, range(5))
+        self.assertEqual(parts(regions), [[0, 1, 2, 3, 4]])
+        regions.close(2)
+        self.assertEqual(parts(regions), [[0, 1], [3, 4]])
+        self.assertEqual(regions.labels[2], -1)
+        regions.open(2)
+        self.assertEqual(parts(regions), [[0, 1, 2, 3, 4]])
+        self.assertEqual(len({regions.labels[index] for index in range(5)}), 1)
+
+    def test_changes(self):
+        regions = RegionMap(2, 2, range(4))
+        regions.clear_changes()
+        regions.close(0)
+        self.assertEqual(regions.clear_changes(), {regions.labels[1]})
+        self.assertEqual(regions.clear_changes(), set())
+
+    def test_matches_a_fresh_map(self):
+        rng = random.Random(3)
+        grid = [True] * 60
+        regions = RegionMap(6, 10, range(60))
+        for _ in range(300):
+            index = rng.randrange(60)
+            grid[index] = not grid[index]
+            if grid[index]:
+                regions.open(index)
+            else:
+                regions.close(index)
+            fresh = RegionMap(6, 10, [index for index, open_cell in enumerate(grid) if open_cell])
+            self.assertEqual(parts(regions), parts(fresh))
+
+
+class TestLevelEditor(unittest.TestCase):
+
+    def setUp(self):
+        self.editor = LevelEditor.blank("test", 3, 5)
+
+    def test_bolt_problems(self):
+        self.assertEqual(self.editor.problems(), ["no bolt"])
+        self.editor.place((0, 0), BOLT)
+        self.assertEqual(self.editor.problems(), [])
+        for cell in ((0, 1), (1, 1), (1, 0)):
+            self.editor.place(cell, WALL)
+        self.assertEqual(self.editor.problems(), ["bolt unreachable"])
+        self.editor.place((1, 0), FLOOR)
+        self.assertEqual(self.editor.problems(), [])
+
+    def test_doors_and_buttons(self):
+        self.editor.place((0, 0), BOLT)
+        self.editor.place((0, 1), WALL)
+        self.editor.place((1, 0), DOOR)
+        self.assertEqual(self.editor.problems(), ["door at (1, 0) with no button", "bolt unreachable"])
+        self.editor.place((2, 2), BUTTON)
+        self.assertEqual(self.editor.links, {(2, 2): (1, 0)})
+        self.assertEqual(self.editor.problems(), [])
+
+    def test_unreachable_button(self):
+        self.editor.place((0, 0), BOLT)
+        self.editor.place((0, 4), BUTTON)
+        self.editor.place((0, 2), DOOR)
+        self.editor.place((0, 3), WALL)
+        self.editor.place((1, 4), WALL)
+        self.assertEqual(self.editor.problems(), ["button at (0, 4) unreachable"])
+
+    def test_decoy_buttons_are_allowed(self):
+        self.editor.place((0, 0), BOLT)
+        self.editor.place((1, 1), BUTTON)
+        self.assertEqual(self.editor.problems(), [])
+
+    def test_wormholes(self):
+        self.editor.place((0, 0), BOLT)
+        for cell in ((0, 1), (1, 0)):
+            self.editor.place(cell, WALL)
+        self.editor.place((0, 4), WORMHOLE)
+        self.assertEqual(self.editor.problems(), ["wormhole at (0, 4) with no pair", "bolt unreachable"])
+        with self.assertRaises(ValueError):
+            self.editor.layout()
+        self.editor.place((1, 0), WORMHOLE)
+        self.assertEqual(self.editor.wormholes, [((0, 4), (1, 0), None)])
+        self.assertEqual(self.editor.problems(), [])
+        self.editor.place((0, 4), FLOOR)
+        self.assertEqual(self.editor.unpaired, [(1, 0)])
+
+    def test_start_stays_floor(self):
+        self.assertFalse(self.editor.place((2, 4), WALL))
+        self.assertEqual(self.editor.tile((2, 4)), FLOOR)
+        self.editor.place((1, 1), WALL)
+        self.assertFalse(self.editor.set_start((1, 1)))
+        with self.assertRaises(ValueError):
+            LevelEditor(LevelLayout("test", ["#"], start=(0, 0)))
+
+    def test_built_in_levels(self):
+        for name in ("1", "2", "3", "4", "5"):
+            editor = LevelEditor(get_layout(name))
+            self.assertEqual(editor.problems(), [], name)
+            self.assertEqual(editor.layout().to_json(), get_layout(name).to_json())
+
+    def test_agrees_with_the_solver(self):
+        rng = random.Random(11)
+        tiles = [FLOOR, FLOOR, WALL, WALL, BOLT, DOOR, BUTTON, WORMHOLE]
+        for _ in range(40):
+            layout = None
+            while layout is None:
+                layout = random_layout(rng, "test", DIFFICULTIES["hard"])
+            editor = LevelEditor(layout)
+            for _ in range(20):
+                editor.place((rng.randrange(9), rng.randrange(18)), rng.choice(tiles))
+                if editor.unpaired:
+                    continue
+                solvable = solve(editor.layout().board()) is not None
+                self.assertEqual(
+                    solvable, not {"no bolt", "bolt unreachable"} & set(editor.problems()), editor.layout().grid
+                )
+                fresh = RegionMap(9, 18, [index for index, tile in enumerate(editor.grid) if tile in OPEN_TILES])
+                self.assertEqual(parts(editor.regions), parts(fresh))
+
+    def test_save(self):
+        self.editor.place((0, 0), BOLT)
+        self.editor.place((1, 2), WORMHOLE)
+        self.editor.place((0, 4), WORMHOLE)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "test.json")
+            self.editor.save(path)
+            layout = load_layout(path)
+        self.assertEqual(layout.grid, ("*...O", "..O..", "....."))
+        self.assertEqual(layout.wormholes, [((1, 2), (0, 4), None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
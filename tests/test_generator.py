@@ -0,0 +1,59 @@
+import os
+import random
+import tempfile
+import unittest
+
+from core.generator import DIFFICULTIES, generate_level, generate_levels, random_layout, rate_layout, save_levels
+from core.layouts import BUTTON, DOOR, WORMHOLE, LevelLayout, load_layout
+from core.solver import solve
+
+
+class TestGenerator(unittest.TestCase):
+
+    def test_random_layout_uses_the_difficulty(self):
+        settings = DIFFICULTIES["hard"]
+        layout = None
+        rng = random.Random(1)
+        while layout is None:
+            layout = random_layout(rng, "test", settings)
+        self.assertEqual((layout.rows, layout.cols), (9, 18))
+        self.assertEqual(len(layout.cells(DOOR)), settings["doors"])
+        self.assertEqual(len(layout.cells(BUTTON)), settings["doors"])
+        self.assertEqual(len(layout.cells(WORMHOLE)), 2 * settings["wormholes"])
+
+    def test_generated_levels_are_solvable_and_rated(self):
+        for difficulty, settings in DIFFICULTIES.items():
+            data, rating = generate_level(7, difficulty)
+            layout = LevelLayout.from_json(data)
+            actions = solve(layout.board())
+            self.assertIsNotNone(actions, difficulty)
+            self.assertEqual(rating["steps"], len(actions))
+            fewest, most = settings["steps"]
+            self.assertTrue(fewest <= rating["steps"] <= most, difficulty)
+
+    def test_doors_must_be_needed(self):
+        # the bolt can be reached around the door
+        layout = LevelLayout("test", ["B*D..", "....."], links={(0, 0): (0, 2)}, start=(1, 4))
+        settings = {"steps": (1, 100)}
+        self.assertIsNone(rate_layout(layout, settings))
+        layout = LevelLayout("test", ["B.#*D", "...#.", "....."], links={(0, 0): (0, 4)}, start=(2, 4))
+        self.assertIsNotNone(rate_layout(layout, settings))
+
+    def test_same_seed_same_level(self):
+        self.assertEqual(generate_level(3, "easy"), generate_level(3, "easy"))
+
+    def test_generate_and_save(self):
+        levels = generate_levels(3, "easy", seed=10, workers=2)
+        self.assertEqual([data["name"] for data, _ in levels], ["easy-10", "easy-11", "easy-12"])
+        with tempfile.TemporaryDirectory() as directory:
+            paths = save_levels(levels, directory)
+            self.assertEqual(sorted(os.listdir(directory)), ["easy-10.json", "easy-11.json", "easy-12.json"])
+            self.assertEqual(load_layout(paths[0]).grid, tuple(levels[0][0]["grid"]))
+
+    def test_unknown_difficulty(self):
+        with self.assertRaises(ValueError):
+            generate_levels(1, "impossible")
+
+
+if __name__ == "__main__":
+    unittest.main()
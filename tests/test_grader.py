@@ -0,0 +1,89 @@
+import io
+import json
+import os
+import pickle
+import tempfile
+import unittest
+
+from grader import find_saved_programs, grade, grade_program, write_report
+
+SOLUTION = [("move", "2"), ("turn", "1"), ("move", "9"), ("turn", "3"), ("move", "2")]
+
+
+def save(path, source):
+    with open(path, "wb") as file:
+        for index, (command, value) in enumerate(source):
+            record = ["images/blocks/x.png", (890, 320 + 40 * index), command]
+            if value is not None:
+                record.append(value)
+            pickle.dump(record, file)
+
+
+class TestGrader(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        root = self.directory.name
+        for student in ("ann", "ben"):
+            os.mkdir(os.path.join(root, student))
+        save(os.path.join(root, "ann", "block_list_1.pickle"), SOLUTION)
+        save(os.path.join(root, "ben", "block_list_1.pickle"), [("while", "true"), ("endwhile", None)])
+        save(os.path.join(root, "ben", "block_list_2.pickle"), [("while", "true")])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def path(self, student, level):
+        return os.path.join(self.directory.name, student, f"block_list_{level}.pickle")
+
+    def test_find_saved_programs(self):
+        found = find_saved_programs(self.directory.name, ["1"])
+        self.assertEqual([(s, l) for s, l, _ in found], [("ann", "1"), ("ben", "1")])
+
+    def test_solution_passes_with_its_score(self):
+        row = grade_program("ann", "1", self.path("ann", "1"), 1000, 5)
+        self.assertTrue(row["passed"])
+        self.assertEqual(row["steps"], 15)
+        self.assertEqual(row["score"], 5)
+
+    def test_endless_loop_is_reported(self):
+        row = grade_program("ben", "1", self.path("ben", "1"), 1000, 5)
+        self.assertFalse(row["passed"])
+        self.assertEqual(row["status"], "infinite loop")
+
+    def test_long_run_hits_the_step_limit(self):
+        save(self.path("ben", "1"), [("for", "5000"), ("turn", "1"), ("endfor", None)])
+        row = grade_program("ben", "1", self.path("ben", "1"), 1000, 5)
+        self.assertEqual(row["status"], "step limit")
+        self.assertEqual(row["steps"], 1000)
+
+    def test_endless_loop_hits_the_time_limit(self):
+        row = grade_program("ben", "1", self.path("ben", "1"), 10 ** 9, 0)
+        self.assertEqual(row["status"], "time limit")
+
+    def test_compile_errors_are_reported(self):
+        row = grade_program("ben", "2", self.path("ben", "2"), 1000, 5)
+        self.assertEqual(row["status"], "error: Missing End Block")
+
+    def test_results_are_cached(self):
+        cache = os.path.join(self.directory.name, "cache")
+        first = grade_program("ann", "1", self.path("ann", "1"), 1000, 5, cache)
+        self.assertEqual(len(os.listdir(cache)), 1)
+        second = grade_program("ann", "1", self.path("ann", "1"), 1000, 5, cache)
+        self.assertEqual(second, first)
+        limited = grade_program("ann", "1", self.path("ann", "1"), 10, 5, cache)
+        self.assertEqual(limited["status"], "step limit")
+
+    def test_grade_and_report(self):
+        rows = grade(self.directory.name, max_steps=1000, workers=2)
+        self.assertEqual([row["passed"] for row in rows], [True, False, False])
+        report = io.StringIO()
+        write_report(rows, report, "json")
+        self.assertEqual(json.loads(report.getvalue()), rows)
+        report = io.StringIO()
+        write_report(rows, report, "csv")
+        self.assertEqual(len(report.getvalue().splitlines()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
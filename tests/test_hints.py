@@ -0,0 +1,91 @@
+import unittest
+from unittest.mock import patch
+
+from core.hints import UNREACHABLE, DistanceField, advance, distance_field, fields
+from core.layouts import LAYOUTS, get_layout
+from core.program import compile_program
+from core.simulator import Board, Simulator
+from core.solver import FORWARD, LEFT, solve, start_state, successors
+
+
+class TestHints(unittest.TestCase):
+
+    def test_distance_matches_solver(self):
+        for name, layout in LAYOUTS.items():
+            board = layout.board()
+            actions = solve(board)
+            distance = DistanceField(board).distance(start_state(board))
+            if actions is None:
+                self.assertEqual(distance, UNREACHABLE)
+            else:
+                self.assertEqual(distance, len(actions), name)
+
+    def test_following_next_actions_reaches_the_bolt(self):
+        board = get_layout("4").board()
+        field = DistanceField(board)
+        state = start_state(board)
+        for _ in range(field.distance(state)):
+            action = field.next_action(state)
+            following = {a: (s, solved) for a, s, solved in successors(board, state)}
+            state, solved = following[action]
+        self.assertTrue(solved)
+
+    def test_next_action(self):
+        board = Board(2, 2, bolts=[(1, 0)], start=(1, 1))
+        field = DistanceField(board)
+        state = start_state(board)
+        self.assertEqual(field.distance(state), 2)
+        self.assertEqual(field.next_action(state), LEFT)
+        turned = (state[0], 3, 0, -1)
+        self.assertEqual(field.distance(turned), 1)
+        self.assertEqual(field.next_action(turned), FORWARD)
+
+    def test_unreachable_bolt(self):
+        board = Board(3, 1, walls=[(1, 0)], bolts=[(0, 0)], start=(2, 0))
+        field = DistanceField(board)
+        self.assertEqual(field.distance(start_state(board)), UNREACHABLE)
+        self.assertIsNone(field.next_action(start_state(board)))
+
+    def test_advance_follows_the_simulator(self):
+        # level 2 has a door and wormholes, so every part of the state changes
+        board = get_layout("2").board()
+        program = compile_program([
+            ("move", "3"), ("turn", "1"), ("move", "3"), ("turn", "3"),
+            ("move", "1"), ("turn", "1"), ("move", "2"), ("turn", "1"),
+            ("move", "4"), ("turn", "1"), ("move", "16"),
+        ])
+        simulator = Simulator(board, program)
+        state = start_state(board)
+        while not simulator.done:
+            for event in simulator.step():
+                state = advance(board, state, event)
+            self.assertEqual(
+                state,
+                (simulator.position, simulator.direction, simulator.open_door_bits, simulator.wormhole),
+            )
+
+    def test_only_reachable_states_are_stored(self):
+        # the door is never opened, so no state with it open is stored
+        board = Board(1, 3, bolts=[(0, 0)], doors=[(0, 2)], start=(0, 1))
+        field = DistanceField(board)
+        self.assertEqual(len(field.slots), 4)
+        self.assertEqual(len(field.distances), 4)
+        self.assertEqual(field.distance((1, 0, 1, -1)), UNREACHABLE)
+        self.assertIsNone(field.next_action((1, 0, 1, -1)))
+
+    def test_too_many_states(self):
+        board = get_layout("2").board()
+        with self.assertRaises(ValueError):
+            DistanceField(board, max_states=100)
+        fields.clear()
+        with patch("core.hints.MAX_STATES", 100):
+            self.assertIsNone(distance_field(board))
+        fields.clear()
+
+    def test_fields_are_shared(self):
+        board = get_layout("1").board()
+        self.assertIs(distance_field(board), distance_field(get_layout("1").board()))
+
+
+if __name__ == "__main__":
+    unittest.main()
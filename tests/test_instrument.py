@@ -0,0 +1,71 @@
+import json
+import unittest
+
+from core.instrument import InstrumentedSimulator
+from core.layouts import get_layout
+from core.program import compile_program
+from core.simulator import Board, Simulator
+from core.timeline import Timeline
+
+
+class TestInstrument(unittest.TestCase):
+
+    def setUp(self):
+        self.board = Board(1, 5, start=(0, 0), start_direction=1)
+        # moves right one tile three times, then the test of the if fails at the wall
+        self.program = compile_program([
+            ("for", "3"), ("move", "1"), ("endfor", None),
+            ("if", "wall ahead"), ("turn", "1"), ("endif", None),
+        ])
+
+    def test_runs_like_a_simulator(self):
+        board = get_layout("3").board()
+        program = compile_program([
+            ("while", "true"), ("move", "1"), ("if", "wall ahead"),
+            ("turn", "1"), ("endif", None), ("endwhile", None),
+        ])
+        plain = Simulator(board, program)
+        counted = InstrumentedSimulator(board, program)
+        self.assertEqual(plain.run(), counted.run())
+        self.assertEqual(plain.state(), counted.state())
+        self.assertEqual(sum(counted.hits), counted.steps)
+
+    def test_counts(self):
+        simulator = InstrumentedSimulator(self.board, self.program)
+        simulator.run()
+        # count_reset, count_test, move, jump, ..., test
+        self.assertEqual(simulator.hits[:4], [1, 4, 3, 3])
+        self.assertEqual(simulator.taken[1], 3)
+        self.assertEqual(simulator.hits[4], 1)
+        self.assertEqual(simulator.taken[4], 0)
+        self.assertEqual(simulator.hits[5], 0)
+        self.assertEqual(simulator.visits[:5], [1, 1, 1, 1, 0])
+
+    def test_recent_steps_ring(self):
+        simulator = InstrumentedSimulator(self.board, self.program, recent_size=4)
+        simulator.run()
+        recent = simulator.recent_steps()
+        self.assertEqual([step for step, _, _, _ in recent], list(range(simulator.steps - 3, simulator.steps + 1)))
+        self.assertEqual(recent[-1][1], 4)
+
+    def test_export(self):
+        simulator = InstrumentedSimulator(self.board, self.program)
+        simulator.run()
+        data = json.loads(json.dumps(simulator.export()))
+        self.assertEqual(data["steps"], simulator.steps)
+        self.assertEqual(data["instructions"][1]["op"], "count_test")
+        self.assertEqual(data["instructions"][1]["taken"], 3)
+        self.assertEqual(data["tiles"][-1], {"row": 0, "col": 3, "visits": 1})
+        self.assertEqual(len(data["recent"]), simulator.steps)
+
+    def test_seeking_does_not_count_twice(self):
+        timeline = Timeline(self.board, self.program, interval=2, simulator_class=InstrumentedSimulator)
+        timeline.seek(20)
+        hits = list(timeline.simulator.hits)
+        timeline.seek(3)
+        timeline.seek(20)
+        self.assertEqual(timeline.simulator.hits, hits)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from core import LAYOUTS, LevelLayout, get_layout, run_program
+from unittest.mock import patch
+
+from core.layouts import POLL_SECONDS, LevelRegistry, find_level_data, load_layout, save_layout
+
+
+class TestLevelLayout(unittest.TestCase):
+
+    def test_every_level_is_a_full_grid(self):
+        for name, layout in LAYOUTS.items():
+            board = layout.board()
+            self.assertEqual((board.rows, board.cols), (9, 18), name)
+            self.assertNotIn(board.start, board.walls, name)
+
+    def test_level_two_links(self):
+        board = get_layout("2").board()
+        self.assertEqual(board.buttons, {(0, 14): (2, 16)})
+        self.assertEqual(board.wormholes, {(0, 0): (8, 12), (8, 12): (0, 0)})
+        self.assertEqual(board.doors, {(2, 16)})
+        self.assertEqual(board.bolts, {(2, 17)})
+
+    def test_unlinked_buttons_open_nothing(self):
+        buttons = get_layout("5").board().buttons
+        self.assertEqual(buttons[(3, 8)], (3, 1))
+        self.assertIsNone(buttons[(2, 5)])
+
+    def test_ragged_grid(self):
+        with self.assertRaises(ValueError):
+            LevelLayout("bad", ["...", ".."], start=(0, 0))
+
+    def test_unknown_tile(self):
+        with self.assertRaises(ValueError):
+            LevelLayout("bad", ["..x"], start=(0, 0))
+
+    def test_link_must_join_a_button_to_a_door(self):
+        with self.assertRaises(ValueError):
+            LevelLayout("bad", ["B.D"], links={(0, 0): (0, 1)}, start=(0, 1))
+
+    def test_wormholes_must_be_paired(self):
+        with self.assertRaises(ValueError):
+            LevelLayout("bad", ["O.O"], start=(0, 1))
+
+    def test_run_program_on_a_level(self):
+        source = [("move", "2"), ("turn", "1"), ("move", "9"), ("turn", "3"), ("move", "2")]
+        simulator = run_program(get_layout("1").board(), source)
+        self.assertTrue(simulator.solved)
+        self.assertEqual(simulator.cell, (4, 8))
+
+    def test_json_round_trip(self):
+        for name, layout in LAYOUTS.items():
+            copy = LevelLayout.from_json(json.loads(json.dumps(layout.to_json())))
+            self.assertEqual(copy.grid, layout.grid, name)
+            self.assertEqual(copy.links, layout.links, name)
+            self.assertEqual(copy.wormholes, layout.wormholes, name)
+            self.assertEqual(copy.board().start, layout.board().start, name)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "2.json")
+            save_layout(get_layout("2"), path, steps=39)
+            self.assertEqual(load_layout(path).links, get_layout("2").links)
+            with open(path) as file:
+                self.assertEqual(json.load(file)["steps"], 39)
+
+    def test_load_rejects_other_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "bad.json")
+            with open(path, "w") as file:
+                json.dump({"grid": ["..."]}, file)
+            with self.assertRaises(ValueError):
+                load_layout(path)
+
+    def test_levels_carry_their_hint_and_background(self):
+        self.assertEqual(get_layout("4").hint, "Use a while loop!")
+        self.assertEqual(get_layout("4").background, "level4.png")
+        self.assertEqual(get_layout("tutorial").background, "game_screen.png")
+
+    def test_level_data_folder(self):
+        self.assertEqual(find_level_data(), "level_data")
+        with patch.object(sys, "frozen", True, create=True), patch.object(sys, "_MEIPASS", "bundle", create=True):
+            self.assertEqual(find_level_data(), "level_data")
+            with patch("os.path.isdir", return_value=False):
+                self.assertEqual(find_level_data(), os.path.join("bundle", "level_data"))
+
+    def test_core_does_not_need_pygame(self):
+        code = "import sys, core; sys.exit('pygame' in sys.modules)"
+        result = subprocess.run([sys.executable, "-c", code])
+        self.assertEqual(result.returncode, 0)
+
+
+class TestLevelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        for name in ("1", "2"):
+            save_layout(get_layout(name), os.path.join(self.directory.name, f"{name}.json"))
+        self.registry = LevelRegistry(self.directory.name)
+
+    def test_files_are_parsed_when_first_asked_for(self):
+        with patch("core.layouts.load_layout", wraps=load_layout) as load:
+            self.assertEqual(sorted(self.registry), ["1", "2"])
+            self.assertIn("2", self.registry)
+            load.assert_not_called()
+            self.assertEqual(self.registry["2"].links, get_layout("2").links)
+            self.assertIs(self.registry["2"], self.registry["2"])
+            load.assert_called_once()
+
+    def test_unknown_level(self):
+        with self.assertRaises(KeyError):
+            self.registry["9"]
+        self.assertNotIn("9", self.registry)
+
+    def test_file_must_hold_its_level(self):
+        os.rename(os.path.join(self.directory.name, "2.json"), os.path.join(self.directory.name, "3.json"))
+        with self.assertRaises(ValueError):
+            LevelRegistry(self.directory.name)["3"]
+
+    def test_added_layouts(self):
+        self.registry.add(LevelLayout("extra", ["..*"], start=(0, 0)))
+        self.assertEqual(len(self.registry), 3)
+        self.assertEqual(list(self.registry)[-1], "extra")
+        self.assertEqual(self.registry["extra"].grid, ("..*",))
+
+    def rewrite(self, name, layout):
+        path = os.path.join(self.directory.name, f"{name}.json")
+        save_layout(layout, path)
+        # a later modification time than the first write, however coarse the file system's clock
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def test_changed_files_are_parsed_again(self):
+        first, second = self.registry["1"], self.registry["2"]
+        self.assertEqual(self.registry.reload_changed(), [])
+        self.rewrite("1", LevelLayout("1", ["..*"], start=(0, 0)))
+        self.assertEqual(self.registry.reload_changed(), ["1"])
+        self.assertEqual(self.registry["1"].grid, ("..*",))
+        self.assertIsNot(self.registry["1"], first)
+        self.assertIs(self.registry["2"], second)
+        self.assertEqual(self.registry.reload_changed(), [])
+
+    def test_unparsed_files_are_not_watched(self):
+        self.registry.index()
+        self.rewrite("1", LevelLayout("1", ["..*"], start=(0, 0)))
+        with patch("core.layouts.load_layout", wraps=load_layout) as load:
+            self.assertEqual(self.registry.reload_changed(), [])
+            load.assert_not_called()
+
+    def test_broken_file_keeps_the_level(self):
+        layout = self.registry["1"]
+        path = os.path.join(self.directory.name, "1.json")
+        with open(path, "w") as file:
+            file.write('{"name": "1", "grid": [')
+        os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10 ** 9))
+        self.assertEqual(self.registry.reload_changed(), [])
+        self.assertIs(self.registry["1"], layout)
+
+    def test_new_files_are_found(self):
+        self.assertNotIn("3", self.registry)
+        save_layout(LevelLayout("3", ["*."], start=(0, 1)), os.path.join(self.directory.name, "3.json"))
+        stat = os.stat(self.directory.name)
+        os.utime(self.directory.name, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.registry.reload_changed()
+        self.assertEqual(self.registry["3"].grid, ("*.",))
+
+    def test_poll_waits_between_checks(self):
+        self.registry["1"]
+        self.assertEqual(self.registry.poll(), [])
+        self.rewrite("1", LevelLayout("1", ["..*"], start=(0, 0)))
+        self.assertEqual(self.registry.poll(), [])
+        self.registry.polled -= POLL_SECONDS
+        self.assertEqual(self.registry.poll(), ["1"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -42,6 +42,16 @@ class TestLeaderboard(unittest.TestCase):
         expected = " User: user2   Score:   5   Level:   3"
         self.assertEqual(self.leaderboard.get_lowest_overall_score(), expected)
 
+    # Test case for the efficiency against par
+    def test_efficiency(self):
+        # No one has a record yet
+        self.assertIsNone(self.leaderboard.get_best_efficiency())
+        self.assertIsNone(self.leaderboard.get_average_efficiency())
+        self.users["user1"].efficiency = {2: {"block_ratio": 1.5}}
+        self.users["user3"].efficiency = {2: {"block_ratio": 1.0}}
+        self.assertEqual(self.leaderboard.get_best_efficiency(), "User: user3, Blocks vs Par: 1.00x")
+        self.assertEqual(self.leaderboard.get_average_efficiency(), 1.25)
+
     # Test case for getting average score
     def test_get_average_score(self):
         expected = 21  # Average of scores for level 2: (20 + 25 + 18) / 3
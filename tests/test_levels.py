@@ -38,37 +38,6 @@ class TestLevel(unittest.TestCase):
         self.level.get_user_code()
         mocked_get_user_code.assert_called_once()
 
-    # Test case for getting end block
-    @patch('levels.Level.get_end_block', return_value=None)
-    def test_get_end_block(self, mocked_get_end_block):
-        """Test the get_end_block method."""
-        block = MagicMock()
-        self.level.get_end_block(block)
-        mocked_get_end_block.assert_called_once_with(block)
-
-    # Test case for getting bot position
-    @patch('levels.Level.get_bot_position', return_value=(0, 0))
-    def test_get_bot_position(self, mocked_get_bot_position):
-        """Test the get_bot_position method."""
-        position = self.level.get_bot_position()
-        mocked_get_bot_position.assert_called_once()
-        self.assertEqual(position, (0, 0), "Bot position should be returned correctly.")
-
-    # Test case for checking if next tile is open
-    @patch('levels.Level.next_tile_is_open', return_value=True)
-    def test_next_tile_is_open(self, mocked_next_tile_is_open):
-        """Test the next_tile_is_open method."""
-        result = self.level.next_tile_is_open(self.level.layout, 'up', (0, 0))
-        mocked_next_tile_is_open.assert_called_once()
-        self.assertTrue(result, "Next tile should be reported as open.")
-
-    # Test case for checking interactables
-    @patch('levels.Level.check_interactables', return_value=None)
-    def test_check_interactables(self, mocked_check_interactables):
-        """Test the check_interactables method."""
-        self.level.check_interactables(self.level.layout, (0, 0), self.mock_screen)
-        mocked_check_interactables.assert_called_once()
-
     # Test case for running level
     @patch('levels.Level.run_level', return_value=None)
     def test_run_level(self, mocked_run_level):
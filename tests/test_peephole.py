@@ -0,0 +1,99 @@
+import random
+import unittest
+
+from core.batch import run_batch
+from core.layouts import get_layout
+from core.peephole import optimize_program, tile_events
+from core.program import compile_program
+from core.simulator import Simulator
+
+CONDITIONS = ["wall ahead", "wall not ahead", "button is pressed", "door is open", "true", "0", "2"]
+
+
+def blocks(source):
+    program = optimize_program(compile_program(source))
+    return [(instruction.op, instruction.arg) for instruction in program.instructions]
+
+
+def random_source(rng, depth=0):
+    source = []
+    for _ in range(rng.randint(1, 4)):
+        kind = rng.random()
+        if kind < 0.35 or depth > 2:
+            source.append(("move", str(rng.randint(-1, 6))))
+        elif kind < 0.65:
+            source.append(("turn", str(rng.randint(-2, 9))))
+        else:
+            command = rng.choice(["if", "while", "for"])
+            value = str(rng.randint(-1, 5)) if command == "for" else rng.choice(CONDITIONS)
+            source.append((command, value))
+            source += random_source(rng, depth + 1)
+            source.append(("end" + command, None))
+    return source
+
+
+class TestPeephole(unittest.TestCase):
+
+    def test_turns_are_folded(self):
+        self.assertEqual(blocks([("turn", "5")]), blocks([("turn", "1")]))
+        self.assertEqual(blocks([("turn", "2"), ("turn", "2")]), [])
+        self.assertEqual(blocks([("turn", "-1")]), blocks([("turn", "3")]))
+
+    def test_moves_are_merged(self):
+        self.assertEqual(blocks([("move", "2"), ("move", "0"), ("move", "3")]), blocks([("move", "5")]))
+
+    def test_loops_are_collapsed(self):
+        self.assertEqual(blocks([("for", "4"), ("move", "2"), ("endfor", None)]), blocks([("move", "8")]))
+        self.assertEqual(blocks([("for", "4"), ("turn", "1"), ("endfor", None)]), [])
+        self.assertEqual(blocks([("for", "0"), ("move", "1"), ("endfor", None)]), [])
+        unrolled = blocks([("for", "2"), ("move", "1"), ("turn", "1"), ("endfor", None)])
+        self.assertEqual(unrolled, blocks([("move", "1"), ("turn", "1"), ("move", "1"), ("turn", "1")]))
+
+    def test_jumps_into_a_run_keep_it_apart(self):
+        source = [("move", "1"), ("while", "wall not ahead"), ("move", "1"), ("endwhile", None)]
+        self.assertEqual(len(blocks(source)), 4)
+
+    def test_dead_code_is_dropped(self):
+        source = [("while", "true"), ("move", "1"), ("endwhile", None), ("turn", "1"), ("move", "3")]
+        self.assertEqual(len(blocks(source)), 2)
+        self.assertEqual(blocks([("if", "wall ahead"), ("endif", None), ("move", "1")]), blocks([("move", "1")]))
+
+    def test_input_is_not_changed(self):
+        program = compile_program([("turn", "5"), ("move", "1"), ("move", "1")])
+        optimize_program(program)
+        self.assertEqual([instruction.arg for instruction in program.instructions], [5, 1, 1])
+
+    def test_tile_events_are_kept(self):
+        rng = random.Random(4)
+        boards = [get_layout(name).board() for name in ("2", "3", "5")]
+        for _ in range(150):
+            source = random_source(rng)
+            program = compile_program(source)
+            optimized = optimize_program(program)
+            for board in boards:
+                original = Simulator(board, program, detect_loops=False)
+                events = tile_events(original.run(2000))
+                faster = Simulator(board, optimized, detect_loops=False)
+                optimized_events = tile_events(faster.run(2000))
+                if original.done:
+                    self.assertTrue(faster.done, source)
+                    self.assertLessEqual(faster.steps, original.steps, source)
+                    self.assertEqual(optimized_events, events, source)
+                    self.assertEqual(
+                        (faster.solved, faster.position, faster.direction),
+                        (original.solved, original.position, original.direction),
+                        source,
+                    )
+                else:
+                    self.assertEqual(optimized_events[:len(events)], events, source)
+
+    def test_batch(self):
+        board = get_layout("4").board()
+        source = [("while", "true"), ("for", "3"), ("move", "1"), ("endfor", None), ("turn", "5"), ("endwhile", None)]
+        batch = run_batch(board, [compile_program(source)], optimize=True)
+        self.assertTrue(batch.solved[0])
+        self.assertLess(batch.steps[0], run_batch(board, [compile_program(source)]).steps[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
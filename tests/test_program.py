@@ -0,0 +1,120 @@
+import unittest
+from unittest.mock import Mock
+
+from core.program import (
+    MOVE,
+    TURN,
+    TEST,
+    JUMP,
+    COUNT_RESET,
+    COUNT_TEST,
+    CompileError,
+    compile_program,
+    read_blocks,
+)
+
+
+class TestCompileProgram(unittest.TestCase):
+
+    def ops(self, program):
+        return [(i.op, i.arg, i.target) for i in program.instructions]
+
+    def test_straight_line_program(self):
+        program = compile_program([("move", "3"), ("turn", " 1")])
+        self.assertEqual(self.ops(program), [(MOVE, 3, None), (TURN, 1, None)])
+
+    def test_while_loop_jump_targets(self):
+        program = compile_program([
+            ("while", "wall not ahead"),
+            ("move", "1"),
+            ("endwhile", None),
+            ("turn", "1"),
+        ])
+        self.assertEqual(self.ops(program), [
+            (TEST, "wall not ahead", 3),
+            (MOVE, 1, None),
+            (JUMP, None, 0),
+            (TURN, 1, None),
+        ])
+
+    def test_for_loop_resets_its_counter_on_entry(self):
+        program = compile_program([("for", "4"), ("move", "1"), ("endfor", None)])
+        self.assertEqual(self.ops(program), [
+            (COUNT_RESET, 0, None),
+            (COUNT_TEST, (0, 4), 4),
+            (MOVE, 1, None),
+            (JUMP, None, 1),
+        ])
+        self.assertEqual(program.new_counters(), [0])
+
+    def test_nested_loops_get_their_own_counters(self):
+        program = compile_program([
+            ("for", "2"),
+            ("for", "3"),
+            ("move", "1"),
+            ("endfor", None),
+            ("endfor", None),
+        ])
+        self.assertEqual(program.counter_count, 2)
+        self.assertEqual(program.instructions[1].target, 7)
+        self.assertEqual(program.instructions[3].target, 6)
+        self.assertEqual(program.instructions[5].target, 3)
+        self.assertEqual(program.instructions[6].target, 1)
+
+    def test_if_else(self):
+        program = compile_program([
+            ("if", "wall ahead"),
+            ("turn", "1"),
+            ("endif", None),
+            ("else", None),
+            ("move", "1"),
+            ("endelse", None),
+        ])
+        self.assertEqual(self.ops(program), [
+            (TEST, "wall ahead", 3),
+            (TURN, 1, None),
+            (JUMP, None, 4),
+            (MOVE, 1, None),
+        ])
+
+    def test_instructions_keep_their_source_block(self):
+        block = Mock()
+        program = compile_program([("move", "1", block)])
+        self.assertIs(program.instructions[0].block, block)
+
+    def test_missing_end_block(self):
+        with self.assertRaises(CompileError):
+            compile_program([("while", "true"), ("move", "1")])
+
+    def test_mismatched_end_block(self):
+        with self.assertRaises(CompileError):
+            compile_program([("while", "true"), ("endfor", None)])
+
+    def test_end_block_without_start(self):
+        with self.assertRaises(CompileError):
+            compile_program([("endif", None)])
+
+    def test_else_must_follow_endif(self):
+        with self.assertRaises(CompileError):
+            compile_program([("else", None), ("endelse", None)])
+
+    def test_invalid_numbers(self):
+        with self.assertRaises(ValueError):
+            compile_program([("move", "")])
+        with self.assertRaises(ValueError):
+            compile_program([("for", "sel"), ("endfor", None)])
+
+    def test_read_blocks_follows_the_chain(self):
+        start = Mock(command="start")
+        move = Mock(command="move", next=None)
+        move.input_box.user_text = "2"
+        loop = Mock(command="while", next=move)
+        loop.drop_down1.main = "true"
+        start.next = loop
+        self.assertEqual(
+            read_blocks(start), [("while", "true", loop), ("move", "2", move)]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
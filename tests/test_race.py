@@ -0,0 +1,71 @@
+import unittest
+from types import SimpleNamespace
+
+from race import Race
+from scheduler import StepScheduler
+
+
+class StubRun:
+    """
+    Stands in for a BotRun: each step it is allowed takes one simulator step, and the run
+    ends after a set number of steps, collecting the bolt or not.
+    """
+    def __init__(self, length, solves=True, looping=False):
+        self.length = length
+        self.solves = solves
+        self.simulator = SimpleNamespace(steps=0, done=False, looping=looping)
+        self.collected = False
+
+    def play_frame(self, pixels, may_step, seconds=None):
+        while not self.simulator.done and may_step():
+            self.simulator.steps += 1
+            if self.simulator.steps == self.length:
+                self.simulator.done = True
+                self.collected = self.solves
+        return pixels
+
+    def showing(self):
+        return False
+
+    def finished(self):
+        return self.collected or self.simulator.done
+
+
+def make_race(runners):
+    race = Race.__new__(Race)
+    race.names = [f"student {number}" for number in range(len(runners))]
+    race.runners = runners
+    race.scheduler = StepScheduler()
+    race.tick = 0
+    race.finish_steps = {}
+    return race
+
+
+class TestRace(unittest.TestCase):
+
+    def test_runs_advance_in_lock_step(self):
+        race = make_race([StubRun(3), StubRun(10), StubRun(6)])
+        ticks = iter([True] * 4 + [False])
+        race.play_tick(1, lambda: next(ticks))
+        self.assertEqual(race.tick, 4)
+        self.assertEqual([runner.simulator.steps for runner in race.runners], [3, 4, 4])
+
+    def test_finish_steps_and_standings(self):
+        race = make_race([StubRun(8), StubRun(5, solves=False), StubRun(3), StubRun(4, solves=False, looping=True)])
+        race.play_tick(None, lambda: True)
+        self.assertTrue(race.finished())
+        self.assertEqual(race.finish_steps, {0: 8, 2: 3})
+        self.assertEqual(race.standings(), [2, 0, 1, 3])
+
+    def test_status(self):
+        race = make_race([StubRun(2), StubRun(2, solves=False), StubRun(2, solves=False, looping=True), StubRun(9)])
+        ticks = iter([True] * 3 + [False])
+        race.play_tick(1, lambda: next(ticks))
+        self.assertEqual(
+            [race.status(number) for number in range(4)],
+            ["solved in 2", "not solved", "infinite loop", "3 steps"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import tempfile
+import unittest
+
+from core.cache import DiskCache
+from core.layouts import get_layout
+from core.program import compile_program
+from core.results import (
+    Replay,
+    ResultCache,
+    RunResult,
+    board_hash,
+    decode_trace,
+    encode_trace,
+    program_hash,
+    result_key,
+)
+from core.simulator import SIMULATOR_VERSION, Board, Event, Simulator
+
+SOLUTION = [("move", "2"), ("turn", "1"), ("move", "9"), ("turn", "3"), ("move", "2")]
+
+
+class TestResults(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.results = ResultCache(DiskCache(self.directory.name))
+        self.board = get_layout("1").board()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_program_hash_ignores_how_the_numbers_were_typed(self):
+        self.assertEqual(
+            program_hash(compile_program([("move", " 2")])),
+            program_hash(compile_program([("move", "2")])),
+        )
+        self.assertNotEqual(
+            program_hash(compile_program([("move", "2")])),
+            program_hash(compile_program([("move", "3")])),
+        )
+
+    def test_board_hash_tells_levels_apart(self):
+        self.assertEqual(board_hash(self.board), board_hash(get_layout("1").board()))
+        self.assertNotEqual(board_hash(self.board), board_hash(get_layout("2").board()))
+        self.assertNotEqual(board_hash(Board(2, 2)), board_hash(Board(2, 2, walls=[(0, 0)])))
+
+    def test_result_key_has_the_simulator_version(self):
+        key = result_key(self.board, compile_program(SOLUTION))
+        self.assertTrue(key.startswith(f"v{SIMULATOR_VERSION}-"))
+
+    def test_trace_round_trip(self):
+        events = [Event("move", (1, 2), 0), Event("teleport", (3, 4), 1, (5, 6))]
+        self.assertEqual(decode_trace(encode_trace(events)), events)
+
+    def test_run_is_stored_and_reused(self):
+        program = compile_program(SOLUTION)
+        first = self.results.run(self.board, program)
+        self.assertTrue(first.solved)
+        self.assertEqual(first.steps, 15)
+        second = self.results.get(self.board, compile_program(SOLUTION))
+        self.assertEqual(second.trace, first.trace)
+        self.assertEqual(second.steps, 15)
+
+    def test_unfinished_runs_are_not_stored(self):
+        program = compile_program([("for", "100"), ("turn", "1"), ("endfor", None)])
+        self.assertIsNone(self.results.run(self.board, program, max_steps=10))
+        self.assertIsNone(self.results.get(self.board, program))
+
+    def test_replay_hands_out_the_whole_trace(self):
+        program = compile_program(SOLUTION)
+        simulator = Simulator(self.board, program)
+        trace = simulator.run()
+        replay = Replay(RunResult.from_simulator(simulator, trace))
+        self.assertFalse(replay.done)
+        self.assertEqual(replay.step(), trace)
+        self.assertTrue(replay.done)
+        self.assertTrue(replay.solved)
+        self.assertEqual(replay.step(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
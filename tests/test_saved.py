@@ -0,0 +1,56 @@
+import os
+import pickle
+import tempfile
+import unittest
+
+from core.saved import load_saved_program, read_saved_blocks
+
+
+def save(path, records):
+    with open(path, "wb") as file:
+        for record in records:
+            pickle.dump(record, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+class TestSavedPrograms(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "block_list_1.pickle")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_blocks_are_linked_from_top_to_bottom(self):
+        save(self.path, [
+            ["images/blocks/turn.png", (890, 360), "turn", "1"],
+            ["images/blocks/move.png", (890, 320), "move", "2"],
+            ["images/blocks/move.png", (120, 515), "move", ""],
+        ])
+        source, placed = load_saved_program(self.path)
+        self.assertEqual(source, [("move", "2"), ("turn", "1")])
+        self.assertEqual(placed, 2)
+
+    def test_chain_stops_at_a_gap(self):
+        save(self.path, [
+            ["images/blocks/move.png", (890, 320), "move", "2"],
+            ["images/blocks/turn.png", (890, 400), "turn", "1"],
+        ])
+        source, placed = load_saved_program(self.path)
+        self.assertEqual(source, [("move", "2")])
+        self.assertEqual(placed, 2)
+
+    def test_blocks_without_a_value(self):
+        save(self.path, [["images/blocks/end_if.png", (890, 320), "endif"]])
+        blocks = read_saved_blocks(self.path)
+        self.assertIsNone(blocks[0].value)
+        self.assertFalse(blocks[0].locked)
+
+    def test_only_paths_are_unpickled(self):
+        save(self.path, [[unittest.TestCase, (890, 320), "move", "1"]])
+        with self.assertRaises(pickle.UnpicklingError):
+            read_saved_blocks(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
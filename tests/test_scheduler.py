@@ -0,0 +1,107 @@
+import unittest
+from unittest.mock import patch
+
+from scheduler import MAX_FRAME_TIME, SPEEDS, STEPS_PER_TICK, StepScheduler
+
+
+class TestStepScheduler(unittest.TestCase):
+
+    def test_speeds_cycle_and_wrap(self):
+        scheduler = StepScheduler()
+        seen = [scheduler.speed] + [scheduler.next_speed() for _ in range(len(SPEEDS))]
+        self.assertEqual(seen, ["1x", "4x", "16x", "instant", "1x"])
+
+    def test_pixels_per_frame(self):
+        scheduler = StepScheduler("16x")
+        self.assertEqual(scheduler.pixels_per_frame, 16)
+        self.assertFalse(scheduler.instant)
+        scheduler.next_speed()
+        self.assertIsNone(scheduler.pixels_per_frame)
+        self.assertTrue(scheduler.instant)
+
+    def test_unknown_speed(self):
+        with self.assertRaises(ValueError):
+            StepScheduler("2x")
+
+    @patch("scheduler.time.perf_counter")
+    def test_frame_budget(self, perf_counter):
+        scheduler = StepScheduler(frame_budget=0.004, instant_budget=0.25)
+        perf_counter.return_value = 10.0
+        scheduler.begin_frame()
+        perf_counter.return_value = 10.003
+        self.assertTrue(scheduler.has_time())
+        perf_counter.return_value = 10.005
+        self.assertFalse(scheduler.has_time())
+
+    @patch("scheduler.time.perf_counter")
+    def test_instant_mode_gets_the_larger_budget(self, perf_counter):
+        scheduler = StepScheduler("instant", frame_budget=0.004, instant_budget=0.25)
+        perf_counter.return_value = 10.0
+        scheduler.begin_frame()
+        perf_counter.return_value = 10.1
+        self.assertTrue(scheduler.has_time())
+
+
+    def count_ticks(self, scheduler):
+        ticks = 0
+        while scheduler.take_tick():
+            ticks += 1
+        return ticks
+
+    @patch("scheduler.time.perf_counter")
+    def test_ticks_follow_real_time(self, perf_counter):
+        scheduler = StepScheduler(frame_budget=1.0)
+        perf_counter.return_value = 10.0
+        scheduler.begin_frame()
+        # the first frame of a run gets one tick
+        self.assertEqual(self.count_ticks(scheduler), 1)
+        # a frame at 30 fps takes four ticks at 120 ticks a second
+        perf_counter.return_value = 10.0 + 1 / 30
+        scheduler.begin_frame()
+        self.assertEqual(self.count_ticks(scheduler), 4)
+        # a frame at 240 fps takes a tick every other frame, drawing half way in between
+        perf_counter.return_value += 1 / 240
+        scheduler.begin_frame()
+        self.assertEqual(self.count_ticks(scheduler), 0)
+        self.assertAlmostEqual(scheduler.alpha, 0.5)
+        perf_counter.return_value += 1 / 240
+        scheduler.begin_frame()
+        self.assertEqual(self.count_ticks(scheduler), 1)
+
+    @patch("scheduler.time.perf_counter")
+    def test_same_ticks_at_any_frame_rate(self, perf_counter):
+        totals = []
+        for frames_per_second in (20, 60, 144):
+            scheduler = StepScheduler(frame_budget=1.0)
+            perf_counter.return_value = 0.0
+            scheduler.begin_frame()
+            ticks = self.count_ticks(scheduler)
+            for frame in range(1, frames_per_second * 2 + 1):
+                perf_counter.return_value = frame / frames_per_second
+                scheduler.begin_frame()
+                ticks += self.count_ticks(scheduler)
+            totals.append(ticks)
+        self.assertEqual(totals, [241, 241, 241])
+
+    @patch("scheduler.time.perf_counter")
+    def test_long_stall_is_capped(self, perf_counter):
+        scheduler = StepScheduler(frame_budget=1.0)
+        perf_counter.return_value = 10.0
+        scheduler.begin_frame()
+        self.count_ticks(scheduler)
+        perf_counter.return_value = 20.0
+        scheduler.begin_frame()
+        self.assertEqual(self.count_ticks(scheduler), round(MAX_FRAME_TIME / scheduler.timestep))
+        scheduler.restart()
+        self.assertEqual(scheduler.accumulator, 0)
+
+    def test_step_quota(self):
+        may_step = StepScheduler().step_quota()
+        allowed = 0
+        while may_step():
+            allowed += 1
+        self.assertEqual(allowed, STEPS_PER_TICK)
+
+
+if __name__ == '__main__':
+    unittest.main()
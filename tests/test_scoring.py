@@ -0,0 +1,86 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from core.cache import DiskCache
+from core.layouts import LevelLayout, get_layout
+from core.program import compile_program
+from core.scoring import Par, ParCache, efficiency, fewest_blocks, layout_par, par_data
+from core.simulator import Board, Simulator
+
+
+class TestScoring(unittest.TestCase):
+
+    def test_one_long_move(self):
+        board = Board(5, 1, bolts=[(0, 0)], start=(4, 0))
+        self.assertEqual(fewest_blocks(board), [("move", "4")])
+
+    def test_fewest_blocks_solves_the_levels(self):
+        for name in ("1", "2", "5"):
+            board = get_layout(name).board()
+            source = fewest_blocks(board)
+            simulator = Simulator(board, compile_program(source))
+            simulator.run()
+            self.assertTrue(simulator.solved, name)
+
+    def test_level_1_par(self):
+        par = Par.from_board(get_layout("1").board())
+        self.assertEqual(par.blocks, 4)
+        self.assertEqual(par.steps, 15)
+
+    def test_par_counts_loops(self):
+        par = Par.from_board(get_layout("4").board())
+        self.assertEqual(par.blocks, 4)
+        self.assertEqual(par.source[0], ("while", "true"))
+
+    def test_unsolvable_level_has_no_par(self):
+        board = Board(3, 1, walls=[(1, 0)], bolts=[(0, 0)], start=(2, 0))
+        self.assertIsNone(fewest_blocks(board))
+        self.assertIsNone(Par.from_board(board))
+
+    def test_par_is_cached(self):
+        board = get_layout("1").board()
+        with tempfile.TemporaryDirectory() as directory:
+            first = ParCache(DiskCache(directory))
+            self.assertEqual(first.par(board).blocks, 4)
+            with patch("core.scoring.shortest_program") as search:
+                par = ParCache(DiskCache(directory)).par(board)
+                search.assert_not_called()
+            self.assertEqual(par.blocks, 4)
+            self.assertEqual(par.source, first.par(board).source)
+
+    def test_known_never_searches(self):
+        board = get_layout("1").board()
+        with tempfile.TemporaryDirectory() as directory:
+            cache = ParCache(DiskCache(directory))
+            with patch("core.scoring.shortest_program") as search:
+                self.assertIsNone(cache.known(board))
+                search.assert_not_called()
+            cache.par(board)
+            self.assertEqual(ParCache(DiskCache(directory)).known(board).blocks, 4)
+
+    def test_shipped_levels_have_pars(self):
+        with patch("core.scoring.shortest_program") as search:
+            for name in ("1", "2", "3", "4", "5"):
+                self.assertIsNotNone(layout_par(get_layout(name)), name)
+            search.assert_not_called()
+
+    def test_par_of_an_edited_level_is_not_used(self):
+        layout = get_layout("1")
+        edited = LevelLayout("1", layout.grid[:-1] + ("*" * 18,), par=layout.par)
+        with tempfile.TemporaryDirectory() as directory:
+            with patch("core.scoring.par_cache", ParCache(DiskCache(directory))):
+                self.assertIsNone(layout_par(edited))
+                edited.par = par_data(edited.board(), Par(1, 1, [("move", "1")]))
+                self.assertEqual(layout_par(edited).blocks, 1)
+
+    def test_efficiency(self):
+        record = efficiency(Par(4, 15, []), 6, 30)
+        self.assertEqual(record["blocks"], 6)
+        self.assertEqual(record["steps"], 30)
+        self.assertEqual(record["block_ratio"], 1.5)
+        self.assertEqual(record["step_ratio"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
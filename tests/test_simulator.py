@@ -0,0 +1,224 @@
+import unittest
+
+from core.program import compile_program
+from core.simulator import (
+    UP,
+    RIGHT,
+    DOWN,
+    LEFT,
+    MOVED,
+    TURNED,
+    TELEPORTED,
+    PRESSED,
+    COLLECTED,
+    Board,
+    Event,
+    Simulator,
+    Trigger,
+)
+
+
+def run(board, source, max_steps=1000):
+    simulator = Simulator(board, compile_program(source))
+    events = simulator.run(max_steps)
+    return simulator, events
+
+
+class TestSimulator(unittest.TestCase):
+
+    def setUp(self):
+        # a 3x4 room, bot in the bottom right corner facing up
+        self.board = Board(3, 4, walls=[(0, 1)], start=(2, 3))
+
+    def test_move_stops_at_the_edge(self):
+        simulator, events = run(self.board, [("move", "5")])
+        self.assertEqual(simulator.cell, (0, 3))
+        self.assertEqual(
+            events, [Event(MOVED, (1, 3), UP), Event(MOVED, (0, 3), UP)]
+        )
+        self.assertTrue(simulator.done)
+        self.assertFalse(simulator.solved)
+
+    def test_move_stops_at_walls(self):
+        simulator, _ = run(self.board, [("move", "3"), ("turn", "1"), ("move", "5")])
+        self.assertEqual(simulator.cell, (0, 2))
+
+    def test_turns_are_counterclockwise(self):
+        directions = [
+            run(self.board, [("turn", str(turns))])[0].direction
+            for turns in range(6)
+        ]
+        self.assertEqual(directions, [UP, LEFT, DOWN, RIGHT, UP, LEFT])
+
+    def test_turn_event(self):
+        _, events = run(self.board, [("turn", "3")])
+        self.assertEqual(events, [Event(TURNED, (2, 3), RIGHT)])
+
+    def test_wall_ahead_conditions(self):
+        source = [
+            ("while", "wall not ahead"),
+            ("move", "1"),
+            ("endwhile", None),
+            ("turn", "1"),
+            ("if", "wall ahead"),
+            ("turn", "2"),
+            ("endif", None),
+        ]
+        simulator, _ = run(self.board, source)
+        self.assertEqual(simulator.cell, (0, 3))
+        self.assertEqual(simulator.direction, LEFT)
+
+    def test_button_and_door_conditions_look_at_the_tile_ahead(self):
+        # a button at (1, 1) opens the door at (0, 1); the bot starts below the button
+        board = Board(3, 3, doors=[(0, 1)], buttons={(1, 1): (0, 1)}, start=(2, 1))
+        source = [
+            ("if", "button is pressed"),
+            ("turn", "1"),
+            ("endif", None),
+            ("move", "1"),
+            ("turn", "2"),
+            ("turn", "2"),
+            ("if", "door is open"),
+            ("move", "1"),
+            ("endif", None),
+        ]
+        simulator, _ = run(board, source)
+        self.assertEqual(simulator.cell, (0, 1))
+        self.assertEqual(simulator.direction, UP)
+
+    def test_button_and_door_conditions_are_false_elsewhere(self):
+        simulator = Simulator(self.board, compile_program([("move", "1")]))
+        self.assertFalse(simulator.check_condition("button is pressed"))
+        self.assertFalse(simulator.check_condition("door is open"))
+
+    def test_counted_loop(self):
+        simulator, events = run(
+            self.board, [("for", "2"), ("move", "1"), ("endfor", None)]
+        )
+        self.assertEqual(simulator.cell, (0, 3))
+        self.assertEqual(len(events), 2)
+
+    def test_collecting_the_bolt_solves_the_level(self):
+        board = Board(3, 4, bolts=[(1, 3)], start=(2, 3))
+        simulator, events = run(board, [("move", "2"), ("turn", "1")])
+        self.assertTrue(simulator.solved)
+        self.assertEqual(simulator.cell, (1, 3))
+        self.assertEqual(events[-1], Event(COLLECTED, (1, 3), UP))
+
+    def test_closed_door_blocks_the_bot(self):
+        board = Board(3, 4, doors=[(1, 3)], start=(2, 3))
+        simulator, events = run(board, [("move", "3")])
+        self.assertEqual(simulator.cell, (2, 3))
+        self.assertEqual(events, [])
+
+    def test_button_opens_its_door(self):
+        board = Board(
+            3, 4, doors=[(0, 3)], buttons={(1, 3): (0, 3)}, start=(2, 3)
+        )
+        simulator, events = run(board, [("move", "3")])
+        self.assertEqual(events[1], Event(PRESSED, (1, 3), UP, (0, 3)))
+        self.assertIn((0, 3), simulator.open_doors)
+        self.assertEqual(simulator.cell, (0, 3))
+
+    def test_button_is_pressed_once(self):
+        board = Board(3, 4, buttons={(1, 3): None}, start=(2, 3))
+        _, events = run(board, [
+            ("move", "1"), ("turn", "2"), ("move", "1"), ("turn", "2"), ("move", "1"),
+        ])
+        self.assertEqual([e.kind for e in events].count(PRESSED), 1)
+
+    def test_wormhole_does_not_send_the_bot_back(self):
+        board = Board(
+            3, 4, wormholes={(1, 3): (1, 0), (1, 0): (1, 3)}, start=(2, 3)
+        )
+        simulator, events = run(board, [("move", "1"), ("turn", "2"), ("move", "1"), ("turn", "2"), ("move", "1")])
+        self.assertEqual(events[1], Event(TELEPORTED, (1, 0), UP, (1, 3)))
+        self.assertEqual(simulator.cell, (1, 0))
+        self.assertEqual(simulator.last_wormhole, (1, 0))
+
+    def test_teleport_does_not_use_up_the_move(self):
+        board = Board(
+            4, 4, wormholes={(2, 3): (3, 0), (3, 0): (2, 3)}, start=(3, 3)
+        )
+        simulator, _ = run(board, [("move", "2")])
+        self.assertEqual(simulator.cell, (2, 0))
+
+    def test_trigger_table(self):
+        board = Board(
+            2, 3,
+            bolts=[(0, 0)],
+            buttons={(0, 2): None},
+            wormholes={(1, 0): (0, 1), (0, 1): (1, 0)},
+            start=(1, 2),
+        )
+        self.assertEqual(board.triggers, [
+            Trigger(None, None, True), Trigger(None, 3, False), Trigger(0, None, False),
+            Trigger(None, 1, False), None, None,
+        ])
+
+    def test_wormhole_onto_a_bolt_solves_the_level(self):
+        board = Board(
+            3, 4, bolts=[(0, 0)], wormholes={(1, 3): (0, 0)}, start=(2, 3)
+        )
+        simulator, events = run(board, [("move", "1")])
+        self.assertTrue(simulator.solved)
+        self.assertEqual(events[-1], Event(COLLECTED, (0, 0), UP))
+
+    def test_one_way_wormhole_onto_a_plain_cell(self):
+        board = Board(3, 4, wormholes={(1, 3): (0, 0)}, start=(2, 3))
+        simulator, _ = run(board, [("move", "1")])
+        self.assertEqual(simulator.cell, (0, 0))
+
+    def test_step_limit(self):
+        program = compile_program([("while", "true"), ("endwhile", None)])
+        simulator = Simulator(self.board, program, detect_loops=False)
+        simulator.run(50)
+        self.assertEqual(simulator.steps, 50)
+        self.assertFalse(simulator.done)
+
+    def test_endless_loop_is_detected(self):
+        simulator, _ = run(self.board, [("while", "true"), ("endwhile", None)])
+        self.assertTrue(simulator.looping)
+        self.assertTrue(simulator.done)
+        self.assertLess(simulator.steps, 10)
+
+    def test_loop_pacing_back_and_forth_is_detected(self):
+        source = [
+            ("while", "true"),
+            ("move", "5"),
+            ("turn", "2"),
+            ("endwhile", None),
+        ]
+        simulator, _ = run(self.board, source)
+        self.assertTrue(simulator.looping)
+        self.assertFalse(simulator.solved)
+
+    def test_loop_that_presses_buttons_is_not_cut_short(self):
+        # the walk repeats, but the first lap presses the button and opens the door
+        board = Board(
+            3, 4, doors=[(0, 1)], buttons={(0, 3): (0, 1)}, bolts=[(0, 0)], start=(2, 3)
+        )
+        source = [
+            ("while", "true"),
+            ("move", "3"),
+            ("turn", "1"),
+            ("endwhile", None),
+        ]
+        simulator, _ = run(board, source)
+        self.assertTrue(simulator.solved)
+        self.assertFalse(simulator.looping)
+
+    def test_finite_counted_loops_are_not_flagged(self):
+        source = [("for", "52"), ("turn", "1"), ("endfor", None)]
+        simulator, _ = run(self.board, source)
+        self.assertFalse(simulator.looping)
+        self.assertEqual(simulator.direction, UP)
+
+    def test_empty_program_is_done(self):
+        simulator, events = run(self.board, [])
+        self.assertTrue(simulator.done)
+        self.assertEqual(events, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from core.cache import DiskCache
+from core.layouts import LAYOUTS, get_layout
+from core.simulator import Board, run_program
+from core.solver import (
+    AROUND,
+    FORWARD,
+    LEFT,
+    RIGHT,
+    SolutionCache,
+    actions_to_source,
+    solve,
+)
+
+
+class TestSolver(unittest.TestCase):
+
+    def test_straight_line(self):
+        board = Board(3, 1, bolts=[(0, 0)], start=(2, 0))
+        self.assertEqual(solve(board), [FORWARD, FORWARD])
+
+    def test_turns(self):
+        board = Board(2, 2, bolts=[(1, 0)], start=(1, 1))
+        self.assertEqual(solve(board), [LEFT, FORWARD])
+        board = Board(2, 2, bolts=[(1, 1)], start=(1, 0))
+        self.assertEqual(solve(board), [RIGHT, FORWARD])
+
+    def test_door_needs_its_button(self):
+        # the bolt is behind a door whose button is off to the side
+        board = Board(
+            3, 2,
+            walls=[(1, 1)],
+            doors=[(1, 0)],
+            bolts=[(0, 0)],
+            buttons={(2, 1): (1, 0)},
+            start=(2, 0),
+        )
+        self.assertEqual(solve(board), [RIGHT, FORWARD, AROUND, FORWARD, RIGHT, FORWARD, FORWARD])
+
+    def test_unsolvable_level(self):
+        self.assertIsNone(solve(Board(2, 2, walls=[(0, 0)], start=(1, 1))))
+
+    def test_solutions_replay_on_the_simulator(self):
+        for name, layout in LAYOUTS.items():
+            board = layout.board()
+            actions = solve(board)
+            if actions is None:
+                self.assertFalse(board.bolts, name)
+                continue
+            simulator = run_program(board, actions_to_source(actions))
+            self.assertTrue(simulator.solved, name)
+            self.assertEqual(simulator.steps, len(actions), name)
+
+    def test_actions_to_source(self):
+        self.assertEqual(
+            actions_to_source([FORWARD, FORWARD, LEFT, FORWARD, RIGHT]),
+            [("move", "2"), ("turn", "1"), ("move", "1"), ("turn", "3")],
+        )
+
+    def test_solutions_are_cached_on_disk(self):
+        board = get_layout("2").board()
+        with tempfile.TemporaryDirectory() as directory:
+            first = SolutionCache(DiskCache(directory))
+            self.assertEqual(first.optimal_steps(board), 39)
+            with patch("core.solver.solve") as solve_again:
+                second = SolutionCache(DiskCache(directory))
+                self.assertEqual(second.optimal_steps(board), 39)
+                solve_again.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
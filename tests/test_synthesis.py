@@ -0,0 +1,77 @@
+import unittest
+
+from core.layouts import get_layout
+from core.program import compile_program
+from core.simulator import Board, Simulator
+from core.synthesis import StatementLibrary, shortest_program
+
+
+def solves(board, source):
+    simulator = Simulator(board, compile_program(source))
+    simulator.run(100000)
+    return simulator.solved
+
+
+class TestStatementLibrary(unittest.TestCase):
+
+    def setUp(self):
+        self.library = StatementLibrary(Board(3, 4, start=(2, 3)), statement_blocks=5)
+
+    def test_sizes(self):
+        self.assertEqual(sorted(self.library.statements), [1, 3, 4, 5])
+        for size, statements in self.library.statements.items():
+            for statement in statements:
+                self.assertEqual(len(statement), size)
+                compile_program(statement)
+
+    def test_no_repeated_moves_or_turns(self):
+        for statements in self.library.statements.values():
+            for statement in statements:
+                for block, following in zip(statement, statement[1:]):
+                    self.assertFalse(block[0] == following[0] and block[0] in ("move", "turn"), statement)
+
+    def test_if_blocks_only_in_bodies(self):
+        for size in (3, 4, 5):
+            self.assertNotIn("if", {statement[0][0] for statement in self.library.statements[size]})
+        self.assertIn(
+            (("while", "true"), ("if", "wall ahead"), ("turn", "1"), ("endif", None), ("endwhile", None)),
+            self.library.statements[5],
+        )
+
+    def test_conditions_follow_the_board(self):
+        self.assertNotIn("door is open", self.library.conditions)
+        library = StatementLibrary(Board(3, 4, doors=[(0, 0)], buttons={(1, 1): (0, 0)}), statement_blocks=3)
+        self.assertIn("button is pressed", library.conditions)
+        self.assertIn("door is open", library.conditions)
+
+
+class TestShortestProgram(unittest.TestCase):
+
+    def test_straight_line(self):
+        board = Board(5, 1, bolts=[(0, 0)], start=(4, 0))
+        self.assertEqual(shortest_program(board, workers=1), [("move", "4")])
+
+    def test_loop_beats_straight_line(self):
+        source = shortest_program(get_layout("4").board(), workers=1)
+        self.assertEqual(len(source), 4)
+        self.assertTrue(solves(get_layout("4").board(), source))
+
+    def test_nested_loops(self):
+        board = get_layout("3").board()
+        source = shortest_program(board, workers=1)
+        self.assertEqual(len(source), 6)
+        self.assertTrue(solves(board, source))
+
+    def test_unsolvable(self):
+        board = Board(3, 1, walls=[(1, 0)], bolts=[(0, 0)], start=(2, 0))
+        self.assertIsNone(shortest_program(board, workers=1))
+
+    def test_process_pool(self):
+        board = Board(4, 4, walls=[(1, 3)], bolts=[(0, 0)], start=(3, 3))
+        source = shortest_program(board, statement_blocks=4, workers=2)
+        self.assertTrue(solves(board, source))
+        self.assertEqual(len(source), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
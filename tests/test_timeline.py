@@ -0,0 +1,81 @@
+import unittest
+
+from core.layouts import get_layout
+from core.program import compile_program
+from core.simulator import Simulator
+from core.timeline import Timeline
+
+# the saved level 3 solution, a spiral of 379 steps
+SPIRAL = [
+    ("while", "true"), ("move", "1"), ("if", "wall ahead"),
+    ("turn", "1"), ("endif", None), ("endwhile", None),
+]
+
+
+def run_to(board, program, step, detect_loops=True):
+    simulator = Simulator(board, program, detect_loops)
+    while simulator.steps < step and not simulator.done:
+        simulator.step()
+    return simulator
+
+
+class TestTimeline(unittest.TestCase):
+
+    def setUp(self):
+        self.board = get_layout("3").board()
+        self.program = compile_program(SPIRAL)
+
+    def test_snapshot_and_restore(self):
+        simulator = run_to(self.board, self.program, 50)
+        snapshot = simulator.snapshot()
+        state, cell = simulator.state(), simulator.cell
+        for _ in range(30):
+            simulator.step()
+        simulator.restore(snapshot)
+        self.assertEqual(simulator.state(), state)
+        self.assertEqual(simulator.cell, cell)
+        self.assertEqual(simulator.steps, 50)
+        self.assertEqual(simulator.hash, simulator.compute_hash())
+
+    def test_seek_matches_a_fresh_run(self):
+        timeline = Timeline(self.board, self.program, interval=16)
+        while not timeline.simulator.done:
+            timeline.step()
+        self.assertTrue(timeline.simulator.solved)
+        for step in (0, 1, 15, 16, 17, 200, 100, 378, 379, 5):
+            self.assertEqual(timeline.seek(step), step)
+            expected = run_to(self.board, self.program, step)
+            self.assertEqual(timeline.simulator.state(), expected.state())
+            self.assertEqual(timeline.simulator.hash, expected.hash)
+
+    def test_seek_past_the_end(self):
+        timeline = Timeline(self.board, self.program)
+        self.assertEqual(timeline.seek(10 ** 6), 379)
+        self.assertTrue(timeline.simulator.solved)
+
+    def test_counts_actions(self):
+        timeline = Timeline(self.board, self.program, interval=8)
+        timeline.seek(379)
+        actions = timeline.actions
+        timeline.seek(0)
+        self.assertEqual(timeline.actions, 0)
+        timeline.seek(379)
+        self.assertEqual(timeline.actions, actions)
+        self.assertEqual(actions, 102)
+
+    def test_checkpoints_stay_bounded(self):
+        # a loop that never ends, with loop detection off
+        program = compile_program([("while", "true"), ("turn", "1"), ("endwhile", None)])
+        board = get_layout("1").board()
+        timeline = Timeline(board, program, interval=4, capacity=8)
+        timeline.simulator.detect_loops = False
+        for _ in range(5000):
+            timeline.step()
+        self.assertLessEqual(len(timeline.checkpoints), 8)
+        self.assertGreaterEqual(timeline.interval * len(timeline.checkpoints), 5000 // 2)
+        self.assertEqual(timeline.seek(1234), 1234)
+        self.assertEqual(timeline.simulator.direction, run_to(board, program, 1234, False).direction)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -48,6 +48,18 @@ class TestUser(unittest.TestCase):
         # Check score for level 2 for regular user
         self.assertEqual(self.user_1.get_score(2), -1)
 
+    # Test case for recording how a completion compared to par
+    def test_set_score_with_efficiency(self):
+        # Levels without a completion have no record
+        self.assertIsNone(self.user_1.get_efficiency(1))
+        record = {"blocks": 6, "steps": 30, "block_ratio": 1.5, "step_ratio": 2.0}
+        self.user_1.set_score(1, 6, record)
+        self.assertEqual(self.user_1.get_score(1), 6)
+        self.assertEqual(self.user_1.get_efficiency(1), record)
+        # A completion without a par leaves no record of the earlier one
+        self.user_1.set_score(1, 5)
+        self.assertIsNone(self.user_1.get_efficiency(1))
+
     # Test case for unlocking a skin
     def test_unlock_skin(self):
         # Check if skin 2 is not initially unlocked for regular user
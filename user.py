@@ -6,6 +6,7 @@ class User:
            id (int): Unique identifier for the user.
            type (int): Type of the user, where type 2 represents a premium user.
            score (dict): A dictionary mapping level numbers to scores.
+           efficiency (dict): A dictionary mapping level numbers to how the latest completion compared to par.
            skin (str): The file name of the current skin used by the user. Default is "ProBot-1.png".
            unlocked_skins (list): List of skin numbers that the user has unlocked. Premium users start with six skins unlocked.
        """
@@ -21,6 +22,7 @@ class User:
         self.id = id
         self.type = type
         self.score = {1: 100, 2: 100, 3: 100, 4: 100, 5: 100}
+        self.efficiency = {}
         self.skin = skin
         
         if type == 2:
@@ -46,15 +48,23 @@ class User:
                 """
         return self.type
 
-    def set_score(self, level, score):
+    def set_score(self, level, score, efficiency=None):
         """
                 Sets the score for a specified level. Unlocks a new skin if the score is positive and the next level's skin isn't already unlocked.
 
                 Parameters:
                     level (int): The level number for which to set the score.
                     score (int): The score to set for the specified level.
+                    efficiency (dict, optional): How the completion compared to par, as made by core.scoring.efficiency,
+                        or None if the level has no par, which clears the record of an earlier completion.
                 """
         self.score[int(level)] = score
+        if not hasattr(self, "efficiency"):  # users saved before efficiency was recorded
+            self.efficiency = {}
+        if efficiency is None:
+            self.efficiency.pop(int(level), None)
+        else:
+            self.efficiency[int(level)] = efficiency
         if score < 100 and (int(level) + 1) not in self.unlocked_skins:
             self.unlock_skin(int(level) + 1)
 
@@ -70,6 +80,18 @@ class User:
                 """
         return self.score[int(level)]
 
+    def get_efficiency(self, level):
+        """
+                Retrieves how the latest completion of a level compared to par.
+
+                Parameters:
+                    level (int): The level number.
+
+                Returns:
+                    dict: The record made by core.scoring.efficiency, or None if the level has not been completed.
+                """
+        return getattr(self, "efficiency", {}).get(int(level))
+
     def unlock_skin(self, skin_number):
         """
                Unlocks a new skin for the user.